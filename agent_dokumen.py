@@ -1,19 +1,14 @@
-from langchain.chat_models import ChatOpenAI
+from llm_utils import get_llm
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain.tools import Tool
 from langchain.prompts import PromptTemplate
-import os
+from prompt_utils import daftarkan_prompt
 from tools.tools_dokumen import unggah_dokumen, simpan_file
 
 def create_dokumen_agent() -> AgentExecutor:
     print("📁 Membuat Dokumen Agent...")
 
-    llm = ChatOpenAI(
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-        temperature=0.3,
-    )
+    llm = get_llm("dokumen")
 
     tools = [
         Tool(
@@ -78,6 +73,7 @@ Pertanyaan: {input}
 """
     )
 
+    daftarkan_prompt("dokumen", prompt, tools)
     agent = create_react_agent(llm=llm, tools=tools, prompt=prompt)
 
     return AgentExecutor(
@@ -1,19 +1,14 @@
-from langchain.chat_models import ChatOpenAI
+from llm_utils import get_llm
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain.prompts import PromptTemplate
+from prompt_utils import daftarkan_prompt
 from langchain.tools import Tool
 from tools.tools_notulensi_teks import catat_notulensi, tampilkan_notulensi, update_status_catatan, rekap_catatan
-import os
 
 def create_notulensi_teks_agent() -> AgentExecutor:
     print("🔍 Membuat Notulensi Agent...")
 
-    llm = ChatOpenAI(
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-        temperature=0.3,
-    )
+    llm = get_llm("notulensi")
 
     # 🧰 Daftar tools notulensi
     tools = [
@@ -34,6 +29,7 @@ def create_notulensi_teks_agent() -> AgentExecutor:
             name="TampilkanNotulensi",
             func=tampilkan_notulensi,
             description=("Gunakan untuk menampilkan kembali notulensi yang pernah disimpan. Contoh: 'tampilkan notulensi site cilacap_pl', 'lihat catatan 10 juli','tampilkan catatan site maos_ep','lihat catatan site cilacap_pl'."
+            " Gunakan juga jika pengguna mengetik 'lanjut' untuk melihat halaman catatan berikutnya."
         ),
         return_direct=True
         ),
@@ -215,6 +211,7 @@ Pertanyaan: {input}
 """
     )
 
+    daftarkan_prompt("notulensi", prompt, tools)
     agent = create_react_agent(llm=llm, tools=tools, prompt=prompt)
 
     return AgentExecutor(
@@ -1,18 +1,13 @@
-import os
-from langchain.chat_models import ChatOpenAI
+from llm_utils import get_llm
 from langchain.agents import AgentExecutor, Tool, create_react_agent
 from langchain.prompts import PromptTemplate
+from prompt_utils import daftarkan_prompt
 from tools.tools_rag import jawab_pertanyaan_pgvector
 
 def create_rag_agent() -> AgentExecutor:
     print("🔍 Membuat RAG Agent...")
 
-    llm = ChatOpenAI(
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-        temperature=0.3,
-    )
+    llm = get_llm("rag_agent")
 
     tools = [
     Tool(
@@ -46,17 +41,6 @@ Action Input: Anda WAJIB menggunakan teks ASLI dan LENGKAP dari 'Pertanyaan' di
 Thought: Aku sekarang sudah mendapatkan informasi yang dibutuhkan dari tool dan tahu jawaban akhirnya.  
 Final Answer: jawaban akhir untuk pengguna, berdasarkan informasi dari Observation.
 
-FORMAT WAJIB:
-Pertanyaan: {input}
-Thought: Saya mempertimbangkan apakah butuh referensi dokumen.
-Action: (nama tool)
-Action Input: (pertanyaan lengkap)
-
-Observation: (hasil tool)
-Thought: Saya sudah tahu jawabannya.
-Final Answer: (jawaban akhir untuk user)
-
-
 🧠 Aturan Penggunaan Tool JawabRAG:
 
 Gunakan **JawabRAG** jika pengguna menanyakan atau meminta informasi seperti:
@@ -81,10 +65,22 @@ Gunakan **JawabRAG** jika pengguna menanyakan atau meminta informasi seperti:
 - JANGAN pakai tool JawabRAG jika tidak mengandung tanda tanya atau kata perintah di atas.
 - JANGAN pakai tool JawabRAG jika input adalah catatan seperti "antena rusak", "sinyal hilang", "sinyal rusak", dll.
 
+FORMAT WAJIB:
+Pertanyaan: (pertanyaan pengguna)
+Thought: Saya mempertimbangkan apakah butuh referensi dokumen.
+Action: (nama tool)
+Action Input: (pertanyaan lengkap)
+
+Observation: (hasil tool)
+Thought: Saya sudah tahu jawabannya.
+Final Answer: (jawaban akhir untuk user)
+
+Pertanyaan: {input}
 {agent_scratchpad}
 """
     )
 
+    daftarkan_prompt("rag", prompt, tools)
     agent = create_react_agent(llm=llm, tools=tools, prompt=prompt)
 
     return AgentExecutor(
@@ -1,9 +1,9 @@
 # ===== SEDANG MENGIMPOR agent_researcher.py =====
 
-import os
-from langchain.chat_models import ChatOpenAI
+from llm_utils import get_llm
 from langchain.agents import create_react_agent, AgentExecutor, Tool
 from langchain.prompts import PromptTemplate
+from prompt_utils import daftarkan_prompt
 from tools.tools_researcher import query_site_from_db
 
 
@@ -11,13 +11,7 @@ from tools.tools_researcher import query_site_from_db
 def create_researcher_agent() -> AgentExecutor:
     print("🔍 Membuat Researcher Agent (Versi Spesialis)...")
 
-    llm = ChatOpenAI(
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        openai_api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-        openai_api_base="https://openrouter.ai/api/v1",
-        temperature=0.2,
-        max_retries=5 
-    )
+    llm = get_llm("researcher")
 
     tools = [
         Tool(
@@ -80,6 +74,7 @@ Pertanyaan: {input}
     )
 
    
+    daftarkan_prompt("researcher", researcher_prompt, tools)
     agent = create_react_agent(llm, tools, researcher_prompt)
     return AgentExecutor(
         agent=agent,
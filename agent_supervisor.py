@@ -1,6 +1,5 @@
 print("===== SEDANG MENGIMPOR agent_supervisor.py =====")
-import os
-from langchain.chat_models import ChatOpenAI
+from llm_utils import get_llm
 from langchain.agents import AgentExecutor, Tool, create_react_agent
 from langchain.prompts import PromptTemplate
 from langchain_core.runnables.history import RunnableWithMessageHistory
@@ -9,6 +8,7 @@ from pydantic import BaseModel, Field
 from typing import List
 from langchain_core.messages import BaseMessage
 from langchain_core.runnables import RunnableLambda
+from prompt_utils import daftarkan_prompt, susun_template
 
 
 # ==== DEFINE IN-MEMORY HISTORY ====
@@ -53,6 +53,113 @@ from agents.agent_rag import create_rag_agent
 from tools.tools_notulensi_teks import catat_notulensi
 
 
+# ==== BLOK PROMPT SUPERVISOR ====
+# Bagian statis di depan (instruksi + tools + aturan), bagian dinamis
+# (chat_history, input, scratchpad) di akhir agar prefix bisa di-cache.
+PROMPT_PEMBUKA = """
+Jawab pertanyaan pengguna berikut dengan sebaik mungkin. Anda memiliki akses ke tool di bawah ini:
+
+{tools}
+
+Gunakan format berikut dengan sangat teliti:
+
+Pertanyaan: Pertanyaan yang harus Anda jawab
+Thought: Anda harus selalu berpikir tentang apa yang harus dilakukan.
+Action: Nama tool yang akan digunakan, harus salah satu dari [{tool_names}]
+Action Input: Input untuk tool tersebut
+Observation: Hasil dari eksekusi tool
+... (Urutan ini bisa berulang)
+
+Thought: Saya sekarang sudah tahu jawaban akhirnya.
+Final Answer: Jawaban akhir untuk pertanyaan asli dari pengguna
+"""
+
+ATURAN_KONTEKS_SITE = """
+📌 Konteks site:
+- Jika pengguna MENYEBUTKAN SITE SECARA EKSPLISIT (site id 14XXX atau nama site), anggap itu site konteks AKTIF untuk pertanyaan lanjutan.
+- Jika pengguna TIDAK menyebut nama site, periksa chat_history; jika percakapan sebelumnya menyebut site (misalnya "KEDUNGMUNDU_EP"), asumsikan pertanyaan merujuk ke site tersebut.
+  Contoh: "gangguannya apa saja?" + site terakhir "KEDUNGMUNDU_EP" → JawabRAG → "gangguan apa saja di site KEDUNGMUNDU_EP?"
+
+📌 Panduan memilih tool:
+"""
+
+# Aturan per tool; hanya tool yang terdaftar yang ikut masuk prompt.
+ATURAN_TOOL = {
+    "SiteResearcher": """
+- SiteResearcher: pencarian daftar site, site ID, atau pencocokan nama site ↔ ID site.
+  Contoh: "daftar site di Purbalingga", "apa site ID dari purbalingga_mt", "site apa saja di Semarang", "site wonotunggal?", "site gemuh?", "site 15SMN01?".
+  Input berupa nama/ID site DENGAN tanda tanya ("site 15YOG01?", "site gemuh?") adalah tugas SiteResearcher, BUKAN SiteNameOnlyResponder.
+""",
+    "GreetingAndChat": """
+- GreetingAndChat: pengguna hanya menyapa ("halo", "hai") atau mengucapkan terima kasih.
+""",
+    "SiteNameOnlyResponder": """
+- SiteNameOnlyResponder: input HANYA berisi nama/ID site tanpa tanda tanya dan tanpa kata kerja atau instruksi lain.
+  Contoh: "KEDUNGMUNDU_EP", "PSBAWANG_TB", "14CLP0071", "TARUBATANG_PL".
+""",
+    "CatatNotulensi": """
+- CatatNotulensi: mencatat, menambahkan, atau menyimpan catatan baru berbasis teks.
+  Contoh: "tolong catat", "catat site cilacap_pl", "notulensi site cilacap_pl", "antena site rusak".
+  - Jika pengguna sebelumnya menyebut sedang audit site tertentu lalu mengirim kalimat seperti isi laporan ("baterai bocor", "trafik turun di jam 9 pagi"), gunakan CatatNotulensi untuk menambah catatan, bukan deteksi site baru.
+  - Pernyataan keluhan teknis tanpa tanda tanya ("tower kurang tinggi, sinyal hilang", "baterai lemah") adalah tugas CatatNotulensi, BUKAN JawabRAG.
+  - Jika pengguna mengetik cukup, teruskan juga ke CatatNotulensi untuk menutup sesi pencatatan.
+  - Jangan gunakan CatatNotulensi jika pengguna hanya menyebut nama site.
+""",
+    "UpdateStatusCatatan": """
+- UpdateStatusCatatan: pengguna mengatakan masalah/gangguan sudah selesai, diperbaiki, atau teratasi.
+  Contoh: "gangguan trafik site cilacap_pl sudah selesai", "baterai site ini sudah diganti", "gangguan sinyal sudah diperbaiki".
+""",
+    "TampilkanNotulensi": """
+- TampilkanNotulensi: input mengandung "tampilkan", "lihat", atau "baca" DAN "catatan", "notulensi", atau "laporan"; juga jika pengguna hanya mengetik "lanjut" (halaman berikutnya).
+  Contoh: "tampilkan catatan site purbalingga_pl", "lihat catatan 10 juli".
+  JANGAN gunakan TampilkanNotulensi jika input hanya nama site seperti "TARUBATANG_PL" atau "14CLP0071".
+""",
+    "RekapCatatan": """
+- RekapCatatan: rekap catatan mingguan, bulanan, atau rentang tanggal ("rekap minggu ini", "rekap bulan juli").
+""",
+    "SimpanFile": """
+- SimpanFile: pengguna sudah mengunggah file dan ingin menyimpannya ke sistem.
+""",
+    "UnggahDokumen": """
+- UnggahDokumen: HANYA jika pengguna menyatakan ingin mengirim dokumen ("unggah", "upload", "kirim file", "saya mau upload"); jangan berasumsi dari input pendek seperti "dokumen site xxx".
+""",
+    "JawabRAG": """
+- JawabRAG: pertanyaan (ada tanda tanya) atau permintaan informasi dari catatan/dokumen: site mana yang mengalami masalah tertentu, apakah masalah sudah diperbaiki, gangguan di site tertentu.
+  Jika input mengandung kata perintah "sebutkan", "berikan", "tunjukkan", "daftar" → gunakan JawabRAG.
+""",
+}
+
+PROMPT_PENUTUP = """
+🧪 Contoh valid:
+Pertanyaan: tampilkan catatan site SINGKIL_EP
+Thought: Pengguna ingin menampilkan catatan site tersebut.
+Action: TampilkanNotulensi
+Action Input: tampilkan catatan site SINGKIL_EP
+
+📜 Riwayat percakapan sebelumnya (chat_history):
+{chat_history}
+
+Pertanyaan: {input}
+{agent_scratchpad}
+"""
+
+
+def buat_supervisor_prompt(tools: list) -> PromptTemplate:
+    """
+    Susun prompt supervisor hanya dengan aturan untuk tool yang terdaftar.
+    """
+    template = susun_template(
+        PROMPT_PEMBUKA,
+        ATURAN_TOOL,
+        [tool.name for tool in tools],
+        PROMPT_PENUTUP,
+        aturan_umum=(ATURAN_KONTEKS_SITE,),
+    )
+    return PromptTemplate(
+        input_variables=["input", "agent_scratchpad", "tools", "tool_names", "chat_history"],
+        template=template,
+    )
+
 
 def create_supervisor_agent(
     researcher_agent: AgentExecutor,
@@ -63,13 +170,7 @@ def create_supervisor_agent(
     print("👔 Membuat Supervisor Agent...")
 
     print("📡 Menyiapkan LLM untuk supervisor...")
-    llm = ChatOpenAI(
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        openai_api_base="https://openrouter.ai/api/v1",
-        openai_api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-        temperature=0.2,
-        max_retries=5
-    )
+    llm = get_llm("supervisor")
 
 
     tools =[
@@ -136,7 +237,8 @@ def create_supervisor_agent(
         Tool(
              name="TampilkanNotulensi",
             func=lambda action_input: notulensi_teks_agent.invoke({"input": str(action_input)}),
-            description="Gunakan untuk menampilkan kembali notulensi yang pernah disimpan. Contoh: 'tampilkan notulensi site cilacap_pl', 'lihat catatan 10 juli'.",
+            description=("Gunakan untuk menampilkan kembali notulensi yang pernah disimpan. Contoh: 'tampilkan notulensi site cilacap_pl', 'lihat catatan 10 juli'."
+            " Gunakan juga jika pengguna hanya mengetik 'lanjut' untuk melihat halaman catatan berikutnya."),
             return_direct=True
 
         ),
@@ -183,113 +285,7 @@ def create_supervisor_agent(
 
     ]
 
-    supervisor_prompt = PromptTemplate(
-    input_variables=["input", "agent_scratchpad", "tools", "tool_names", "chat_history"],
-    template="""
-    📜 Riwayat percakapan sebelumnya (chat_history):
-{chat_history}
-
----
-Jawab pertanyaan pengguna berikut dengan sebaik mungkin. Anda memiliki akses ke tool di bawah ini:
-
-{tools}
-
-📌 Jika pengguna TIDAK menyebut nama site secara eksplisit, periksa chat_history di bawah ini. Jika percakapan sebelumnya menyebutkan site (misalnya "KEDUNGMUNDU_EP"), asumsikan bahwa pertanyaan saat ini merujuk pada site tersebut. Misalnya:
-
-- Pertanyaan: "berapa throughput-nya?"
-- Site terakhir dalam chat_history: "KEDUNGMUNDU_EP"
-- Maka tool dan input yang digunakan adalah: DataSiteQuery → "berapa throughput site KEDUNGMUNDU_EP"
-
-📌 Jika pengguna MENYEBUTKAN SITE SECARA EKSPLISIT (misal site id 14XXX atau nama site), anggap itu sebagai site konteks AKTIF untuk semua pertanyaan lanjutan, tanpa perlu melihat memory.”
-
-Gunakan format berikut dengan sangat teliti:
-
-Pertanyaan: Pertanyaan yang harus Anda jawab
-Thought: Anda harus selalu berpikir tentang apa yang harus dilakukan.
-Action: Nama tool yang akan digunakan, harus salah satu dari [{tool_names}]
-Action Input: Input untuk tool tersebut
-Observation: Hasil dari eksekusi tool
-... (Urutan ini bisa berulang)
-
-Thought: Saya sekarang sudah tahu jawaban akhirnya.
-Final Answer: Jawaban akhir untuk pertanyaan asli dari pengguna
-
-📌 Panduan memilih tool:
-- Gunakan TampilkanRiwayat jika pengguna ingin melihat isi percakapan sebelumnya.
-  Contoh: "apa yang pernah aku tanya", "tampilkan riwayat", "apa pernah aku bahas tentang cilacap?"
-- Gunakan SiteResearcher jika pertanyaan berkaitan dengan pencarian daftar site, **site ID, atau mencocokkan **nama site ↔ ID site. Contoh: "daftar site di Purbalingga", "apa site ID dari purbalingga_mt", "site apa saja di Kabupaten X", "site apa saja di Semarang", "site di bawang?", "nama site wonotunggal?", "site wonotunggal?", "site gemuh?", "site id 15SMN01?", "site 15SMN01?", "site purbalingga?".
-- Gunakan SiteLocation jika pertanyaan menanyakan detail lokasi, *koordinat, **micro cluster, **konfigurasi ran* atau region/sales area dari site yang sudah diketahui namanya atau ID-nya. Contoh: "di mana lokasi site purbalingga_mt", "koordinat site 14PBG0060", "region site ini di mana?", "konfigurasi ran CILACAP1_PL", JUMLAH SITE per kabupaten (contoh: "berapa site di Klaten?", "di semarang ada berapa site?", "total jumlah site di klaten?").
-- Gunakan SiteInfoQuery jika pertanyaan menyangkut data teknis site dasar seperti azimuth antenna, antenna height, transport, dan hub type. Contoh: "berapa azimuth site RNGASPENDAWA_MT", "apa hub type site ini?", JUMLAH SITE per tipe hub (contoh: "berapa jumlah site yang bertipe hub small hub site?", "berapa jumlah site yang bertipe hub end site?", "total jumlah site tipe small hub site ?").
-- Gunakan DataSiteQuery jika pertanyaan menyangkut data numerik site VLR, traffic, throughput, enodeb_id, resource atau revenue. Contoh: "berapa traffic im3 site KLUMIH", "enodeb_id dari site BAWANG", "resource site KARANGDADAP_PEKALONGAN_TB"
-- Gunakan SiteNameOnlyResponder jika pengguna hanya menyebutkan nama site saja, tanpa menyampaikan pertanyaan. Contoh: "KEDUNGMUNDU_EP", "PSBAWANG_TB", "14CLP0071". JANGAN GUNAKAN TOOL INI JIKA ADA PERTANYAAN SEPERTI "site id 15YOG01?", "site gemuh?", "site batang?" (ini tugas agent researcher)
--JIKA PENGGUNA BERTANYA "SITE GEMUH"?, "site 15YOG01?","site 15SMN01?" GUNAKAN AGENT RESEARCHER JANGAN MENGARAHKAN KE TOOL SiteNameOnlyResponder, TOOL ini jika pengguna hanya menyebutkan nama site seperti, "PURBALINGGA_PL", "14PBG0063"!!!
-- JIKA PERTANYAAN MENGANDUNG "site 15YOG01?","site 15SMN01? JANGAN ARAHKAN KE TOOL SiteNameOnlyResponder, TOOL ini jika pengguna hanya menyebutkan nama site yang tidak terdapat tanda tanya seperti, "PURBALINGGA_PL", "14PBG0063"!!!
-🚨 PRIORITAS:
-
-Jika input MENGANDUNG kata seperti "tampilkan", "lihat", atau "baca"
-DAN juga MENGANDUNG kata seperti "catatan", "notulensi", atau "laporan",
-MAKA gunakan tool TampilkanNotulensi.
-
-Jika input HANYA BERISI satu kata atau frasa yang merupakan nama site, tanpa kata kerja atau instruksi lainnya,
-MAKA gunakan tool SiteNameOnlyResponder — karena pengguna hanya menyebut nama site saja.
-
-📌 JANGAN gunakan TampilkanNotulensi jika input hanya seperti: "TARUBATANG_PL", "14CLP0071", "site kedungmundu_mt".
-
-Contoh:
-- Input: TARUBATANG_PL → gunakan SiteNameOnlyResponder
-- Input: tampilkan catatan site TARUBATANG_PL → gunakan TampilkanNotulensi
-
-
-🧪 Contoh valid:
-Pertanyaan: tampilkan catatan site SINGKIL_EP
-Thought: Input ini hanya berisi nama site tanpa permintaan mencatat, maka asumsikan pengguna ingin menampilkan catatan site tersebut.
-Action: TampilkanNotulensi
-Action Input: tampilkan catatan site SINGKIL_EP
-
-- Gunakan CatatNotulensi :
-   - jika perintah untuk mencatat isi notulensi berbasis teks. Contoh: 'tolong catat', 'catat site','notulensi site cilacap_pl', 'simpan catatan audit', 'Antena site rusak'."
-   - Jika pengguna sebelumnya menyebutkan sedang audit site tertentu (misalnya "tolong saya sedang audit site CILACAP_PL"),
-dan selanjutnya dia memberikan kalimat yang tampak seperti isi laporan atau notulensi (contoh: "Antena site rusak"),
-maka gunakan tool CatatNotulensi untuk menambahkan catatan, bukan mengulang deteksi site baru.
-    - Jika isi catatan seperti 'trafik turun di jam 9 pagi' GUNAKAN tool CatatNotulensi BUKAN tool DatasiteQuery
-    - JANGAN GUNAKAN TampilkanNotulensi jika pertanyaan untuk MENAMPILKAN KEMBALI NOTULENSI YANG PERNAH DISIMPAN. Contoh: 'tampilkan notulensi site cilacap_pl', 'lihat catatan 10 juli'."
-📌 Khusus untuk CatatNotulensi:
-- Jika pengguna hanya mengirim kalimat biasa (contoh: 'tegangan pln tinggi', 'baterai bocor', 'antena rusak'), hasil dari tool adalah:
-  "📝 Catatan diterima. Ada lagi yang ingin dicatat? Ketik cukup jika selesai."
-
-- Gunakan TampilkanNotulensi jika pertanyaan untuk MENAMPILKAN KEMBALI NOTULENSI YANG PERNAH DISIMPAN. Contoh: 'tampilkan notulensi site cilacap_pl', 'lihat catatan 10 juli'."
-- Jika pengguna mengajukan pertanyaan seperti "tampilkan catatan site purbalingga_pl", maka gunakan tool TampilkanNotulensi
-
-  ❗JANGAN buat Final Answer dulu. Tunggu sampai pengguna mengetik cukup.
-
-- Hanya jika pengguna mengetik cukup, gunakan tool SimpanCatatanNotulensi, dan barulah buat Final Answer dari hasilnya.
--Gunakan SimpanFile jika pengguna sudah mengunggah file dan ingin menyimpannya ke sistem.
-- Gunakan TampilkanDokumen jika pengguna menyebut "tampilkan", "lihat", "buka", atau "akses" dokumen atau file tertentu, bahkan jika tidak menyebut kata 'file' secara eksplisit.
-- Gunakan UnggahDokumen *hanya jika pengguna menyatakan ingin mengirim dokumen, seperti "unggah", "upload", "kirim file", atau menyebut "saya mau upload" — *hindari asumsi default berdasarkan input pendek seperti 'dokumen site xxx'.
-- Gunakan **JAWABRAG** jika pertanyaan menyangkut:
-  - site mana saja yang mengalami masalah tertentu.
-  - apakah masalah tertentu sudah diperbaiki atau belum.
-  - JANGAN GUNAKAN **JAWABRAG** untuk menangani pernyataan seperti "tower kurang tinggi, sinyal hilang", "baterai lemah", INI MERUPAKAN TUGAS *CatatNotulensi*!!
-  - Jika input mengandung kata perintah seperti "sebutkan", "berikan", "tunjukkan", "daftar" → gunakan tool **JawabRAG**.
-
-
-📌 Berikut beberapa aturan penting:
-- Jika pengguna ingin melihat, menampilkan, membaca catatan notulensi, gunakan tool TampilkanNotulensi.
-- Jika pengguna ingin mencatat, menambahkan, menyimpan catatan baru, gunakan tool CatatNotulensi.
-- Jangan gunakan CatatNotulensi jika permintaan pengguna hanya menyebut nama site, karena itu bisa berarti ingin melihat catatan yang sudah ada.
-- Gunakan UpdateStatusCatatan jika pengguna mengatakan bahwa masalah, gangguan, atau kendala sudah selesai, diperbaiki, atau teratasi. 
-  Contoh: 
-  - "gangguan trafik site cilacap_pl sudah selesai" 
-  - "baterai site ini sudah diganti" 
-  - "gangguan sinyal sudah diperbaiki"
-
-
-
-Pertanyaan: {input}
-{agent_scratchpad}
-"""
-)
-
+    supervisor_prompt = daftarkan_prompt("supervisor", buat_supervisor_prompt(tools), tools)
 
     agent = create_react_agent(
         llm=llm,
@@ -0,0 +1,108 @@
+# bench_embeddings.py
+# Bandingkan backend embedding PyTorch vs ONNX int8: throughput (chunks/s),
+# RAM (RSS puncak per proses) dan kesesuaian hasil retrieval.
+# Jalankan: python bench_embeddings.py --n 2000 --batch-size 64 --threads 4
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+MASALAH = [
+    "baterai soak", "rru rusak", "tegangan pln tinggi", "genset turun", "antena miring",
+    "sinyal lemah", "trafik turun", "interferensi uplink", "kabel feeder rusak", "suhu shelter tinggi",
+]
+KETERANGAN = [
+    "sudah dicek teknisi", "menunggu sparepart", "perlu kunjungan ulang", "dilaporkan ke NOC",
+    "terjadi sejak pagi", "berulang tiap malam",
+]
+
+
+def buat_korpus(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        f"site {rng.choice(['maos_ep', 'cilacap_pl', 'dermasari_pl', 'purbayan_pl'])}_{i % 97}: "
+        f"{rng.choice(MASALAH)}, {rng.choice(KETERANGAN)}"
+        for i in range(n)
+    ]
+
+
+def rss_puncak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(backend: str, n: int, out_path: str):
+    from tools.tools_embeddings import get_embeddings
+
+    rss_awal = rss_puncak_mb()
+    model = get_embeddings(backend)
+    korpus = buat_korpus(n)
+    model.embed_documents(korpus[:32])  # warm-up
+
+    start = time.perf_counter()
+    vectors = np.asarray(model.embed_documents(korpus), dtype="float32")
+    durasi = time.perf_counter() - start
+    np.save(out_path, vectors)
+    print(json.dumps({
+        "backend": backend,
+        "chunks_per_s": n / durasi,
+        "rss_mb": rss_puncak_mb(),
+        "rss_model_mb": rss_puncak_mb() - rss_awal,
+    }))
+
+
+def top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend embedding.")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--worker", choices=["torch", "onnx"])
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.n, args.out)
+        return
+
+    env = dict(os.environ, ONNX_BATCH_SIZE=str(args.batch_size), ONNX_INTRA_OP_THREADS=str(args.threads))
+    hasil, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("torch", "onnx"):
+            out = os.path.join(tmp, f"{backend}.npy")
+            # Proses terpisah supaya RSS tiap backend terukur sendiri-sendiri
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", backend, "--n", str(args.n), "--out", out],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            hasil[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(out)
+
+    print(f"{'backend':<8} {'chunks/s':>10} {'RSS MB':>8} {'model MB':>9}")
+    for backend, row in hasil.items():
+        print(f"{backend:<8} {row['chunks_per_s']:>10.1f} {row['rss_mb']:>8.0f} {row['rss_model_mb']:>9.0f}")
+
+    torch_v, onnx_v = vectors["torch"], vectors["onnx"]
+    cosine = np.sum(torch_v * onnx_v, axis=1)
+    queries = np.arange(0, args.n, max(1, args.n // 100))
+    top_torch = top_k(torch_v, torch_v[queries], args.k)
+    top_onnx = top_k(onnx_v, onnx_v[queries], args.k)
+    overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top_torch, top_onnx)])
+
+    print(f"\n🔁 Cosine torch↔onnx: rata-rata {cosine.mean():.4f}, minimum {cosine.min():.4f}")
+    print(f"🎯 Overlap top-{args.k} retrieval: {overlap:.3f}")
+    print(f"🚀 Speedup ONNX: {hasil['onnx']['chunks_per_s'] / hasil['torch']['chunks_per_s']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
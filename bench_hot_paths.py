@@ -0,0 +1,247 @@
+# bench_hot_paths.py
+# Micro-benchmark jalur panas parsing/format yang murni Python: input sintetis
+# tetap dengan ukuran bertingkat, waktu per panggilan + puncak memori
+# (tracemalloc), dan baseline JSON dengan ambang regresi.
+# Jalankan: python bench_hot_paths.py [--ukuran 10,100,1000] [--kasus parse_catatan_teks,...]
+#           [--simpan-baseline] [--toleransi 0.25] [--toleransi-memori 0.25]
+# Exit code 1 jika ada kasus yang melewati ambang baseline, 2 jika baseline
+# belum ada (buat dulu dengan --simpan-baseline di mesin yang sama).
+import os
+import sys
+import json
+import platform
+import argparse
+import tempfile
+import timeit
+import tracemalloc
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from tools.tools_dokumen import parse_catatan_teks, parse_blok_umum, extract_text_from_pdf, extract_text_from_docx
+from tools.tools_notulensi_teks import segmentasi_catatan, format_notulensi_to_markdown, susun_rekap
+from tools.tools_researcher import ekstrak_keyword_site, koreksi_nama_site
+from generate_synthetic_data import (
+    buat_sites, iter_catatan_site, format_emoji, format_emoji_aktif, format_emoji_satu_baris,
+    format_label, format_blok, tulis_docx, tulis_pdf,
+)
+
+# === Konfigurasi ===
+BASELINE_PATH = "bench_hot_paths_baseline.json"
+UKURAN_DEFAULT = (10, 100, 1000)
+SEED = 7
+SAMPAI = date(2025, 8, 1)  # tanggal tetap supaya input sama di setiap run
+RENTANG_HARI = 365
+REPEAT = 5
+SITE_CONTOH = "purbayan_pl"
+QUERY_SITE = [
+    "daftar site di purbayan", "site id 14PBG", "nama site kembaran yang ada",
+    "cari site sokaraj", "lokasi site ajibarang_pl", "site apa saja di wilayah majenang",
+]
+
+
+# === Input sintetis ===
+def _catatan(n: int) -> list:
+    return list(iter_catatan_site(SITE_CONTOH, n, SEED, SAMPAI, RENTANG_HARI))
+
+
+def _teks_campuran(n: int) -> str:
+    # Semua format yang dikenali parse_catatan_teks dalam satu dokumen
+    catatan = _catatan(n)
+    per_format = max(1, n // 4)
+    bagian = [
+        format_emoji(SITE_CONTOH, catatan[:per_format]),
+        format_emoji_aktif(SITE_CONTOH, catatan[per_format:2 * per_format]),
+        format_emoji_satu_baris(SITE_CONTOH, catatan[2 * per_format:3 * per_format]),
+        format_label(SITE_CONTOH, catatan[3 * per_format:]),
+    ]
+    return "\n".join("\n".join(b) for b in bagian)
+
+
+def _pesan_catat(n: int) -> str:
+    kalimat = [c["isi_catatan"].rstrip(".") for c in _catatan(n)]
+    return f"catat site {SITE_CONTOH} " + ". ".join(kalimat) + "."
+
+
+def _teks_tampilan(n: int) -> str:
+    # Bentuk yang disusun tampilkan_notulensi sebelum format_notulensi_to_markdown
+    hasil = [f"📑 **Catatan Site {SITE_CONTOH.upper()}** (halaman 1, terbaru dulu):\n"]
+    for c in _catatan(n):
+        simbol = "✅" if c["status"] == "selesai" else "⏳"
+        hasil.append(f"📅 {c['tanggal']} - ⏰ {c['jam']}\n{simbol} {c['isi_catatan']}\n")
+    return "\n".join(hasil)
+
+
+def _rows_rekap(n: int) -> list:
+    sites = [nama for _, nama in buat_sites(max(1, n // 20), SEED)]
+    per_site = max(1, n // len(sites))
+    rows = []
+    for site in sites:
+        for c in iter_catatan_site(site, per_site, SEED, SAMPAI, RENTANG_HARI):
+            rows.append((site, c["tanggal"], c["jam"], c["isi_catatan"], c["status"], c["tanggal_selesai"]))
+    return rows
+
+
+def _file_contoh(n: int, ext: str, tmp_dir: str) -> str:
+    path = os.path.join(tmp_dir, f"bench_{n}{ext}")
+    baris = format_label(SITE_CONTOH, _catatan(n))  # latin-1, aman untuk font bawaan FPDF
+    (tulis_pdf if ext == ".pdf" else tulis_docx)(path, baris)
+    return path
+
+
+def _katalog_site(n: int) -> list:
+    return [nama for _, nama in buat_sites(n, SEED)]
+
+
+def _cari_site(names: list):
+    for query in QUERY_SITE:
+        keyword = ekstrak_keyword_site(query)
+        koreksi_nama_site(keyword, names)
+
+
+def daftar_kasus(tmp_dir: str) -> dict:
+    """
+    nama → (siapkan(n) -> input, jalankan(input)). Waktu siapkan tidak diukur.
+    """
+    awal, akhir = date(SAMPAI.year - 1, SAMPAI.month, SAMPAI.day), SAMPAI
+    return {
+        "parse_catatan_teks": (_teks_campuran, parse_catatan_teks),
+        "parse_blok_umum": (lambda n: "\n".join(format_blok(SITE_CONTOH, _catatan(n))), parse_blok_umum),
+        "segmentasi_catatan": (_pesan_catat, lambda q: segmentasi_catatan(q, "Friday, 01 August 2025", "10:00:00")),
+        "format_notulensi_to_markdown": (_teks_tampilan, format_notulensi_to_markdown),
+        "susun_rekap": (_rows_rekap, lambda rows: susun_rekap(rows, awal, akhir)),
+        "extract_text_from_pdf": (lambda n: _file_contoh(n, ".pdf", tmp_dir), extract_text_from_pdf),
+        "extract_text_from_docx": (lambda n: _file_contoh(n, ".docx", tmp_dir), extract_text_from_docx),
+        "cari_site_fuzzy": (_katalog_site, _cari_site),
+    }
+
+
+# === Pengukuran ===
+def ukur_waktu(fungsi, data, repeat: int = REPEAT) -> float:
+    """
+    ms per panggilan (minimum dari beberapa repeat, jumlah panggilan per
+    repeat dipilih otomatis supaya satu repeat ≥ 0.2 s).
+    """
+    timer = timeit.Timer(lambda: fungsi(data))
+    jumlah, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=jumlah)) / jumlah * 1000
+
+
+def ukur_memori(fungsi, data) -> float:
+    """
+    Puncak alokasi (KiB) selama satu panggilan; dijalankan terpisah dari
+    pengukuran waktu karena tracemalloc memperlambat eksekusi.
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fungsi(data)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def jalankan(kasus: dict, ukuran: list, repeat: int) -> dict:
+    hasil = {}
+    print(f"{'kasus':<32} {'n':>6} {'ms/panggilan':>14} {'puncak KiB':>12}")
+    for nama, (siapkan, fungsi) in kasus.items():
+        for n in ukuran:
+            data = siapkan(n)
+            fungsi(data)  # pemanasan: regex compile, cache modul
+            ms = ukur_waktu(fungsi, data, repeat)
+            kib = ukur_memori(fungsi, data)
+            hasil[f"{nama}[{n}]"] = {"ms": round(ms, 4), "peak_kib": round(kib, 1)}
+            print(f"{nama:<32} {n:>6} {ms:>14.3f} {kib:>12.1f}")
+    return hasil
+
+
+# === Baseline ===
+def muat_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("hasil", {})
+    except FileNotFoundError:
+        return {}
+
+
+def simpan_baseline(path: str, hasil: dict):
+    data = {
+        "dibuat": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "hasil": hasil,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def bandingkan(hasil: dict, baseline: dict, toleransi: float, toleransi_memori: float) -> list:
+    """
+    Kembalikan daftar kasus yang lebih lambat / lebih boros memori dari
+    baseline melebihi toleransi (rasio, 0.25 = 25%).
+    """
+    regresi = []
+    print(f"\n{'kasus':<40} {'waktu':>10} {'memori':>10}")
+    for key, nilai in hasil.items():
+        dasar = baseline.get(key)
+        if not dasar:
+            print(f"{key:<40} {'(baru)':>10}")
+            continue
+        rasio_ms = nilai["ms"] / dasar["ms"] if dasar["ms"] else 1.0
+        rasio_mem = nilai["peak_kib"] / dasar["peak_kib"] if dasar["peak_kib"] else 1.0
+        lambat = rasio_ms > 1 + toleransi
+        boros = rasio_mem > 1 + toleransi_memori
+        tanda = " ❌" if lambat or boros else ""
+        print(f"{key:<40} {rasio_ms:>9.2f}x {rasio_mem:>9.2f}x{tanda}")
+        if lambat or boros:
+            regresi.append(key)
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark jalur panas parsing dan format notulensi.")
+    parser.add_argument("--ukuran", default=",".join(map(str, UKURAN_DEFAULT)), help="Ukuran input, pisahkan dengan koma.")
+    parser.add_argument("--kasus", help="Hanya jalankan kasus tertentu, pisahkan dengan koma.")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--simpan-baseline", action="store_true", help="Tulis hasil run ini sebagai baseline baru.")
+    parser.add_argument("--toleransi", type=float, default=0.25, help="Ambang regresi waktu (rasio).")
+    parser.add_argument("--toleransi-memori", type=float, default=0.25, help="Ambang regresi puncak memori (rasio).")
+    args = parser.parse_args()
+
+    ukuran = [int(u) for u in args.ukuran.split(",") if u.strip()]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kasus = daftar_kasus(tmp_dir)
+        if args.kasus:
+            dipilih = [k.strip() for k in args.kasus.split(",") if k.strip()]
+            tidak_dikenal = [k for k in dipilih if k not in kasus]
+            if tidak_dikenal:
+                print(f"❌ Kasus tidak dikenal: {', '.join(tidak_dikenal)}. Pilihan: {', '.join(kasus)}")
+                sys.exit(2)
+            kasus = {k: kasus[k] for k in dipilih}
+
+        print(f"📏 {len(kasus)} kasus x ukuran {ukuran}, {args.repeat} repeat\n")
+        hasil = jalankan(kasus, ukuran, args.repeat)
+
+    if args.simpan_baseline:
+        # Gabung dengan baseline lama supaya run parsial tidak menghapus kasus lain
+        simpan_baseline(args.baseline, {**muat_baseline(args.baseline), **hasil})
+        print(f"\n✅ Baseline disimpan ke {args.baseline}")
+        return
+
+    baseline = muat_baseline(args.baseline)
+    if not baseline:
+        print(f"\n❌ Baseline {args.baseline} belum ada. Jalankan dengan --simpan-baseline.")
+        sys.exit(2)
+    regresi = bandingkan(hasil, baseline, args.toleransi, args.toleransi_memori)
+    if regresi:
+        print(f"\n❌ {len(regresi)} kasus melewati ambang regresi: {', '.join(regresi)}")
+        sys.exit(1)
+    print("\n✅ Tidak ada regresi terhadap baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_rerank.py
+# Ukur efek tahap rerank cross-encoder pada konteks RAG: token konteks yang
+# dihemat per jawaban vs waktu rerank tambahan, plus recall istilah relevan.
+# Jalankan: python bench_rerank.py --data rag_eval_questions.jsonl --k 8
+import argparse
+import json
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from tools.tools_rag import retrieve_documents
+from tools.tools_rerank import (
+    RERANK_CANDIDATES, RERANK_MIN_SCORE, RERANK_TOP_N, get_reranker, rerank,
+)
+from eval_retrieval import persentil, recall_at_k
+from prompt_utils import hitung_token
+
+
+def token_konteks(docs: list) -> int:
+    return hitung_token("\n".join(doc.page_content for doc in docs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token konteks dihemat vs waktu rerank.")
+    parser.add_argument("--data", default="rag_eval_questions.jsonl")
+    parser.add_argument("--k", type=int, default=8, help="k baseline tanpa rerank")
+    parser.add_argument("--kandidat", type=int, default=RERANK_CANDIDATES)
+    parser.add_argument("--top-n", type=int, default=RERANK_TOP_N)
+    parser.add_argument("--min-score", type=float, default=RERANK_MIN_SCORE)
+    parser.add_argument("--mode", default=None, choices=["vector", "lexical", "hybrid"])
+    args = parser.parse_args()
+
+    with open(args.data, encoding="utf-8") as f:
+        dataset = [json.loads(line) for line in f if line.strip()]
+    get_reranker()  # jangan hitung waktu load model
+
+    baris = []
+    for item in dataset:
+        pertanyaan = item["pertanyaan"]
+        baseline = retrieve_documents(pertanyaan, k=args.k, mode=args.mode)
+        kandidat = retrieve_documents(pertanyaan, k=max(args.k, args.kandidat), mode=args.mode)
+
+        start = time.perf_counter()
+        terpilih = rerank(pertanyaan, kandidat, top_n=args.top_n, min_score=args.min_score)
+        rerank_ms = (time.perf_counter() - start) * 1000
+
+        baris.append({
+            "token_baseline": token_konteks(baseline),
+            "token_rerank": token_konteks(terpilih),
+            "dok_rerank": len(terpilih),
+            "rerank_ms": rerank_ms,
+            "recall_baseline": recall_at_k(baseline, item["relevan"]),
+            "recall_rerank": recall_at_k(terpilih, item["relevan"]),
+        })
+
+    hemat = [b["token_baseline"] - b["token_rerank"] for b in baris]
+    latensi = [b["rerank_ms"] for b in baris]
+    print(f"📋 {len(baris)} pertanyaan, baseline k={args.k}, rerank {args.kandidat}→top {args.top_n} (skor ≥ {args.min_score})\n")
+    print(f"{'':<22} {'baseline':>10} {'rerank':>10}")
+    print(f"{'token konteks (rata2)':<22} {statistics.mean(b['token_baseline'] for b in baris):>10.0f} "
+          f"{statistics.mean(b['token_rerank'] for b in baris):>10.0f}")
+    print(f"{'dokumen (rata2)':<22} {args.k:>10} {statistics.mean(b['dok_rerank'] for b in baris):>10.1f}")
+    print(f"{'recall istilah':<22} {statistics.mean(b['recall_baseline'] for b in baris):>10.3f} "
+          f"{statistics.mean(b['recall_rerank'] for b in baris):>10.3f}")
+    print()
+    print(f"💾 Token dihemat per jawaban: rata2 {statistics.mean(hemat):.0f}, p50 {persentil(hemat, 50):.0f}")
+    print(f"⏱️ Waktu rerank: p50 {persentil(latensi, 50):.1f} ms, p95 {persentil(latensi, 95):.1f} ms")
+    if statistics.mean(latensi):
+        print(f"📈 Token dihemat per ms rerank: {statistics.mean(hemat) / statistics.mean(latensi):.1f}")
+
+
+if __name__ == "__main__":
+    main()
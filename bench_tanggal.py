@@ -0,0 +1,65 @@
+# bench_tanggal.py
+# Micro-benchmark parser tanggal: jalur cepat + memo vs dateparser/dateutil.
+# Jalankan: python bench_tanggal.py [jumlah_iterasi]
+import sys
+import timeit
+
+from tools.tools_tanggal import parse_tanggal, _parse_cepat, _parse_cached, normalisasi_teks_tanggal
+
+SAMPEL = [
+    "Monday, 04 August 2025",
+    "Tuesday, 22 July 2025",
+    "Senin, 4 Agustus 2025",
+    "10 juli",
+    "1 agustus 2025",
+    "04/08/2025",
+    "31-12-2024",
+    "2025-08-04",
+]
+
+
+def _ukur(nama, fungsi, iterasi):
+    total = timeit.timeit(lambda: [fungsi(s) for s in SAMPEL], number=iterasi)
+    per_call_us = total / (iterasi * len(SAMPEL)) * 1e6
+    print(f"{nama:<28} {per_call_us:>10.2f} µs/panggilan")
+    return per_call_us
+
+
+def main():
+    iterasi = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"📏 {len(SAMPEL)} sampel x {iterasi} iterasi\n")
+
+    hasil = {}
+    hasil["fast path (tanpa cache)"] = _ukur(
+        "fast path (tanpa cache)",
+        lambda s: _parse_cepat(normalisasi_teks_tanggal(s), 2025),
+        iterasi,
+    )
+    _parse_cached.cache_clear()
+    hasil["parse_tanggal (memo)"] = _ukur("parse_tanggal (memo)", parse_tanggal, iterasi)
+
+    try:
+        from dateutil.parser import parse as parse_date
+        hasil["dateutil.parse"] = _ukur(
+            "dateutil.parse", lambda s: parse_date(s, dayfirst=True, fuzzy=True), max(1, iterasi // 10)
+        )
+    except ImportError:
+        print("⚠️ dateutil tidak terpasang, dilewati.")
+
+    try:
+        import dateparser
+        hasil["dateparser.parse"] = _ukur(
+            "dateparser.parse", lambda s: dateparser.parse(s, languages=["id", "en"]), max(1, iterasi // 100)
+        )
+    except ImportError:
+        print("⚠️ dateparser tidak terpasang, dilewati.")
+
+    baseline = hasil.get("dateparser.parse")
+    if baseline:
+        print()
+        for nama, nilai in hasil.items():
+            print(f"🚀 {nama:<28} {baseline / nilai:>8.1f}x lebih cepat dari dateparser")
+
+
+if __name__ == "__main__":
+    main()
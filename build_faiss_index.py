@@ -0,0 +1,62 @@
+# build_faiss_index.py
+# Bangun index FAISS lokal dari koleksi PGVector yang sudah ada (tanpa embed ulang).
+# Jalankan: python build_faiss_index.py [--batch-size 10000]
+import argparse
+import json
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from db_utils import get_db_connection
+from tools.tools_rag import COLLECTION_NAME, get_faiss_store
+
+
+def _parse_vector(raw):
+    # kolom pgvector dikembalikan psycopg2 sebagai teks "[0.1,0.2,...]"
+    return json.loads(raw) if isinstance(raw, str) else list(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sinkronisasi awal PGVector → FAISS.")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    store = get_faiss_store()
+    if store.ntotal:
+        print(f"⚠️ Index FAISS sudah berisi {store.ntotal} vektor. Hapus folder {store.directory} untuk membangun ulang.")
+        return
+
+    start = time.perf_counter()
+    total = 0
+    conn = get_db_connection()
+    try:
+        with conn.cursor(name="faiss_sync") as cur:
+            cur.itersize = args.batch_size
+            cur.execute("""
+                SELECT e.document, e.cmetadata, e.embedding::text
+                FROM langchain_pg_embedding e
+                JOIN langchain_pg_collection c ON c.uuid = e.collection_id
+                WHERE c.name = %s
+            """, (COLLECTION_NAME,))
+            while True:
+                rows = cur.fetchmany(args.batch_size)
+                if not rows:
+                    break
+                store.add_embeddings(
+                    [row[0] for row in rows],
+                    [_parse_vector(row[2]) for row in rows],
+                    [row[1] or {} for row in rows],
+                )
+                total += len(rows)
+                print(f"📦 {total} vektor disalin...")
+    finally:
+        conn.close()
+
+    store.persist()
+    print(f"✅ {total} vektor disalin ke FAISS dalam {time.perf_counter() - start:.1f} detik.")
+
+
+if __name__ == "__main__":
+    main()
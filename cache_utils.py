@@ -0,0 +1,83 @@
+# cache_utils.py
+import time
+import threading
+import weakref
+from collections import OrderedDict
+
+_MISSING = object()
+_semua_cache = weakref.WeakSet()  # untuk metrics: hit rate semua cache
+
+
+class LRUCache:
+    """
+    Cache LRU thread-safe dengan TTL opsional dan statistik hit/miss.
+    on_evict(key, value) dipanggil saat entry dibuang (kapasitas, TTL, invalidate).
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float | None = None, on_evict=None, name: str = "cache"):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        _semua_cache.add(self)
+
+    def _buang(self, key):
+        _, value = self._data.pop(key)
+        if self.on_evict:
+            try:
+                self.on_evict(key, value)
+            except Exception as e:
+                print(f"⚠️ [{self.name}] Gagal evict {key}: {e}")
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl_seconds and time.time() - entry[0] > self.ttl_seconds:
+                self._buang(key)
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (time.time(), value)
+            while len(self._data) > self.max_entries:
+                self._buang(next(iter(self._data)))
+
+    def invalidate(self, predicate):
+        """
+        Buang semua entry yang key-nya memenuhi predicate(key).
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                self._buang(key)
+
+    def clear(self):
+        self.invalidate(lambda _: True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+def semua_cache() -> list:
+    return list(_semua_cache)
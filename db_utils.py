@@ -1,11 +1,27 @@
 # db_utils.py
 import psycopg2
+import psycopg2.extensions
+import threading
+import contextvars
+import time
 from datetime import datetime
 import json
+from tracing import span
+from metrics import DB_CONNECT_LATENCY, DB_CONNECTIONS_OPENED, DB_QUERY_LATENCY, register_collector
 
 # Simpan session aktif di memory untuk caching cepat (opsional)
 user_sessions = {}
 
+# Session chat yang sedang dilayani (diset gradio_app per request). Tool
+# dipanggil tanpa user_id, jadi state per percakapan di-key dengan ini.
+_sesi_chat = contextvars.ContextVar("sesi_chat", default="default")
+
+def set_sesi_chat(session_id):
+    return _sesi_chat.set(session_id or "default")
+
+def get_sesi_chat() -> str:
+    return _sesi_chat.get()
+
 DB_CONFIG = dict(
     host="localhost",
     port=.......,
@@ -14,11 +30,54 @@ DB_CONFIG = dict(
     password=".....",
 )
 
+class TracedCursor(psycopg2.extensions.cursor):
+    """
+    Cursor yang mencatat setiap query sebagai span "db" (lihat tracing.py)
+    dan histogram latensi per jenis statement (lihat metrics.py).
+    """
+
+    def _ukur(self, nama_span, query, fn, *args):
+        sql = _ringkas_sql(query)
+        mulai = time.perf_counter()
+        try:
+            with span(nama_span, "db", statement=sql) as s:
+                hasil = fn(*args)
+                s.set(rows=self.rowcount)
+                return hasil
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - mulai, operasi=_operasi_sql(sql))
+
+    def execute(self, query, vars=None):
+        return self._ukur("db.query", query, super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._ukur("db.executemany", query, super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._ukur("db.copy", sql, super().copy_expert, sql, file, size)
+
+
+def _ringkas_sql(query) -> str:
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    return " ".join(str(query).split())
+
+
+def _operasi_sql(sql: str) -> str:
+    kata = sql.split(" ", 1)[0].lower() if sql else ""
+    return kata if kata in ("select", "insert", "update", "delete", "copy", "with", "create", "vacuum") else "lain"
+
+
 def get_db_connection():
+    mulai = time.perf_counter()
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        with span("db.connect", "db"):
+            conn = psycopg2.connect(**DB_CONFIG, cursor_factory=TracedCursor)
+        DB_CONNECT_LATENCY.observe(time.perf_counter() - mulai)
+        DB_CONNECTIONS_OPENED.inc(status="ok")
         return conn
     except Exception as e:
+        DB_CONNECTIONS_OPENED.inc(status="gagal")
         print(f"❌ Gagal koneksi ke DB: {e}")
         raise
 
@@ -155,4 +214,97 @@ def simpan_catatan_site(site_name: str, isi_catatan: str):
         cur.close()
         conn.close()
 
+def init_catatan_indexes():
+    """
+    Index untuk query agregat status (tools_status) dan filter per site.
+    """
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_catatan_site_lower_site
+                    ON catatan_site (LOWER(site_name))
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_catatan_site_status_site
+                    ON catatan_site (status, LOWER(site_name))
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_catatan_site_belum_selesai
+                    ON catatan_site (LOWER(site_name), id)
+                    WHERE status IS DISTINCT FROM 'selesai'
+                """)
+            conn.commit()
+        print("✅ Index catatan_site siap.")
+    except Exception as e:
+        print(f"⚠️ Gagal membuat index catatan_site: {e}")
+
+# ======================== DATA VERSION FUNCTIONS ========================
+# Versi data per site (in-process). Naik setiap ada penulisan ke catatan_site,
+# dipakai sebagai bagian key cache (ekspor, jawaban RAG) supaya cache
+# otomatis basi ketika catatan site berubah.
+GLOBAL_VERSION_KEY = "*"
+_data_versions = {}
+_data_version_lock = threading.Lock()
+_data_version_listeners = []
+
+def get_data_version(site_name: str | None = None) -> int:
+    key = site_name.strip().lower() if site_name else GLOBAL_VERSION_KEY
+    with _data_version_lock:
+        return _data_versions.get(key, 0)
 
+def bump_data_version(*site_names):
+    """
+    Tandai data site berubah. Versi global selalu ikut naik.
+    """
+    sites = {s.strip().lower() for s in site_names if s}
+    with _data_version_lock:
+        for key in sites | {GLOBAL_VERSION_KEY}:
+            _data_versions[key] = _data_versions.get(key, 0) + 1
+
+    for listener in list(_data_version_listeners):
+        try:
+            listener(sites)
+        except Exception as e:
+            print(f"⚠️ Listener versi data gagal: {e}")
+
+def register_data_version_listener(listener):
+    if listener not in _data_version_listeners:
+        _data_version_listeners.append(listener)
+
+
+# ======================== METRICS KONEKSI ========================
+# Belum ada connection pool: tiap get_db_connection membuka koneksi baru.
+# Pemakaian koneksi diambil dari sisi server (pg_stat_activity), di-cache
+# sebentar agar scrape tidak membuka koneksi terus-menerus.
+KONEKSI_METRICS_TTL = 15  # detik
+_koneksi_cache = {"waktu": 0.0, "families": []}
+_koneksi_lock = threading.Lock()
+
+
+@register_collector
+def _metrik_koneksi_db():
+    with _koneksi_lock:
+        if time.time() - _koneksi_cache["waktu"] < KONEKSI_METRICS_TTL:
+            return _koneksi_cache["families"]
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT COALESCE(state, 'lain'), COUNT(*)
+                    FROM pg_stat_activity
+                    WHERE datname = current_database() AND pid <> pg_backend_pid()
+                    GROUP BY 1
+                """)
+                per_state = cur.fetchall()
+                cur.execute("SHOW max_connections")
+                max_connections = int(cur.fetchone()[0])
+        finally:
+            conn.close()
+        _koneksi_cache["families"] = [
+            ("db_connections", "gauge", "Koneksi PostgreSQL ke database aplikasi per state.",
+             [({"state": state}, jumlah) for state, jumlah in per_state]),
+            ("db_connections_max", "gauge", "max_connections server PostgreSQL.", [({}, max_connections)]),
+        ]
+        _koneksi_cache["waktu"] = time.time()
+        return _koneksi_cache["families"]
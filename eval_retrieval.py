@@ -0,0 +1,58 @@
+# eval_retrieval.py
+# Evaluasi retrieval RAG (vector vs lexical vs hybrid) pada set pertanyaan berlabel.
+# Format JSONL: {"pertanyaan": "...", "relevan": ["istilah yang harus ditemukan", ...]}
+# Jalankan: python eval_retrieval.py --data rag_eval_questions.jsonl --k 4 8
+import argparse
+import json
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from tools.tools_rag import retrieve_documents
+
+MODES = ["vector", "lexical", "hybrid"]
+
+
+def recall_at_k(docs: list, relevan: list) -> float:
+    teks = "\n".join(doc.page_content.lower() + " " + str(doc.metadata.get("site_name") or "") for doc in docs)
+    ditemukan = sum(1 for istilah in relevan if istilah.lower() in teks)
+    return ditemukan / len(relevan) if relevan else 0.0
+
+
+def persentil(nilai: list, p: float) -> float:
+    urut = sorted(nilai)
+    idx = min(len(urut) - 1, int(round(p / 100 * (len(urut) - 1))))
+    return urut[idx]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluasi recall@k dan latensi retrieval RAG.")
+    parser.add_argument("--data", default="rag_eval_questions.jsonl")
+    parser.add_argument("--k", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    with open(args.data, encoding="utf-8") as f:
+        dataset = [json.loads(line) for line in f if line.strip()]
+    print(f"📋 {len(dataset)} pertanyaan berlabel dari {args.data}\n")
+
+    print(f"{'mode':<8} {'k':>3} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in args.modes:
+        for k in args.k:
+            recalls, latensi = [], []
+            for item in dataset:
+                start = time.perf_counter()
+                docs = retrieve_documents(item["pertanyaan"], k=k, mode=mode)
+                latensi.append((time.perf_counter() - start) * 1000)
+                recalls.append(recall_at_k(docs, item["relevan"]))
+            print(
+                f"{mode:<8} {k:>3} {statistics.mean(recalls):>9.3f} "
+                f"{persentil(latensi, 50):>8.1f} {persentil(latensi, 95):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
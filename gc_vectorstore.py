@@ -0,0 +1,25 @@
+# gc_vectorstore.py
+# Bersihkan embedding orphan dari koleksi vektor lalu VACUUM.
+# Jalankan: python gc_vectorstore.py [--dry-run] [--full] [--batch-size 1000]
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from tools.tools_vector_gc import GC_BATCH_SIZE, format_laporan_gc, jalankan_gc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage collection vectorstore notulensi.")
+    parser.add_argument("--dry-run", action="store_true", help="Hanya hitung orphan, tidak menghapus.")
+    parser.add_argument("--full", action="store_true", help="VACUUM FULL (mengunci tabel, mengembalikan ruang ke OS).")
+    parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE)
+    args = parser.parse_args()
+
+    laporan = jalankan_gc(dry_run=args.dry_run, full=args.full, batch_size=args.batch_size)
+    print(format_laporan_gc(laporan))
+
+
+if __name__ == "__main__":
+    main()
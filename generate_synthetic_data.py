@@ -0,0 +1,444 @@
+# generate_synthetic_data.py
+# Generator data sintetis untuk uji skala: isi tabel site_name, catatan_site
+# (lewat COPY) dan koleksi vektor notulensi (embedding per batch), plus file
+# contoh .txt/.docx/.pdf/.csv di setiap format yang dikenali parser upload.
+# Data deterministik per seed: site yang sama selalu mendapat catatan yang sama.
+# Jalankan: python generate_synthetic_data.py --sites 10000 --catatan-per-site 100 [--vektor-site 50] [--file-contoh 2]
+import os
+import csv
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, date, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import docx
+from fpdf import FPDF
+from langchain_core.documents import Document
+
+from db_utils import get_db_connection, bump_data_version
+from tools.tools_dokumen import TABLE_NAME, CSV_COPY_COLUMNS, _CsvCopyStream
+from tools.tools_rag import INDEX_BATCH_SIZE, VECTOR_BACKEND, _index_in_batches
+from tools.tools_researcher import TABLE_SITE, get_site_catalog
+
+# === Konfigurasi ===
+FILE_TYPE_SINTETIS = "sintetis"  # penanda baris catatan_site hasil generator
+TABLE_SITE_SINTETIS = "site_sintetis"  # site_id yang dibuat generator (tabel site_name tidak punya penanda)
+OUTPUT_DIR_DEFAULT = "data_sintetis"
+ENTRI_PER_DOKUMEN = 20  # catatan per "file" sumber (file_path / metadata source)
+PROPORSI_SELESAI = 0.6
+MAKS_HARI_SELESAI = 14
+
+KABUPATEN = {
+    "banyumas": "14", "cilacap": "15", "purbalingga": "16", "banjarnegara": "17",
+    "kebumen": "18", "purworejo": "19", "wonosobo": "20", "magelang": "21",
+    "semarang": "22", "kendal": "23", "pekalongan": "24", "tegal": "25",
+}
+KECAMATAN = [
+    "purbayan", "kembaran", "sokaraja", "ajibarang", "wangon", "jatilawang", "sumbang", "baturaden",
+    "kedungbanteng", "karanglewas", "majenang", "sidareja", "kroya", "adipala", "maos", "kesugihan",
+    "bukateja", "kutasari", "bobotsari", "mrebet", "susukan", "klampok", "karangkobar", "wanadadi",
+    "gombong", "karanganyar", "prembun", "kutoarjo", "bagelen", "kertek", "kalikajar", "sapuran",
+    "mertoyudan", "muntilan", "secang", "tegalrejo", "ungaran", "ambarawa", "bawen", "tengaran",
+    "kaliwungu", "boja", "weleri", "sukorejo", "kajen", "wiradesa", "kedungwuni", "bojong",
+    "slawi", "adiwerna", "dukuhturi", "pangkah", "margasari", "bumijawa", "randudongkal", "paguyangan",
+]
+JENIS_SITE = ["pl", "mt", "tb", "ep"]
+
+MASALAH = [
+    "Link transmisi {link} loss, trafik turun {persen}%",
+    "Alarm {alarm} muncul sejak pukul {jam_alarm}",
+    "Baterai rectifier drop, backup hanya bertahan {durasi} jam",
+    "VSWR tinggi di sektor {sektor}",
+    "Genset tidak start saat PLN padam",
+    "Suhu shelter mencapai {suhu} derajat, AC mati",
+    "Kabel feeder sektor {sektor} rusak digigit tikus",
+    "Throughput 4G sektor {sektor} menurun di jam sibuk",
+    "Kabel grounding hilang dicuri",
+    "Akses ke site terkendala izin warga",
+    "Jaringan 2G sering drop call di sektor {sektor}",
+    "Tegangan PLN tidak stabil, MCB sering trip",
+    "Radio {link} restart berulang, kualitas sinyal buruk",
+    "Atap shelter bocor saat hujan deras",
+    "Antena sektor {sektor} bergeser setelah angin kencang",
+]
+TINDAKAN = [
+    "Tim FLM dijadwalkan cek ke lokasi.",
+    "Sudah dieskalasi ke tim transmisi.",
+    "Menunggu spare part dari gudang.",
+    "Koordinasi dengan PLN setempat.",
+    "Perlu survey ulang bersama vendor.",
+    "Sementara trafik dialihkan ke site tetangga.",
+    "Teknisi sudah melakukan reset perangkat.",
+    "Diusulkan penggantian perangkat pada PM berikutnya.",
+]
+ALARM = ["CELL DOWN", "RF UNIT FAULT", "MAINS FAILURE", "HIGH TEMPERATURE", "LOW BATTERY", "DOOR OPEN"]
+LINK = ["microwave", "fiber optik", "VSAT", "IPRAN"]
+
+
+# === Site ===
+def _singkatan(nama: str) -> str:
+    konsonan = [c for c in nama if c not in "aiueo"]
+    return "".join((konsonan + list(nama))[:3]).upper()
+
+
+def buat_sites(jumlah: int, seed: int, sudah_ada: frozenset = frozenset(),
+               id_sudah_ada: frozenset = frozenset()) -> list:
+    """
+    Daftar (site_id, site_name) unik dengan pola nama seperti data asli
+    (kecamatan_jenis) dan site_id seperti 14PBG0001. Nama di sudah_ada dan
+    site_id di id_sudah_ada dilewati.
+    """
+    rng = random.Random(f"{seed}:sites")
+    kabupaten = list(KABUPATEN.items())
+    sites = []
+    dipakai = set(sudah_ada)
+    nomor_id = {}
+    while len(sites) < jumlah:
+        kecamatan = rng.choice(KECAMATAN)
+        jenis = rng.choice(JENIS_SITE)
+        nama = f"{kecamatan}_{jenis}"
+        ke = 2
+        while nama in dipakai:
+            nama = f"{kecamatan}{ke}_{jenis}"
+            ke += 1
+        dipakai.add(nama)
+
+        _, kode = rng.choice(kabupaten)
+        prefix = f"{kode}{_singkatan(kecamatan)}"
+        while True:
+            nomor_id[prefix] = nomor_id.get(prefix, 0) + 1
+            site_id = f"{prefix}{nomor_id[prefix]:04d}"
+            if site_id not in id_sudah_ada:
+                break
+        sites.append((site_id, nama))
+    return sites
+
+
+# === Catatan ===
+def format_tanggal(tgl: date) -> str:
+    # Sama dengan format yang ditulis aplikasi (lihat ORDER_TANGGAL)
+    return tgl.strftime("%A, %d %B %Y")
+
+
+def _isi_catatan(rng: random.Random) -> str:
+    masalah = rng.choice(MASALAH).format(
+        link=rng.choice(LINK), persen=rng.randint(10, 90), alarm=rng.choice(ALARM),
+        jam_alarm=f"{rng.randint(0, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+        durasi=rng.randint(1, 4), sektor=rng.randint(1, 3), suhu=rng.randint(35, 48),
+    )
+    return f"{masalah}. {rng.choice(TINDAKAN)}"
+
+
+def iter_catatan_site(site_name: str, jumlah: int, seed: int, sampai: date, rentang_hari: int):
+    """
+    Catatan satu site terurut waktu, deterministik per (seed, site). Setiap
+    ENTRI_PER_DOKUMEN catatan dianggap berasal dari satu file sumber.
+    """
+    rng = random.Random(f"{seed}:{site_name}")
+    awal = sampai - timedelta(days=rentang_hari)
+    hari = sorted(rng.randint(0, rentang_hari) for _ in range(jumlah))
+    for nomor, offset in enumerate(hari):
+        tgl = awal + timedelta(days=offset)
+        selesai = rng.random() < PROPORSI_SELESAI
+        tgl_selesai = min(sampai, tgl + timedelta(days=rng.randint(0, MAKS_HARI_SELESAI))) if selesai else None
+        yield {
+            "site_name": site_name,
+            "tanggal": format_tanggal(tgl),
+            "jam": f"{rng.randint(6, 22):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+            "isi_catatan": _isi_catatan(rng),
+            "status": "selesai" if selesai else "aktif",
+            "tanggal_selesai": format_tanggal(tgl_selesai) if tgl_selesai else None,
+            "sumber": f"sintetis_{site_name}_{nomor // ENTRI_PER_DOKUMEN:04d}.pdf",
+        }
+
+
+def _jumlah_catatan(site_name: str, rata_rata: int, seed: int) -> int:
+    # Sebaran tidak rata antar site, seperti data asli: sebagian site jauh lebih ramai
+    rng = random.Random(f"{seed}:jumlah:{site_name}")
+    return max(1, min(int(rng.paretovariate(2.0) * rata_rata / 2), rata_rata * 20))
+
+
+# === Isi database ===
+def site_id_terpakai() -> frozenset:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT site_id FROM {TABLE_SITE} WHERE site_id IS NOT NULL")
+            return frozenset(row[0] for row in cur)
+
+
+def copy_sites(cur, sites: list):
+    # Site sintetis juga dicatat di tabel terpisah supaya --hapus bisa membuangnya dari katalog
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_SITE_SINTETIS} (site_id TEXT PRIMARY KEY, site_name TEXT)")
+    for tabel in (TABLE_SITE, TABLE_SITE_SINTETIS):
+        cur.copy_expert(f"COPY {tabel} (site_id, site_name) FROM STDIN WITH (FORMAT csv)", _CsvCopyStream(iter(sites)))
+
+
+def copy_catatan(cur, sites: list, rata_rata: int, seed: int, sampai: date, rentang_hari: int) -> int:
+    total = 0
+
+    def iter_rows():
+        nonlocal total
+        for _, site_name in sites:
+            jumlah = _jumlah_catatan(site_name, rata_rata, seed)
+            for c in iter_catatan_site(site_name, jumlah, seed, sampai, rentang_hari):
+                total += 1
+                yield (
+                    c["site_name"], c["tanggal"], c["jam"], c["isi_catatan"], c["status"],
+                    c["tanggal_selesai"], c["sumber"], c["sumber"], FILE_TYPE_SINTETIS,
+                )
+
+    cur.copy_expert(
+        f"COPY {TABLE_NAME} ({', '.join(CSV_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        _CsvCopyStream(iter_rows()),
+    )
+    return total
+
+
+def hapus_data_sintetis() -> tuple:
+    """
+    Hapus catatan dan site hasil generator → (jumlah catatan, jumlah site).
+    Embedding-nya ikut terbuang pada GC vektor berikutnya karena sumbernya
+    tidak lagi dirujuk catatan_site.
+    """
+    jumlah_site = 0
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DELETE FROM {TABLE_NAME} WHERE file_type = %s", (FILE_TYPE_SINTETIS,))
+            jumlah_catatan = cur.rowcount
+            cur.execute("SELECT to_regclass(%s)", (TABLE_SITE_SINTETIS,))
+            if cur.fetchone()[0]:
+                cur.execute(f"""
+                    DELETE FROM {TABLE_SITE} s USING {TABLE_SITE_SINTETIS} t
+                    WHERE s.site_id = t.site_id AND s.site_name = t.site_name
+                """)
+                jumlah_site = cur.rowcount
+                cur.execute(f"DELETE FROM {TABLE_SITE_SINTETIS}")
+        conn.commit()
+    bump_data_version()
+    return jumlah_catatan, jumlah_site
+
+
+# === Isi vectorstore ===
+def teks_notulensi(catatan: list) -> str:
+    """
+    Satu dokumen sumber dalam format emoji: ✅/📌 untuk catatan selesai,
+    ⏳ untuk catatan aktif (format yang dipecah per entri oleh tools_chunking).
+    """
+    baris = []
+    for c in catatan:
+        baris.append(f"📅 {c['tanggal']} ⏰ {c['jam']}")
+        if c["status"] == "selesai":
+            baris += [f"✅ {c['isi_catatan']}", f"📌 Tanggal Selesai: {c['tanggal_selesai']}"]
+        else:
+            baris.append(f"⏳ {c['isi_catatan']}")
+        baris.append("")
+    return "\n".join(baris)
+
+
+def iter_dokumen_vektor(sites: list, rata_rata: int, seed: int, sampai: date, rentang_hari: int):
+    indexed_at = datetime.now().isoformat(timespec="seconds")
+    for _, site_name in sites:
+        jumlah = _jumlah_catatan(site_name, rata_rata, seed)
+        per_sumber = {}
+        for c in iter_catatan_site(site_name, jumlah, seed, sampai, rentang_hari):
+            per_sumber.setdefault(c["sumber"], []).append(c)
+        for sumber, catatan in per_sumber.items():
+            # satu ingest_id per sumber, sama seperti index_file untuk satu file upload
+            yield Document(page_content=teks_notulensi(catatan), metadata={
+                "source": sumber, "site_name": site_name, "page": 1,
+                "ingest_id": uuid.uuid4().hex, "indexed_at": indexed_at,
+            })
+
+
+# === File contoh upload ===
+def format_emoji(site_name: str, catatan: list) -> list:
+    # 📅 .. ⏰ .. / ✅ isi / 📌 Tanggal Selesai: .. (hanya catatan selesai)
+    baris = []
+    for c in catatan:
+        if c["status"] == "selesai":
+            baris += [f"📅 {c['tanggal']} ⏰ {c['jam']}", f"✅ {c['isi_catatan']}",
+                      f"📌 Tanggal Selesai: {c['tanggal_selesai']}", ""]
+    return baris
+
+
+def format_emoji_aktif(site_name: str, catatan: list) -> list:
+    # 📅 .. ⏰ .. diikuti satu atau lebih baris ⏳ isi (catatan aktif)
+    baris = []
+    per_waktu = {}
+    for c in catatan:
+        if c["status"] == "aktif":
+            per_waktu.setdefault((c["tanggal"], c["jam"]), []).append(c["isi_catatan"])
+    for (tanggal, jam), daftar_isi in per_waktu.items():
+        baris.append(f"📅 {tanggal} ⏰ {jam}")
+        baris += [f"⏳ {isi}" for isi in daftar_isi]
+        baris.append("")
+    return baris
+
+
+def format_emoji_satu_baris(site_name: str, catatan: list) -> list:
+    return [
+        f"📅 {c['tanggal']} ⏰ {c['jam']} ✅ {c['isi_catatan']} 📌 Tanggal Selesai: {c['tanggal_selesai']}"
+        for c in catatan if c["status"] == "selesai"
+    ]
+
+
+def format_label(site_name: str, catatan: list) -> list:
+    baris = [f"📝 Notulensi Site {site_name}", ""]
+    for c in catatan:
+        baris += [f"Tanggal: {c['tanggal']} Jam: {c['jam']}", f"Status: {c['status']}", f"Isi: {c['isi_catatan']}"]
+        if c["tanggal_selesai"]:
+            baris.append(f"Tanggal selesai: {c['tanggal_selesai']}")
+        baris.append("")
+    return baris
+
+
+def format_blok(site_name: str, catatan: list) -> list:
+    # Blok umum dipisah baris kosong (parse_general_blocks): tanggal ikut waktu upload
+    baris = [f"Notulensi site {site_name}", ""]
+    for c in catatan:
+        baris += [c["isi_catatan"], f"Status: {c['status']}"]
+        if c["tanggal_selesai"]:
+            baris.append(f"Tanggal selesai: {c['tanggal_selesai']}")
+        baris.append("")
+    return baris
+
+
+FORMAT_FILE = {
+    "emoji": format_emoji,
+    "emoji_aktif": format_emoji_aktif,
+    "emoji_satu_baris": format_emoji_satu_baris,
+    "label": format_label,
+    "blok": format_blok,
+}
+FORMAT_EMOJI = {"emoji", "emoji_aktif", "emoji_satu_baris"}
+
+
+def tulis_txt(path: str, baris: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(baris) + "\n")
+
+
+def tulis_docx(path: str, baris: list):
+    dokumen = docx.Document()
+    for b in baris:
+        dokumen.add_paragraph(b)
+    dokumen.save(path)
+
+
+def tulis_pdf(path: str, baris: list, font_ttf: str = None):
+    pdf = FPDF(orientation="L")
+    pdf.set_auto_page_break(auto=True, margin=10)
+    pdf.add_page()
+    if font_ttf:
+        pdf.add_font("Notulensi", "", font_ttf, uni=True)
+        pdf.set_font("Notulensi", size=8)
+    else:
+        pdf.set_font("Arial", size=8)
+    for b in baris:
+        pdf.multi_cell(0, 5, b)
+    pdf.output(path)
+
+
+def tulis_csv(path: str, catatan: list):
+    kolom = ["site_name", "tanggal", "jam", "isi_catatan", "status", "tanggal_selesai"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(kolom)
+        writer.writerows([c[k] or "" for k in kolom] for c in catatan)
+
+
+def buat_file_contoh(sites: list, output_dir: str, seed: int, sampai: date, rentang_hari: int,
+                     font_ttf: str = None) -> int:
+    """
+    Per site: satu file per (format, ekstensi). Tanpa font TTF Unicode, format
+    emoji tidak ditulis ke PDF karena font bawaan FPDF hanya latin-1.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    total = 0
+    for _, site_name in sites:
+        catatan = list(iter_catatan_site(site_name, ENTRI_PER_DOKUMEN, seed, sampai, rentang_hari))
+        for nama_format, fungsi in FORMAT_FILE.items():
+            baris = fungsi(site_name, catatan)
+            base = os.path.join(output_dir, f"{site_name}_{nama_format}")
+            tulis_txt(base + ".txt", baris)
+            tulis_docx(base + ".docx", baris)
+            total += 2
+            if nama_format in FORMAT_EMOJI and not font_ttf:
+                continue
+            tulis_pdf(base + ".pdf", baris, font_ttf)
+            total += 1
+        tulis_csv(os.path.join(output_dir, f"{site_name}_catatan.csv"), catatan)
+        total += 1
+    return total
+
+
+# === CLI ===
+def main():
+    parser = argparse.ArgumentParser(description="Generator data sintetis site, catatan dan vektor notulensi.")
+    parser.add_argument("--sites", type=int, default=100, help="Jumlah site baru.")
+    parser.add_argument("--catatan-per-site", type=int, default=50, help="Rata-rata catatan per site.")
+    parser.add_argument("--tahun", type=float, default=2, help="Rentang tanggal catatan (tahun ke belakang).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--vektor-site", type=int, default=0, help="Jumlah site yang catatannya juga di-embed ke vectorstore.")
+    parser.add_argument("--batch-size", type=int, default=INDEX_BATCH_SIZE, help="Chunk per batch embedding + insert.")
+    parser.add_argument("--file-contoh", type=int, default=0, help="Jumlah site yang dibuatkan file contoh upload.")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR_DEFAULT, help="Folder file contoh.")
+    parser.add_argument("--font-pdf", help="Font TTF Unicode untuk menulis format emoji ke PDF.")
+    parser.add_argument("--tanpa-db", action="store_true", help="Hanya buat file contoh, tanpa menulis ke database.")
+    parser.add_argument("--hapus", action="store_true", help="Hapus catatan dan site sintetis dari database lalu keluar.")
+    args = parser.parse_args()
+
+    if args.hapus:
+        jumlah_catatan, jumlah_site = hapus_data_sintetis()
+        print(f"🧹 {jumlah_catatan} catatan dan {jumlah_site} site sintetis dihapus. "
+              "Jalankan GC vektor untuk membuang embedding-nya.")
+        return
+
+    sampai = date.today()
+    rentang_hari = max(1, int(args.tahun * 365))
+    sudah_ada = frozenset() if args.tanpa_db else get_site_catalog()
+    id_sudah_ada = frozenset() if args.tanpa_db else site_id_terpakai()
+    sites = buat_sites(args.sites, args.seed, sudah_ada, id_sudah_ada)
+
+    if not args.tanpa_db:
+        mulai = time.perf_counter()
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    copy_sites(cur, sites)
+                    total = copy_catatan(cur, sites, args.catatan_per_site, args.seed, sampai, rentang_hari)
+                conn.commit()
+        except Exception as e:
+            print(f"❌ Gagal mengisi database: {e}")
+            return
+        durasi = time.perf_counter() - mulai
+        print(f"✅ {len(sites)} site dan {total} catatan dimasukkan dalam {durasi:.1f} s "
+              f"({total / durasi if durasi else 0:.0f} baris/s).")
+
+        if args.vektor_site:
+            mulai = time.perf_counter()
+            dokumen = iter_dokumen_vektor(sites[:args.vektor_site], args.catatan_per_site, args.seed, sampai, rentang_hari)
+            try:
+                chunks = _index_in_batches(dokumen, batch_size=args.batch_size)
+            except Exception as e:
+                print(f"❌ Gagal mengindeks ke {VECTOR_BACKEND}: {e}")
+                return
+            durasi = time.perf_counter() - mulai
+            print(f"✅ {chunks} chunk diindeks ke {VECTOR_BACKEND} dalam {durasi:.1f} s "
+                  f"({chunks / durasi if durasi else 0:.0f} chunk/s).")
+        bump_data_version(*(nama for _, nama in sites))
+
+    if args.file_contoh:
+        jumlah = buat_file_contoh(sites[:args.file_contoh], args.output_dir, args.seed, sampai, rentang_hari, args.font_pdf)
+        print(f"📄 {jumlah} file contoh ditulis ke {args.output_dir}/")
+        if not args.font_pdf:
+            print("⚠️ Format emoji tidak dibuat sebagai PDF; gunakan --font-pdf untuk font TTF Unicode.")
+
+
+if __name__ == "__main__":
+    main()
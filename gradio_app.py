@@ -3,26 +3,32 @@ from typing import Any, AsyncGenerator
 from PIL import Image
 import os
 import io
-import csv
 import time
 import uuid
 import asyncio
 import ast
 import json
-from datetime import datetime
-from tools.tools_notulensi_teks import export_notulensi
+import hashlib
+from concurrent.futures import Future
+from tools.tools_notulensi_teks import siapkan_ekspor_notulensi, siapkan_arsip_rekap
 from tools.tools_dokumen import simpan_file
+from tools.tools_ekspor import submit_ekspor, ekspor_key
 
 # Tambahan: fungsi simpan jawaban RAG ke TXT/PDF
-from tools.tools_rag import simpan_jawaban_ke_txt, simpan_jawaban_ke_pdf
+from tools.tools_rag import simpan_jawaban_ke_txt, simpan_jawaban_ke_pdf, jawab_pertanyaan_batch, buat_pertanyaan_per_site
+from tools.tools_researcher import get_site_catalog
+from tracing import TRACE_ENABLED, mulai_span, span, tracing_callbacks
+from db_utils import set_sesi_chat
+from logbook import catat_chat
+from metrics import AGENT_SLOTS_ACTIVE, AGENT_SLOTS_TOTAL, QUEUE_DEPTH, QUEUE_WAIT, REQUEST_DURATION
 
 # === Variabel Global ===
 TEMP_MAP_PATH = "temp_site_map.png"
 TEMP_CHART_PATH = "temp_site_chart.png"
-CHAT_LOG_PATH = "chatbot_logbook.csv"
 
 TXT_FOLDER = "generated_txts"
 PDF_FOLDER = "generated_pdfs"
+BATCH_RAG_MAX_SITES = int(os.getenv("BATCH_RAG_MAX_SITES", "50"))  # satu batch = satu panggilan LLM per site
 os.makedirs(TXT_FOLDER, exist_ok=True)
 os.makedirs(PDF_FOLDER, exist_ok=True)
 
@@ -31,15 +37,49 @@ user_queue = []
 agent_busy = False
 queue_lock = asyncio.Lock()
 
+QUEUE_DEPTH.set_function(lambda: len(user_queue))
+AGENT_SLOTS_TOTAL.set(1)  # satu agent_busy: request diproses bergantian
+AGENT_SLOTS_ACTIVE.set_function(lambda: 1 if agent_busy else 0)
+
 # === Logging Chat ke CSV ===
-def log_to_csv(user_message: str, agent_name: str, bot_response: str, response_time: float):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    file_exists = os.path.exists(CHAT_LOG_PATH)
-    with open(CHAT_LOG_PATH, mode="a", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Timestamp", "Pertanyaan", "Agent yang menangani", "Jawaban", "Waktu Respons (detik)"])
-        writer.writerow([timestamp, user_message, agent_name, bot_response, f"{response_time:.2f}"])
+# Hanya masuk antrian; penulisan batch + rotasi dilakukan thread logbook.py
+def log_to_csv(user_message: str, agent_name: str, bot_response: str, response_time: float,
+               session_id: str = "", trace_id: str = ""):
+    catat_chat(user_message, agent_name, bot_response, response_time, session_id, trace_id)
+
+# === Batch RAG (banyak site sekaligus) ===
+async def jalankan_batch_rag(template: str, daftar_site: str) -> AsyncGenerator[str, None]:
+    """
+    Jawaban dialirkan ke UI begitu tiap pertanyaan selesai.
+    """
+    sites = list(dict.fromkeys(s.strip().lower() for s in daftar_site.replace("\n", ",").split(",") if s.strip()))
+    if not sites:
+        yield "⚠ Harap isi daftar site (pisahkan dengan koma)."
+        return
+    if len(sites) > BATCH_RAG_MAX_SITES:
+        yield f"⚠ Maksimal {BATCH_RAG_MAX_SITES} site per batch, diminta {len(sites)}."
+        return
+    katalog = get_site_catalog()
+    tidak_dikenal = [s for s in sites if s not in katalog]
+    if tidak_dikenal:
+        yield f"❌ Site tidak dikenali: {', '.join(tidak_dikenal)}"
+        return
+    if "{site}" not in template:
+        template = template.strip() + " site {site}"
+    pertanyaan_list = buat_pertanyaan_per_site(template.strip(), sites)
+
+    hasil = [None] * len(pertanyaan_list)
+    gen = jawab_pertanyaan_batch(pertanyaan_list, sites=sites)
+    selesai = 0
+    while True:
+        item = await asyncio.to_thread(next, gen, None)
+        if item is None:
+            break
+        i, pertanyaan, jawaban = item
+        hasil[i] = f"### {sites[i].upper()}\n{jawaban}"
+        selesai += 1
+        yield f"⏳ {selesai}/{len(sites)} selesai\n\n" + "\n\n".join(h for h in hasil if h)
+    yield f"✅ {selesai}/{len(sites)} selesai\n\n" + "\n\n".join(h for h in hasil if h)
 
 # === Fungsi Utama Agent (Async + Antrian) ===
 async def run_agent_interface(
@@ -64,11 +104,15 @@ async def run_agent_interface(
             yield "🔐 Silakan masukkan password terlebih dahulu.", None, False, session_id
             return
 
+    # === Trace per request: antrian → supervisor → sub-agent/tool → DB/embedding ===
+    trace_root = mulai_span("request", "request", session_id=session_id, pesan=message)
+
     # === Daftarkan di antrian ===
     async with queue_lock:
         if session_id not in user_queue:
             user_queue.append(session_id)
             print(f"[QUEUE] session_id {session_id} ditambahkan ke antrian.")
+        span_antrian = mulai_span("antrian", "queue", parent=trace_root, posisi_awal=len(user_queue))
 
     timeout_seconds = 120
     wait_start = time.time()
@@ -83,6 +127,9 @@ async def run_agent_interface(
                 if session_id in user_queue:
                     user_queue.remove(session_id)
             print(f"[TIMEOUT] session_id {session_id} dihapus dari antrian karena timeout.")
+            span_antrian.selesai(error="timeout antrian")
+            QUEUE_WAIT.observe(time.time() - wait_start, hasil="timeout")
+            trace_root.selesai(error="timeout antrian")
             yield "❌ Waktu tunggu Anda di antrian melebihi batas (2 menit). Silakan coba lagi.", None, True, session_id
             return
 
@@ -90,6 +137,8 @@ async def run_agent_interface(
             if user_queue and user_queue[0] == session_id and not agent_busy:
                 agent_busy = True
                 print(f"[PROCESS] session_id {session_id} mendapat giliran dan memulai proses.")
+                span_antrian.selesai()
+                QUEUE_WAIT.observe(time.time() - wait_start, hasil="dilayani")
                 break
             try:
                 position = user_queue.index(session_id) + 1
@@ -100,6 +149,8 @@ async def run_agent_interface(
                 )
             except ValueError:
                 print(f"[WARNING] session_id {session_id} tidak ditemukan lagi di antrian.")
+                span_antrian.selesai(error="hilang dari antrian")
+                trace_root.selesai(error="hilang dari antrian")
                 yield "Terjadi masalah pada antrian. Silakan kirim ulang pesan Anda.", None, True, session_id
                 return
 
@@ -125,10 +176,12 @@ async def run_agent_interface(
     try:
         yield "🤖 Giliran Anda tiba! Agen sedang memproses permintaan Anda...", None, True, session_id
 
-        result = await agent_to_run.ainvoke(
-            {"input": message},
-            config={"configurable": {"session_id": session_id}}
-        )
+        set_sesi_chat(session_id)
+        with span("agent.supervisor", "agent", parent=trace_root):
+            result = await agent_to_run.ainvoke(
+                {"input": message},
+                config={"configurable": {"session_id": session_id}, "callbacks": tracing_callbacks()}
+            )
 
         # Ambil field output dengan robust parsing:
         if isinstance(result, dict):
@@ -189,20 +242,44 @@ async def run_agent_interface(
     else:
         agent_name = type(agent_to_run).__name__
 
-    log_to_csv(message, agent_name, final_output_str, response_time)
+    REQUEST_DURATION.observe(response_time, status="error" if final_output_str.startswith("❌") else "ok")
+    trace_root.set(agent=agent_name, response_time_s=round(response_time, 3))
+    trace_root.selesai()
+    if TRACE_ENABLED:
+        print(f"[TRACE] session_id {session_id} trace_id={trace_root.trace_id}")
+    log_to_csv(message, agent_name, final_output_str, response_time, session_id, trace_root.trace_id)
 
     yield final_output_str, image, True, session_id
 
 # Simpan jawaban RAG ke TXT dan PDF (gunakan fungsi dari tools/rag.py)
-def save_rag_txt(jawaban: str):
-    filename = os.path.join(TXT_FOLDER, "jawaban_rag.txt")
-    simpan_jawaban_ke_txt(jawaban, filename)
-    return filename if os.path.exists(filename) else None
-
-def save_rag_pdf(jawaban: str):
-    filename = os.path.join(PDF_FOLDER, "jawaban_rag.pdf")
-    simpan_jawaban_ke_pdf(jawaban, filename)
-    return filename if os.path.exists(filename) else None
+# Dirender di worker background dan di-cache berdasarkan isi jawaban.
+def ekspor_jawaban_rag(jawaban: str, fmt: str) -> Future:
+    digest = hashlib.sha1(jawaban.encode("utf-8")).hexdigest()
+    folder = TXT_FOLDER if fmt == "txt" else PDF_FOLDER
+    filename = os.path.join(folder, f"jawaban_rag_{digest[:12]}.{fmt}")
+    simpan = simpan_jawaban_ke_txt if fmt == "txt" else simpan_jawaban_ke_pdf
+
+    def render():
+        simpan(jawaban, filename)
+        return filename
+
+    return submit_ekspor(ekspor_key(("rag", digest), 0, fmt), render)
+
+async def tunggu_ekspor(hasil, pesan_kosong: str = "⚠ Tidak ada data untuk diekspor.") -> str:
+    """
+    Tunggu Future ekspor. Pesan (periode tidak valid, data kosong, error
+    render) ditampilkan ke user lewat gr.Error, bukan diganti None diam-diam.
+    """
+    if not isinstance(hasil, Future):
+        raise gr.Error(str(hasil))
+    try:
+        path = await asyncio.wrap_future(hasil)
+    except Exception as e:
+        print(f"[ERROR] Gagal ekspor: {e}")
+        raise gr.Error(f"❌ Gagal ekspor: {e}")
+    if not path or not os.path.exists(path):
+        raise gr.Error(pesan_kosong)
+    return path
 
 # === Build Gradio App ===
 def build_gradio_app(agent_to_run: Any):
@@ -242,19 +319,53 @@ def build_gradio_app(agent_to_run: Any):
                 gr.Markdown("### 📅 Unggah Dokumen Audit")
                 nama_input = gr.Text(label="📝 Nama File", placeholder="Contoh: laporan_audit")
                 file_input = gr.File(label="📌 Pilih File", file_types=[".pdf", ".txt", ".docx", ".csv", ".jpg", ".jpeg", ".png"])
+                kolom_input = gr.Text(
+                    label="🧭 Pemetaan Kolom CSV (opsional)",
+                    placeholder="Contoh: site_name=Site, isi_catatan=Keterangan, tanggal=Tgl"
+                )
                 btn_upload = gr.Button("📤 Upload Sekarang")
                 upload_output = gr.Textbox(label="🧾 Status Upload", interactive=False)
 
-                def handle_upload(file, nama, authenticated):
+                def handle_upload(file, nama, kolom, authenticated):
                     user_id = "default"
                     if not authenticated:
                         return "🔒 Login dulu."
                     if not file:
                         return "⚠ Harap pilih file."
-                    result = simpan_file(file, user_id=user_id, custom_name=nama)
+                    result = simpan_file(file, user_id=user_id, custom_name=nama, column_map=kolom)
                     return result if isinstance(result, str) else "✅ File berhasil disimpan."
 
-                btn_upload.click(fn=handle_upload, inputs=[file_input, nama_input, state_authenticated], outputs=upload_output)
+                btn_upload.click(fn=handle_upload, inputs=[file_input, nama_input, kolom_input, state_authenticated], outputs=upload_output)
+
+            # Batch RAG Tab
+            with gr.TabItem("📚 Batch RAG"):
+                gr.Markdown("### 📚 Pertanyaan yang Sama untuk Banyak Site")
+                batch_template = gr.Textbox(
+                    label="❓ Template Pertanyaan",
+                    value="ringkas gangguan site {site} bulan ini"
+                )
+                batch_sites = gr.Textbox(
+                    label=f"📍 Daftar Site (pisahkan dengan koma, maks {BATCH_RAG_MAX_SITES})",
+                    lines=3
+                )
+                btn_batch = gr.Button("🚀 Jalankan Batch")
+                batch_output = gr.Markdown()
+
+                async def handle_batch_rag(template, daftar_site, authenticated):
+                    if not authenticated:
+                        yield "🔒 Login dulu."
+                        return
+                    if not template or not template.strip():
+                        yield "⚠ Harap isi template pertanyaan."
+                        return
+                    async for teks in jalankan_batch_rag(template, daftar_site or ""):
+                        yield teks
+
+                btn_batch.click(
+                    fn=handle_batch_rag,
+                    inputs=[batch_template, batch_sites, state_authenticated],
+                    outputs=batch_output
+                )
 
             # Notulensi Tab
             with gr.TabItem("📝 Notulensi"):
@@ -267,6 +378,14 @@ def build_gradio_app(agent_to_run: Any):
                     btn_n_pdf = gr.Button("🧾 Jadikan Notulensi PDF dan Unduh")
                     download_n_pdf = gr.File(label="📁 File PDF", interactive=False)
                     
+                with gr.Row():
+                    periode_input = gr.Textbox(
+                        label="🗓 Periode Arsip",
+                        placeholder="Contoh: bulan juli 2025 / dari 1/7/2025 sampai 31/7/2025"
+                    )
+                    btn_arsip = gr.Button("🗂 Unduh PDF per Site (ZIP)")
+                    download_arsip = gr.File(label="📁 File ZIP", interactive=False)
+
                 with gr.Row():
                     btn_txt = gr.Button("📄 Jadikan Jawaban RAG TXT dan Unduh")
                     download_txt = gr.File(label="File TXT", interactive=False)
@@ -274,35 +393,37 @@ def build_gradio_app(agent_to_run: Any):
                     btn_pdf = gr.Button("🧾 Jadikan Jawaban RAG PDF dan Unduh")
                     download_pdf = gr.File(label="File PDF", interactive=False)
 
-                def handle_export_notulensi_txt(authenticated):
+                async def handle_export_notulensi_txt(authenticated):
                     if not authenticated:
                         return None
-                    result = export_notulensi("txt","default")
-                    return result if isinstance(result, str) and os.path.exists(result) else None
+                    return await tunggu_ekspor(siapkan_ekspor_notulensi("txt", "default"))
 
-                def handle_export_notulensi_pdf(authenticated):
+                async def handle_export_notulensi_pdf(authenticated):
                     if not authenticated:
                         return None
-                    result = export_notulensi("pdf","default")
-                    if isinstance(result, dict) and result.get("url"):
-                        path = os.path.join("generated_pdfs", result["name"])
-                        return path if os.path.exists(path) else None
-                    elif isinstance(result, str) and os.path.exists(result):
-                        return result
-                    return None
+                    return await tunggu_ekspor(siapkan_ekspor_notulensi("pdf", "default"))
+
+                async def handle_export_arsip(periode, authenticated):
+                    if not authenticated:
+                        return None
+                    return await tunggu_ekspor(
+                        siapkan_arsip_rekap(periode), f"📭 Tidak ada catatan pada periode {periode}."
+                    )
+
                 # Fungsi untuk simpan jawaban RAG ke TXT dan PDF
-                def export_txt_wrapper(jawaban):
+                async def export_txt_wrapper(jawaban):
                     if not jawaban:
                         return None
-                    return save_rag_txt(jawaban)
+                    return await tunggu_ekspor(ekspor_jawaban_rag(jawaban, "txt"))
 
-                def export_pdf_wrapper(jawaban):
+                async def export_pdf_wrapper(jawaban):
                     if not jawaban:
                         return None
-                    return save_rag_pdf(jawaban)
+                    return await tunggu_ekspor(ekspor_jawaban_rag(jawaban, "pdf"))
 
                 btn_n_txt.click(fn=handle_export_notulensi_txt, inputs=state_authenticated, outputs=download_n_txt)
                 btn_n_pdf.click(fn=handle_export_notulensi_pdf, inputs=state_authenticated, outputs=download_n_pdf)
+                btn_arsip.click(fn=handle_export_arsip, inputs=[periode_input, state_authenticated], outputs=download_arsip)
 
         # Handler Chat
         async def handle_chat_submission(message, history, auth_status, session_id):
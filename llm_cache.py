@@ -0,0 +1,391 @@
+# llm_cache.py
+# Cache respons LLM untuk agent ReAct.
+# - Tier exact: key = hash(model + parameter + prompt), disimpan di SQLite lokal
+#   atau Postgres, dengan TTL dan batas jumlah entry (LRU).
+# - Tier semantik (opsional, hanya supervisor): keputusan routing langkah
+#   pertama (Action + Action Input) dipakai ulang untuk input yang mirip.
+import os
+import re
+import atexit
+import json
+import time
+import hashlib
+import threading
+import sqlite3
+from datetime import date
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from metrics import register_collector
+
+# === Konfigurasi ===
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite")  # sqlite | postgres | off
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # detik, 0 = tanpa TTL
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_EVICT_EVERY = 100  # cek kapasitas tiap N penulisan
+LLM_CACHE_STATS_FLUSH_EVERY = 50  # tulis statistik harian tiap N lookup
+LLM_ROUTING_CACHE = os.getenv("LLM_ROUTING_CACHE", "0") == "1"
+LLM_ROUTING_SIMILARITY = float(os.getenv("LLM_ROUTING_SIMILARITY", "0.93"))
+LLM_ROUTING_MAX_ENTRIES = 2000
+ROUTING_PROFILES = {"supervisor"}
+
+_RE_ACTION = re.compile(r"Action\s*:\s*(.+?)\s*\nAction Input\s*:\s*(.+)", re.DOTALL)
+
+
+def _hash(*parts) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _normalisasi(teks: str) -> str:
+    return " ".join(teks.lower().split())
+
+
+# === Penyimpanan (SQLite / Postgres) ===
+class _CacheStore:
+    """
+    SQL ditulis dengan placeholder "?" lalu disesuaikan untuk psycopg2.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._sqlite = None
+        if backend == "sqlite":
+            self._sqlite = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False)
+            self._sqlite.execute("PRAGMA journal_mode=WAL")
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                profile TEXT,
+                prompt_preview TEXT,
+                value TEXT,
+                created_at DOUBLE PRECISION,
+                last_hit DOUBLE PRECISION,
+                hit_count INTEGER DEFAULT 0
+            )
+        """)
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache_routing (
+                key TEXT PRIMARY KEY,
+                input TEXT,
+                embedding TEXT,
+                action TEXT,
+                created_at DOUBLE PRECISION
+            )
+        """)
+        self.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache_harian (
+                tanggal TEXT,
+                profile TEXT,
+                tier TEXT,
+                hits INTEGER,
+                misses INTEGER,
+                PRIMARY KEY (tanggal, profile, tier)
+            )
+        """)
+
+    def execute(self, sql: str, params: tuple = (), fetch: bool = False):
+        if self.backend == "sqlite":
+            with self._lock:
+                cur = self._sqlite.execute(sql, params)
+                rows = cur.fetchall() if fetch else None
+                self._sqlite.commit()
+                return rows
+
+        from db_utils import get_db_connection
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.replace("?", "%s"), params)
+                rows = cur.fetchall() if fetch else None
+            conn.commit()
+        return rows
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cache_store():
+    global _store
+    with _store_lock:
+        if _store is None and LLM_CACHE_BACKEND != "off":
+            _store = _CacheStore(LLM_CACHE_BACKEND)
+    return _store
+
+
+# === Statistik hit/miss ===
+class _Statistik:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = {}  # (profile, tier) -> [hits, misses, hits_tersimpan, misses_tersimpan]
+        self._pending = 0
+
+    def catat(self, profile: str, tier: str, hit: bool):
+        with self._lock:
+            counter = self._counter.setdefault((profile, tier), [0, 0, 0, 0])
+            counter[0 if hit else 1] += 1
+            self._pending += 1
+            flush = self._pending >= LLM_CACHE_STATS_FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def flush(self):
+        store = get_cache_store()
+        with self._lock:
+            delta = []
+            for (profile, tier), counter in self._counter.items():
+                hits, misses = counter[0] - counter[2], counter[1] - counter[3]
+                if hits or misses:
+                    delta.append((profile, tier, hits, misses))
+                counter[2], counter[3] = counter[0], counter[1]
+            self._pending = 0
+        if not store:
+            return
+        hari_ini = date.today().isoformat()
+        for profile, tier, hits, misses in delta:
+            store.execute("""
+                INSERT INTO llm_cache_harian (tanggal, profile, tier, hits, misses) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (tanggal, profile, tier) DO UPDATE
+                SET hits = llm_cache_harian.hits + excluded.hits,
+                    misses = llm_cache_harian.misses + excluded.misses
+            """, (hari_ini, profile, tier, hits, misses))
+
+    def snapshot(self) -> list:
+        with self._lock:
+            hasil = []
+            for (profile, tier), (hits, misses, _, _) in self._counter.items():
+                total = hits + misses
+                hasil.append({
+                    "profile": profile, "tier": tier, "hits": hits, "misses": misses,
+                    "hit_rate": hits / total if total else 0.0,
+                })
+            return hasil
+
+
+statistik = _Statistik()
+atexit.register(statistik.flush)
+
+
+def llm_cache_stats() -> list:
+    return statistik.snapshot()
+
+
+@register_collector
+def _metrik_llm_cache():
+    snapshot = statistik.snapshot()
+    return [
+        ("llm_cache_hits_total", "counter", "Hit cache LLM per profil dan tier.",
+         [({"profile": s["profile"], "tier": s["tier"]}, s["hits"]) for s in snapshot]),
+        ("llm_cache_misses_total", "counter", "Miss cache LLM per profil dan tier.",
+         [({"profile": s["profile"], "tier": s["tier"]}, s["misses"]) for s in snapshot]),
+    ]
+
+
+# === Tier exact ===
+class ExactLLMCache(BaseCache):
+    """
+    BaseCache LangChain; dipasang per profil lewat ChatOpenAI(cache=...).
+    """
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self._writes = 0
+
+    def lookup(self, prompt: str, llm_string: str):
+        store = get_cache_store()
+        key = _hash(llm_string, prompt)
+        rows = store.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,), fetch=True)
+        if rows and LLM_CACHE_TTL and time.time() - rows[0][1] > LLM_CACHE_TTL:
+            store.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            rows = None
+        if not rows:
+            statistik.catat(self.profile, "exact", False)
+            return None
+
+        store.execute(
+            "UPDATE llm_cache SET last_hit = ?, hit_count = hit_count + 1 WHERE key = ?", (time.time(), key)
+        )
+        statistik.catat(self.profile, "exact", True)
+        return [loads(item) for item in json.loads(rows[0][0])]
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        store = get_cache_store()
+        now = time.time()
+        store.execute("""
+            INSERT INTO llm_cache (key, profile, prompt_preview, value, created_at, last_hit, hit_count)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, created_at = excluded.created_at
+        """, (
+            _hash(llm_string, prompt), self.profile, _teks_prompt(prompt)[-300:],
+            json.dumps([dumps(gen) for gen in return_val]), now, now,
+        ))
+        self._writes += 1
+        if self._writes % LLM_CACHE_EVICT_EVERY == 0:
+            evict_llm_cache()
+
+    def clear(self, **kwargs) -> None:
+        get_cache_store().execute("DELETE FROM llm_cache WHERE profile = ?", (self.profile,))
+
+
+def evict_llm_cache() -> int:
+    """
+    Buang entry kedaluwarsa (TTL) lalu entry paling lama tidak dipakai di atas kapasitas.
+    """
+    store = get_cache_store()
+    if not store:
+        return 0
+    sebelum = store.execute("SELECT COUNT(*) FROM llm_cache", fetch=True)[0][0]
+    if LLM_CACHE_TTL:
+        store.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - LLM_CACHE_TTL,))
+    store.execute("""
+        DELETE FROM llm_cache WHERE key IN (
+            SELECT key FROM llm_cache ORDER BY last_hit DESC LIMIT -1 OFFSET ?
+        )
+    """ if store.backend == "sqlite" else """
+        DELETE FROM llm_cache WHERE key IN (
+            SELECT key FROM llm_cache ORDER BY last_hit DESC OFFSET ?
+        )
+    """, (LLM_CACHE_MAX_ENTRIES,))
+    sesudah = store.execute("SELECT COUNT(*) FROM llm_cache", fetch=True)[0][0]
+    return sebelum - sesudah
+
+
+def _teks_prompt(prompt: str) -> str:
+    """
+    Untuk chat model, prompt berupa pesan yang diserialisasi; ambil teksnya.
+    """
+    try:
+        messages = json.loads(prompt)
+        return "\n".join(str(m.get("kwargs", {}).get("content", "")) for m in messages)
+    except (ValueError, TypeError, AttributeError):
+        return prompt
+
+
+# === Tier semantik untuk routing supervisor ===
+def _input_langkah_pertama(prompt: str) -> str | None:
+    """
+    Template supervisor diakhiri "Pertanyaan: {input}\\n{agent_scratchpad}".
+    Kembalikan input jika scratchpad masih kosong (keputusan routing awal)
+    dan chat_history kosong: dengan riwayat, routing bisa bergantung pada
+    site yang disebut sebelumnya, jadi tidak boleh digeneralisasi dari input saja.
+    """
+    teks = _teks_prompt(prompt)
+    if "\nPertanyaan: " not in teks:
+        return None
+    awal, sisa = teks.rsplit("\nPertanyaan: ", 1)
+    if "(chat_history):\n" in awal and awal.rsplit("(chat_history):\n", 1)[1].strip() not in ("", "[]"):
+        return None
+    if "\nObservation:" in sisa or "\nAction:" in sisa:
+        return None
+    return sisa.strip() or None
+
+
+class RoutingSemanticCache(ExactLLMCache):
+    """
+    Exact dulu; jika miss dan ini langkah routing pertama, cari keputusan
+    routing dari input lain yang embedding-nya mirip. Hanya keputusan yang
+    Action Input-nya sama dengan input asli yang disimpan, sehingga Action
+    Input bisa ditulis ulang dengan input baru tanpa mengubah makna.
+    """
+
+    def __init__(self, profile: str, threshold: float = LLM_ROUTING_SIMILARITY):
+        super().__init__(profile)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._actions, self._matrix = [], None
+        self._embeddings = None
+        self._muat()
+
+    def _embed(self, teks: str):
+        import numpy as np
+
+        if self._embeddings is None:
+            from tools.tools_rag import embeddings
+            self._embeddings = embeddings
+        vec = np.asarray(self._embeddings.embed_query(teks), dtype="float32")
+        return vec / max(float(np.linalg.norm(vec)), 1e-12)
+
+    def _muat(self):
+        import numpy as np
+
+        rows = get_cache_store().execute(
+            "SELECT embedding, action FROM llm_cache_routing ORDER BY created_at DESC LIMIT ?",
+            (LLM_ROUTING_MAX_ENTRIES,), fetch=True,
+        )
+        if rows:
+            self._actions = [r[1] for r in rows]
+            self._matrix = np.asarray([json.loads(r[0]) for r in rows], dtype="float32")
+
+    def lookup(self, prompt: str, llm_string: str):
+        hasil = super().lookup(prompt, llm_string)
+        if hasil is not None:
+            return hasil
+        user_input = _input_langkah_pertama(prompt)
+        if not user_input or self._matrix is None:
+            return None
+
+        vec = self._embed(user_input)
+        with self._lock:
+            skor = self._matrix @ vec
+            terbaik = int(skor.argmax())
+            cocok = float(skor[terbaik]) >= self.threshold
+            action = self._actions[terbaik] if cocok else None
+        statistik.catat(self.profile, "routing", cocok)
+        if not cocok:
+            return None
+        teks = f"Thought: Pertanyaan ini serupa dengan permintaan sebelumnya.\nAction: {action}\nAction Input: {user_input}"
+        return [ChatGeneration(message=AIMessage(content=teks))]
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        super().update(prompt, llm_string, return_val)
+        user_input = _input_langkah_pertama(prompt)
+        if not user_input or not return_val:
+            return
+        match = _RE_ACTION.search(return_val[0].text)
+        if not match or _normalisasi(match.group(2).strip().strip('"')) != _normalisasi(user_input):
+            return  # input ditulis ulang LLM (misal ditambah site dari riwayat), jangan digeneralisasi
+
+        import numpy as np
+
+        action = match.group(1).strip()
+        vec = self._embed(user_input)
+        get_cache_store().execute("""
+            INSERT INTO llm_cache_routing (key, input, embedding, action, created_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET action = excluded.action, created_at = excluded.created_at
+        """, (_hash(_normalisasi(user_input)), user_input, json.dumps(vec.tolist()), action, time.time()))
+        with self._lock:
+            self._actions.insert(0, action)
+            baris = vec.reshape(1, -1)
+            self._matrix = baris if self._matrix is None else np.vstack([baris, self._matrix])[:LLM_ROUTING_MAX_ENTRIES]
+            del self._actions[LLM_ROUTING_MAX_ENTRIES:]
+
+    def clear(self, **kwargs) -> None:
+        super().clear()
+        get_cache_store().execute("DELETE FROM llm_cache_routing")
+        with self._lock:
+            self._actions, self._matrix = [], None
+
+
+# === Factory ===
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(profile: str):
+    """
+    Cache untuk profil LLM tertentu, atau None jika LLM_CACHE_BACKEND=off.
+    """
+    if not get_cache_store():
+        return None
+    with _caches_lock:
+        if profile not in _caches:
+            if LLM_ROUTING_CACHE and profile in ROUTING_PROFILES:
+                _caches[profile] = RoutingSemanticCache(profile)
+            else:
+                _caches[profile] = ExactLLMCache(profile)
+        return _caches[profile]
@@ -0,0 +1,78 @@
+# llm_cache_report.py
+# Laporan cache LLM: hit rate harian per profil/tier, jumlah entry dan prompt
+# yang paling sering terpakai ulang.
+# Jalankan: python llm_cache_report.py [--hari 7] [--top 10] [--evict] [--clear]
+import argparse
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from llm_cache import LLM_CACHE_BACKEND, evict_llm_cache, get_cache_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hit rate dan isi cache LLM.")
+    parser.add_argument("--hari", type=int, default=7, help="Rentang laporan harian.")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah prompt teratas berdasarkan hit.")
+    parser.add_argument("--evict", action="store_true", help="Jalankan eviction TTL/kapasitas sekarang.")
+    parser.add_argument("--clear", action="store_true", help="Kosongkan seluruh cache.")
+    args = parser.parse_args()
+
+    store = get_cache_store()
+    if not store:
+        print("⚠️ Cache LLM nonaktif (LLM_CACHE_BACKEND=off).")
+        return
+
+    if args.clear:
+        for tabel in ("llm_cache", "llm_cache_routing"):
+            store.execute(f"DELETE FROM {tabel}")
+        print("🧹 Cache LLM dikosongkan.")
+    if args.evict:
+        print(f"🧹 {evict_llm_cache()} entry dibuang.")
+
+    mulai = (date.today() - timedelta(days=args.hari - 1)).isoformat()
+    rows = store.execute("""
+        SELECT profile, tier, SUM(hits), SUM(misses)
+        FROM llm_cache_harian WHERE tanggal >= ?
+        GROUP BY profile, tier ORDER BY profile, tier
+    """, (mulai,), fetch=True)
+
+    print(f"📊 Cache LLM [{LLM_CACHE_BACKEND}] sejak {mulai}\n")
+    print(f"{'profil':<12} {'tier':<8} {'hits':>8} {'misses':>8} {'hit rate':>9}")
+    total_hits = total_misses = 0
+    for profile, tier, hits, misses in rows:
+        total = hits + misses
+        print(f"{profile:<12} {tier:<8} {hits:>8} {misses:>8} {hits / total if total else 0:>9.1%}")
+        if tier == "exact":
+            total_hits, total_misses = total_hits + hits, total_misses + misses
+    if not rows:
+        print("(belum ada data)")
+
+    routing_hits = sum(hits for _, tier, hits, _ in rows if tier == "routing")
+    lookup = total_hits + total_misses
+    if lookup:
+        print(f"\n✅ Panggilan LLM yang dihemat: {total_hits + routing_hits} dari {lookup} "
+              f"({(total_hits + routing_hits) / lookup:.1%})")
+
+    entries = store.execute("SELECT profile, COUNT(*), SUM(hit_count) FROM llm_cache GROUP BY profile", fetch=True)
+    routing = store.execute("SELECT COUNT(*) FROM llm_cache_routing", fetch=True)[0][0]
+    print("\n📦 Entry tersimpan:")
+    for profile, jumlah, hits in entries:
+        print(f"- {profile}: {jumlah} entry, {hits or 0} hit total")
+    print(f"- keputusan routing (semantik): {routing}")
+
+    top = store.execute(
+        "SELECT profile, hit_count, prompt_preview FROM llm_cache WHERE hit_count > 0 ORDER BY hit_count DESC LIMIT ?",
+        (args.top,), fetch=True,
+    )
+    if top:
+        print(f"\n🔥 {len(top)} prompt paling sering terpakai ulang:")
+        for profile, hits, preview in top:
+            ringkas = " ".join((preview or "").split())[-100:]
+            print(f"- [{profile}] {hits}x …{ringkas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# llm_utils.py
+# Factory LLM bersama: satu instance ChatOpenAI per profil (model + temperature)
+# dan satu connection pool HTTP (keep-alive) untuk semua agent dan JawabRAG,
+# sehingga hop antar agent tidak membuka koneksi TLS baru.
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_openai import ChatOpenAI
+
+from llm_cache import get_llm_cache
+from metrics import LLM_CALLS, LLM_LATENCY, LLM_TOKENS
+from tracing import tracing_callbacks
+
+# === Konfigurasi ===
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # openai | mock (lihat mock_llm.py, tanpa jaringan)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_API_KEY_ENV = "OPENROUTER_API_KEY_MISTRAL"
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "8"))  # batas request LLM bersamaan
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "8"))
+LLM_KEEPALIVE_EXPIRY = 120  # detik koneksi idle dipertahankan
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "120"))  # lama menunggu slot koneksi
+LATENCY_WINDOW = 500  # jumlah sampel latensi terakhir per profil
+
+MISTRAL_SMALL = "mistralai/mistral-small-3.2-24b-instruct"
+LLM_PROFILES = {
+    "supervisor": {"model": MISTRAL_SMALL, "temperature": 0.2, "max_retries": 5},
+    "researcher": {"model": MISTRAL_SMALL, "temperature": 0.2, "max_retries": 5},
+    "notulensi": {"model": MISTRAL_SMALL, "temperature": 0.3},
+    "dokumen": {"model": MISTRAL_SMALL, "temperature": 0.3},
+    "rag_agent": {"model": MISTRAL_SMALL, "temperature": 0.3},
+    "rag_jawaban": {"model": MISTRAL_SMALL, "temperature": 0.2},
+}
+
+_lock = threading.Lock()
+_http_client = None
+_http_async_client = None
+_llms = {}
+
+
+# === Connection pool bersama ===
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_TIMEOUT, pool=LLM_POOL_TIMEOUT)
+
+
+def get_http_clients() -> tuple:
+    global _http_client, _http_async_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=_timeout())
+            _http_async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+        return _http_client, _http_async_client
+
+
+def _lepas_http_clients() -> tuple:
+    global _http_client, _http_async_client
+    with _lock:
+        clients = (_http_client, _http_async_client)
+        _http_client = _http_async_client = None
+        _llms.clear()
+        return clients
+
+
+def tutup_http_clients():
+    """
+    Tutup client sync dan async. Jangan dipanggil dari dalam event loop yang
+    sedang berjalan, pakai tutup_http_clients_async di sana.
+    """
+    client, async_client = _lepas_http_clients()
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        asyncio.run(async_client.aclose())
+
+
+async def tutup_http_clients_async():
+    client, async_client = _lepas_http_clients()
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
+
+
+# === Latensi per panggilan ===
+class LatencyCallbackHandler(BaseCallbackHandler):
+    """
+    Catat durasi dan token tiap panggilan LLM per profil.
+    """
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.total_tokens = 0
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+        self._mulai = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id):
+        self._mulai[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id)
+
+    def _selesai(self, run_id, error: bool = False, usage: dict | None = None):
+        mulai = self._mulai.pop(run_id, None)
+        if mulai is None:
+            return
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+        usage = usage or {}
+        tokens = usage.get("total_tokens") or 0
+        LLM_CALLS.inc(profile=self.profile, status="error" if error else "ok")
+        LLM_LATENCY.observe(durasi_ms / 1000, profile=self.profile)
+        for jenis in ("prompt", "completion"):
+            if usage.get(f"{jenis}_tokens"):
+                LLM_TOKENS.inc(usage[f"{jenis}_tokens"], profile=self.profile, jenis=jenis)
+        with self._lock:
+            self.calls += 1
+            self.errors += 1 if error else 0
+            self.total_ms += durasi_ms
+            self.total_tokens += tokens
+            self.samples.append(durasi_ms)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._selesai(run_id, usage=(response.llm_output or {}).get("token_usage"))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._selesai(run_id, error=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            urut = sorted(self.samples)
+        persen = lambda p: urut[min(len(urut) - 1, int(p / 100 * len(urut)))] if urut else 0.0
+        return {
+            "profile": self.profile,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "p50_ms": persen(50),
+            "p95_ms": persen(95),
+            "total_tokens": self.total_tokens,
+        }
+
+
+_latency_handlers = {}
+
+
+def _handler(profile: str) -> LatencyCallbackHandler:
+    if profile not in _latency_handlers:
+        _latency_handlers[profile] = LatencyCallbackHandler(profile)
+    return _latency_handlers[profile]
+
+
+# === Factory ===
+def get_llm(profile: str) -> ChatOpenAI:
+    """
+    Instance ChatOpenAI untuk profil tertentu, dibuat sekali lalu dipakai ulang.
+    """
+    if profile not in LLM_PROFILES:
+        raise ValueError(f"Profil LLM tidak dikenal: {profile}")
+    if LLM_BACKEND == "mock":
+        return _get_mock_llm(profile)
+    http_client, http_async_client = get_http_clients()
+    with _lock:
+        if profile not in _llms:
+            config = LLM_PROFILES[profile]
+            _llms[profile] = ChatOpenAI(
+                model=config["model"],
+                temperature=config["temperature"],
+                max_retries=config.get("max_retries", 2),
+                base_url=LLM_BASE_URL,
+                api_key=os.getenv(LLM_API_KEY_ENV),
+                http_client=http_client,
+                http_async_client=http_async_client,
+                callbacks=[_handler(profile), *tracing_callbacks()],
+                metadata={"llm_profile": profile},
+                cache=get_llm_cache(profile),  # None jika LLM_CACHE_BACKEND=off
+            )
+        return _llms[profile]
+
+
+def _get_mock_llm(profile: str):
+    from mock_llm import MockChatModel
+
+    with _lock:
+        if profile not in _llms:
+            _llms[profile] = MockChatModel(
+                profile=profile,
+                callbacks=[_handler(profile), *tracing_callbacks()],
+                metadata={"llm_profile": profile},
+                cache=get_llm_cache(profile),
+            )
+        return _llms[profile]
+
+
+def llm_latency_stats() -> list:
+    return [handler.stats() for handler in _latency_handlers.values()]
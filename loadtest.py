@@ -0,0 +1,282 @@
+# loadtest.py
+# Load test end-to-end chat Gradio: N sesi auditor tiruan menjalankan skrip
+# campuran (login, catat, update status, tampilkan, rekap, upload, RAG) lewat
+# run_agent_interface yang sama dengan UI, terhadap Postgres lokal dan LLM
+# mock dengan latensi yang bisa diatur. Laporan: throughput, waktu tunggu
+# antrian, waktu ke pesan pertama, dan p50/p95/p99 per jenis perintah.
+# Jalankan (isi DB dulu dengan generate_synthetic_data.py):
+#   python loadtest.py --sesi 20 --pesan-per-sesi 10 --latensi-llm 300 [--json hasil_loadtest.json]
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import contextlib
+from types import SimpleNamespace
+from collections import defaultdict
+from datetime import date
+
+# === Konfigurasi ===
+PASSWORD = os.getenv("LOADTEST_PASSWORD", "indosat2025")
+MIX_DEFAULT = "catat=3,status=1,tampilkan=2,rekap=1,upload=1,rag=2"
+PESAN_GILIRAN = "🤖 Giliran Anda tiba"
+UPLOAD_USER_ID = "default"  # sama dengan handle_upload di gradio_app
+PERIODE_REKAP = ["rekap minggu ini", "rekap minggu kemarin", "rekap bulan ini", "rekap bulan kemarin"]
+PERTANYAAN_RAG = [
+    "apa saja gangguan di site {site} bulan ini?",
+    "ringkas masalah transmisi site {site}?",
+    "kapan terakhir genset site {site} bermasalah?",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test chat notulensi dengan sesi auditor tiruan.")
+    parser.add_argument("--sesi", type=int, default=10, help="Jumlah sesi bersamaan.")
+    parser.add_argument("--pesan-per-sesi", type=int, default=8, help="Perintah per sesi setelah login.")
+    parser.add_argument("--mix", default=MIX_DEFAULT, help="Bobot jenis perintah, contoh catat=3,rag=1.")
+    parser.add_argument("--jeda", type=float, default=1.0, help="Rata-rata jeda berpikir antar pesan (detik).")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Sesi dimulai merata dalam rentang ini (detik).")
+    parser.add_argument("--latensi-llm", type=float, default=300, help="Latensi LLM mock (ms).")
+    parser.add_argument("--jitter-llm", type=float, default=50, help="Jitter latensi LLM mock (ms).")
+    parser.add_argument("--llm-asli", action="store_true", help="Pakai LLM_BACKEND dari env, bukan mock.")
+    parser.add_argument("--dengan-cache", action="store_true",
+                        help="Aktifkan cache LLM (default off supaya latensi mock selalu terukur).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Simpan hasil mentah + ringkasan ke file JSON.")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan log aplikasi selama load test.")
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+if not ARGS.llm_asli:
+    # Harus di-set sebelum llm_utils / mock_llm diimport
+    os.environ["LLM_BACKEND"] = "mock"
+    os.environ["MOCK_LLM_LATENCY_MS"] = str(ARGS.latensi_llm)
+    os.environ["MOCK_LLM_JITTER_MS"] = str(ARGS.jitter_llm)
+if not ARGS.dengan_cache:
+    # Cache hit melewati latensi LLM, persentil jadi tidak mencerminkan konfigurasi run
+    os.environ["LLM_CACHE_BACKEND"] = "off"
+elif not ARGS.llm_asli:
+    # Jawaban mock jangan masuk ke llm_cache.sqlite yang dipakai aplikasi
+    os.environ["LLM_CACHE_BACKEND"] = "sqlite"
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="loadtest_"), "llm_cache.sqlite")
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from gradio_app import run_agent_interface
+from agents.agent_supervisor import create_supervisor_agent
+from agents.agent_researcher import create_researcher_agent
+from agents.agent_notulensi_teks import create_notulensi_teks_agent
+from agents.agent_dokumen import create_dokumen_agent
+from agents.agent_rag import create_rag_agent
+from tools.tools_researcher import load_all_site_names, get_site_catalog
+from tools.tools_rag import init_fts_index
+from tools.tools_dokumen import simpan_file
+from db_utils import init_catatan_indexes
+from eval_retrieval import persentil
+from logbook import flush_logbook
+from tracing import flush_traces
+from generate_synthetic_data import _isi_catatan, buat_file_contoh
+
+
+# === Persiapan ===
+def siapkan_agent():
+    """
+    Wiring agent sama dengan main.py, tanpa meluncurkan UI.
+    """
+    supervisor = create_supervisor_agent(
+        researcher_agent=create_researcher_agent(),
+        notulensi_teks_agent=create_notulensi_teks_agent(),
+        dokumen_agent=create_dokumen_agent(),
+        rag_agent=create_rag_agent(),
+    )
+    load_all_site_names()
+    init_fts_index()
+    init_catatan_indexes()
+    return supervisor
+
+
+def parse_mix(teks: str) -> dict:
+    mix = {}
+    for bagian in teks.split(","):
+        if not bagian.strip():
+            continue
+        nama, _, bobot = bagian.partition("=")
+        nama = nama.strip()
+        if nama not in PERINTAH:
+            raise ValueError(f"jenis perintah '{nama}' tidak dikenal (pilihan: {', '.join(PERINTAH)})")
+        mix[nama] = float(bobot or 1)
+    return mix
+
+
+# === Skrip perintah ===
+# Tiap jenis → fungsi(rng, site) yang mengembalikan pesan chat
+PERINTAH = {
+    "catat": lambda rng, site: f"catat site {site} {_isi_catatan(rng)}",
+    "status": lambda rng, site: f"site {site} {_isi_catatan(rng).split('.')[0].lower()} sudah selesai diperbaiki",
+    "tampilkan": lambda rng, site: f"tampilkan catatan site {site}",
+    "rekap": lambda rng, site: rng.choice(PERIODE_REKAP),
+    "upload": lambda rng, site: f"unggah dokumen site {site}",
+    "rag": lambda rng, site: rng.choice(PERTANYAAN_RAG).format(site=site),
+}
+
+
+async def kirim_pesan(agent, sesi: dict, jenis: str, pesan: str) -> dict:
+    """
+    Konsumsi generator run_agent_interface seperti handle_chat_submission dan
+    catat waktu pesan pertama, giliran (akhir antrian) dan jawaban akhir.
+    """
+    mulai = time.perf_counter()
+    t_pertama = t_giliran = None
+    teks = ""
+    async for teks, _, auth, _ in run_agent_interface(pesan, [], agent, sesi["auth"], sesi["id"]):
+        sekarang = time.perf_counter()
+        if t_pertama is None:
+            t_pertama = sekarang
+        if teks and teks.startswith(PESAN_GILIRAN):
+            t_giliran = sekarang
+        sesi["auth"] = auth
+    selesai = time.perf_counter()
+    return {
+        "jenis": jenis,
+        "sesi": sesi["id"],
+        "mulai": mulai,
+        "latensi": selesai - mulai,
+        "pesan_pertama": (t_pertama or selesai) - mulai,
+        "tunggu_antrian": (t_giliran - mulai) if t_giliran else 0.0,
+        "error": (teks or "").startswith("❌"),
+    }
+
+
+async def kirim_upload(path: str) -> dict:
+    # Sama dengan tombol Upload: simpan_file sinkron, dijalankan di thread
+    mulai = time.perf_counter()
+    hasil = await asyncio.to_thread(simpan_file, SimpleNamespace(name=path), user_id=UPLOAD_USER_ID)
+    latensi = time.perf_counter() - mulai
+    return {
+        "jenis": "upload.file", "sesi": None, "mulai": mulai, "latensi": latensi,
+        "pesan_pertama": latensi, "tunggu_antrian": 0.0,
+        "error": str(hasil).startswith(("❌", "⚠️", "⛔")),
+    }
+
+
+async def sesi_auditor(nomor: int, agent, args, sites: list, mix: dict, file_upload: list, hasil: list):
+    rng = random.Random(f"{args.seed}:{nomor}")
+    await asyncio.sleep(args.ramp_up * nomor / max(1, args.sesi))
+    sesi = {"id": str(uuid.uuid4()), "auth": False}
+
+    hasil.append(await kirim_pesan(agent, sesi, "login", PASSWORD))
+    if not sesi["auth"]:
+        return
+
+    jenis_list, bobot = list(mix), list(mix.values())
+    for _ in range(args.pesan_per_sesi):
+        await asyncio.sleep(rng.expovariate(1 / args.jeda) if args.jeda > 0 else 0)
+        jenis = rng.choices(jenis_list, weights=bobot)[0]
+        site = rng.choice(sites)
+        hasil.append(await kirim_pesan(agent, sesi, jenis, PERINTAH[jenis](rng, site)))
+        if jenis == "upload" and file_upload:
+            hasil.append(await kirim_upload(rng.choice(file_upload)))
+
+
+# === Laporan ===
+def ringkas(hasil: list, durasi: float) -> dict:
+    per_jenis = defaultdict(list)
+    for r in hasil:
+        per_jenis[r["jenis"]].append(r)
+
+    def statistik(daftar: list) -> dict:
+        latensi = [r["latensi"] for r in daftar]
+        antrian = [r["tunggu_antrian"] for r in daftar]
+        pertama = [r["pesan_pertama"] for r in daftar]
+        return {
+            "n": len(daftar),
+            "error": sum(r["error"] for r in daftar),
+            "rata2": statistics.mean(latensi),
+            "p50": persentil(latensi, 50),
+            "p95": persentil(latensi, 95),
+            "p99": persentil(latensi, 99),
+            "antrian_p50": persentil(antrian, 50),
+            "antrian_p95": persentil(antrian, 95),
+            "pesan_pertama_p95": persentil(pertama, 95),
+        }
+
+    return {
+        "durasi_s": durasi,
+        "throughput_per_s": len(hasil) / durasi if durasi else 0.0,
+        "total": statistik(hasil) if hasil else {},
+        "per_jenis": {jenis: statistik(daftar) for jenis, daftar in sorted(per_jenis.items())},
+    }
+
+
+def cetak_laporan(ringkasan: dict, args):
+    print(f"\n📊 Load test {args.sesi} sesi x {args.pesan_per_sesi} pesan — {ringkasan['durasi_s']:.1f} s, "
+          f"throughput {ringkasan['throughput_per_s']:.2f} pesan/s")
+    print(f"{'jenis':<12} {'n':>5} {'err':>4} {'rata2 s':>8} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} "
+          f"{'antrian p50':>12} {'antrian p95':>12} {'pertama p95':>12}")
+    baris = list(ringkasan["per_jenis"].items())
+    if ringkasan["total"]:
+        baris.append(("TOTAL", ringkasan["total"]))
+    for jenis, s in baris:
+        print(f"{jenis:<12} {s['n']:>5} {s['error']:>4} {s['rata2']:>8.2f} {s['p50']:>8.2f} {s['p95']:>8.2f} "
+              f"{s['p99']:>8.2f} {s['antrian_p50']:>12.2f} {s['antrian_p95']:>12.2f} {s['pesan_pertama_p95']:>12.3f}")
+
+
+async def jalankan(args):
+    mix = parse_mix(args.mix)
+    agent = siapkan_agent()
+    sites = sorted(get_site_catalog())
+    if not sites:
+        print("❌ Tabel site_name kosong. Isi dulu dengan generate_synthetic_data.py.")
+        return None
+
+    hasil = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_upload = []
+        if "upload" in mix:
+            buat_file_contoh([(None, sites[0])], tmp_dir, args.seed, date.today(), 90)
+            file_upload = [os.path.join(tmp_dir, f) for f in sorted(os.listdir(tmp_dir))
+                           if f.endswith((".txt", ".docx", ".pdf"))]
+
+        print(f"🚀 {args.sesi} sesi, mix {mix}, LLM {os.getenv('LLM_BACKEND', 'openai')}, "
+              f"cache LLM {os.getenv('LLM_CACHE_BACKEND', 'sqlite')}")
+        mulai = time.perf_counter()
+        with open(os.devnull, "w") as devnull, \
+                (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)):
+            await asyncio.gather(*(
+                sesi_auditor(i, agent, args, sites, mix, file_upload, hasil) for i in range(args.sesi)
+            ))
+        durasi = time.perf_counter() - mulai
+    return hasil, durasi
+
+
+def main():
+    args = ARGS
+    try:
+        keluaran = asyncio.run(jalankan(args))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    if keluaran is None:
+        sys.exit(1)
+    hasil, durasi = keluaran
+    flush_logbook()
+    flush_traces()
+
+    ringkasan = ringkas(hasil, durasi)
+    cetak_laporan(ringkasan, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"argumen": vars(args), "ringkasan": ringkasan, "hasil": hasil}, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Hasil disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# logbook.py
+# Logbook chat asinkron: record masuk antrian in-memory, thread background
+# menulis per batch ke CSV (rotasi per hari / ukuran) dan opsional salinan
+# SQLite untuk analitik. Request tidak pernah menunggu I/O logbook.
+import os
+import csv
+import queue
+import atexit
+import sqlite3
+import threading
+from datetime import datetime, date
+
+from metrics import Counter, Gauge
+
+# === Konfigurasi ===
+LOGBOOK_PATH = os.getenv("LOGBOOK_PATH", "chatbot_logbook.csv")
+LOGBOOK_MAX_BYTES = int(os.getenv("LOGBOOK_MAX_BYTES", str(10 * 1024 * 1024)))  # 0 = tanpa batas ukuran
+LOGBOOK_ROTATE_DAILY = os.getenv("LOGBOOK_ROTATE_DAILY", "1") == "1"
+LOGBOOK_SQLITE_PATH = os.getenv("LOGBOOK_SQLITE_PATH", "")  # kosong = tanpa salinan SQLite
+LOGBOOK_BATCH_SIZE = 200
+LOGBOOK_FLUSH_SECONDS = 1.0
+LOGBOOK_QUEUE_MAX = 10000  # record dibuang (dan dihitung) jika antrian penuh
+
+HEADER = ["Timestamp", "Pertanyaan", "Agent yang menangani", "Jawaban", "Waktu Respons (detik)", "Session ID", "Trace ID"]
+
+LOGBOOK_DROPPED = Counter("logbook_dropped_total", "Record logbook yang dibuang karena antrian penuh.")
+LOGBOOK_WRITTEN = Counter("logbook_written_total", "Record logbook yang sudah ditulis ke CSV.")
+LOGBOOK_QUEUE = Gauge("logbook_queue_depth", "Record logbook yang menunggu ditulis.")
+
+
+class LogbookWriter:
+    """
+    Satu-satunya penulis file logbook; semua sesi hanya memasukkan record
+    ke antrian sehingga baris tidak saling bertumpuk.
+    """
+
+    def __init__(self, path: str = LOGBOOK_PATH, max_bytes: int = LOGBOOK_MAX_BYTES,
+                 rotate_daily: bool = LOGBOOK_ROTATE_DAILY, sqlite_path: str = LOGBOOK_SQLITE_PATH):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.sqlite_path = sqlite_path
+        self._antrian = queue.Queue(maxsize=LOGBOOK_QUEUE_MAX)
+        self._tulis_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._sqlite = None
+        self._hari_file = None
+
+    # --- sisi request (non-blocking) ---
+    def catat(self, user_message: str, agent_name: str, bot_response: str, response_time: float,
+              session_id: str = "", trace_id: str = ""):
+        record = [
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            user_message, agent_name, bot_response, f"{response_time:.2f}", session_id or "", trace_id or "",
+        ]
+        try:
+            self._antrian.put_nowait(record)
+        except queue.Full:
+            LOGBOOK_DROPPED.inc()
+            return
+        self._pastikan_thread()
+
+    def _pastikan_thread(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="logbook-writer", daemon=True)
+                    self._thread.start()
+
+    # --- sisi background ---
+    def _ambil_batch(self, timeout: float) -> list:
+        batch = []
+        try:
+            batch.append(self._antrian.get(timeout=timeout))
+            while len(batch) < LOGBOOK_BATCH_SIZE:
+                batch.append(self._antrian.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._ambil_batch(LOGBOOK_FLUSH_SECONDS)
+            if batch:
+                self._tulis(batch)
+
+    def flush(self):
+        """
+        Tulis semua record yang masih di antrian (dipanggil saat exit).
+        """
+        while True:
+            batch = self._ambil_batch(0.01)
+            if not batch:
+                return
+            self._tulis(batch)
+
+    def _tulis(self, batch: list):
+        with self._tulis_lock:
+            try:
+                self._rotasi_jika_perlu()
+                baru = not os.path.exists(self.path)
+                with open(self.path, mode="a", newline="", encoding="utf-8") as file:
+                    writer = csv.writer(file)
+                    if baru:
+                        writer.writerow(HEADER)
+                    writer.writerows(batch)
+                LOGBOOK_WRITTEN.inc(len(batch))
+            except Exception as e:
+                print(f"❌ Gagal menulis logbook: {e}")
+            if self.sqlite_path:
+                self._tulis_sqlite(batch)
+
+    # --- rotasi ---
+    def _perlu_rotasi(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        if self._hari_file is None:
+            self._hari_file = date.fromtimestamp(os.path.getmtime(self.path))
+            if self._header_lama():
+                return True
+        if self.rotate_daily and self._hari_file != date.today():
+            return True
+        return bool(self.max_bytes) and os.path.getsize(self.path) >= self.max_bytes
+
+    def _header_lama(self) -> bool:
+        with open(self.path, newline="", encoding="utf-8") as file:
+            return next(csv.reader(file), None) != HEADER
+
+    def _rotasi_jika_perlu(self):
+        if not self._perlu_rotasi():
+            self._hari_file = date.today()
+            return
+        base, ext = os.path.splitext(self.path)
+        tujuan = f"{base}.{self._hari_file.strftime('%Y%m%d')}{ext}"
+        nomor = 1
+        while os.path.exists(tujuan):
+            tujuan = f"{base}.{self._hari_file.strftime('%Y%m%d')}-{nomor}{ext}"
+            nomor += 1
+        os.replace(self.path, tujuan)
+        print(f"♻️ Logbook dirotasi ke {tujuan}")
+        self._hari_file = date.today()
+
+    # --- salinan SQLite untuk analitik ---
+    def _tulis_sqlite(self, batch: list):
+        try:
+            if self._sqlite is None:
+                self._sqlite = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+                self._sqlite.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_log (
+                        timestamp TEXT,
+                        pertanyaan TEXT,
+                        agent TEXT,
+                        jawaban TEXT,
+                        response_time REAL,
+                        session_id TEXT,
+                        trace_id TEXT
+                    )
+                """)
+                self._sqlite.execute("CREATE INDEX IF NOT EXISTS idx_chat_log_timestamp ON chat_log (timestamp)")
+            self._sqlite.executemany(
+                "INSERT INTO chat_log VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*row[:4], float(row[4]), row[5], row[6]) for row in batch],
+            )
+            self._sqlite.commit()
+        except Exception as e:
+            print(f"❌ Gagal menulis salinan logbook SQLite: {e}")
+
+
+_writer = LogbookWriter()
+atexit.register(_writer.flush)
+LOGBOOK_QUEUE.set_function(_writer._antrian.qsize)
+
+
+def catat_chat(user_message: str, agent_name: str, bot_response: str, response_time: float,
+               session_id: str = "", trace_id: str = ""):
+    _writer.catat(user_message, agent_name, bot_response, response_time, session_id, trace_id)
+
+
+def flush_logbook():
+    _writer.flush()
@@ -16,29 +16,38 @@ from agents.agent_rag import create_rag_agent
 
 # =================== Import Pendukung ===================
 from tools.tools_researcher import load_all_site_names
+from tools.tools_rag import init_fts_index
+from db_utils import init_catatan_indexes
+from tools.tools_vector_gc import mulai_gc_terjadwal
+from metrics import mulai_server_metrics
 
-# =================== Inisialisasi Semua Agent ===================
-print("🚀 Menginisialisasi semua agent...")
-researcher = create_researcher_agent()
-notulensi_teks = create_notulensi_teks_agent()
-dokumen = create_dokumen_agent()
-rag = create_rag_agent()
-
-
-supervisor_agent = create_supervisor_agent(
-    researcher_agent=researcher,
-    notulensi_teks_agent=notulensi_teks,
-    dokumen_agent=dokumen,
-    rag_agent=rag
-)
-print("✅ Semua agent siap digunakan.")
-
-# =================== Load Data Referensi ===================
-load_all_site_names()
-
-
-# =================== Jalankan Gradio App ===================
-
+# Inisialisasi hanya saat dijalankan langsung: worker spawn (arsip rekap)
+# meng-import ulang modul ini dan tidak boleh membuat agent / server lagi.
 if __name__ == "__main__":
+    # =================== Inisialisasi Semua Agent ===================
+    print("🚀 Menginisialisasi semua agent...")
+    researcher = create_researcher_agent()
+    notulensi_teks = create_notulensi_teks_agent()
+    dokumen = create_dokumen_agent()
+    rag = create_rag_agent()
+
+
+    supervisor_agent = create_supervisor_agent(
+        researcher_agent=researcher,
+        notulensi_teks_agent=notulensi_teks,
+        dokumen_agent=dokumen,
+        rag_agent=rag
+    )
+    print("✅ Semua agent siap digunakan.")
+
+    # =================== Load Data Referensi ===================
+    load_all_site_names()
+    init_fts_index()
+    init_catatan_indexes()
+    mulai_gc_terjadwal()  # aktif jika VECTOR_GC_INTERVAL_HOURS > 0
+    mulai_server_metrics()  # /metrics di METRICS_PORT (default 9464), 0 = nonaktif
+
+
+    # =================== Jalankan Gradio App ===================
     app = build_gradio_app(supervisor_agent)
     app.queue().launch(server_name="127.0.0.1", server_port=7861)
\ No newline at end of file
@@ -0,0 +1,274 @@
+# metrics.py
+# Metrik format teks Prometheus di port HTTP lokal terpisah (default 9464):
+# antrian, slot agent, LLM per profil, token, latensi DB, koneksi, cache dan
+# throughput ingest upload. Tanpa dependensi tambahan; scrape di /metrics.
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# === Konfigurasi ===
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))  # 0 = nonaktif
+METRICS_PREFIX = "chatbot_"
+
+BUCKET_DETIK = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BUCKET_ANTRIAN = (0.5, 1, 2, 5, 10, 20, 30, 60, 90, 120)
+
+_registry = []
+_collectors = []
+_registry_lock = threading.Lock()
+
+
+# === Tipe metrik ===
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_label(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_nilai(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    tipe = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = METRICS_PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Label {self.name} harus {self.labelnames}, dapat {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.tipe}"]
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_label(dict(zip(self.labelnames, key)))} {_format_nilai(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    tipe = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    tipe = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self._fn = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn):
+        """
+        Nilai dibaca saat scrape (hanya untuk gauge tanpa label).
+        """
+        self._fn = fn
+
+    def render(self) -> list:
+        if self._fn is None:
+            return super().render()
+        try:
+            value = self._fn()
+        except Exception:
+            return self._header()
+        return self._header() + [f"{self.name} {_format_nilai(value)}"]
+
+
+class Histogram(_Metric):
+    tipe = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = BUCKET_DETIK):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, batas in enumerate(self.buckets):
+                if value <= batas:
+                    entry["counts"][i] += 1
+                    break
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(key, dict(entry, counts=list(entry["counts"]))) for key, entry in self._values.items()]
+        lines = self._header()
+        for key, entry in items:
+            labels = dict(zip(self.labelnames, key))
+            kumulatif = 0
+            for batas, jumlah in zip(self.buckets, entry["counts"]):
+                kumulatif += jumlah
+                le = "+Inf" if batas == float("inf") else repr(float(batas))
+                lines.append(f"{self.name}_bucket{_format_label({**labels, 'le': le})} {kumulatif}")
+            lines.append(f"{self.name}_sum{_format_label(labels)} {_format_nilai(entry['sum'])}")
+            lines.append(f"{self.name}_count{_format_label(labels)} {entry['count']}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self._mulai = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._mulai, **self.labels)
+        return False
+
+
+# === Collector saat scrape ===
+def register_collector(fn):
+    """
+    fn() -> list of (nama, tipe, help, [(labels dict, nilai)]); dipanggil
+    setiap scrape untuk metrik yang sumbernya sudah ada di modul lain.
+    """
+    with _registry_lock:
+        _collectors.append(fn)
+    return fn
+
+
+def _render_collector(fn) -> list:
+    lines = []
+    try:
+        families = fn()
+    except Exception as e:
+        return [f"# collector {getattr(fn, '__name__', fn)} gagal: {_escape(e)}"]
+    for name, tipe, help_text, samples in families:
+        name = METRICS_PREFIX + name
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {tipe}"]
+        for labels, value in samples:
+            lines.append(f"{name}{_format_label(labels)} {_format_nilai(value)}")
+    return lines
+
+
+def render_metrics() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+        collectors = list(_collectors)
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+    for fn in collectors:
+        lines += _render_collector(fn)
+    return "\n".join(lines) + "\n"
+
+
+# === Metrik aplikasi ===
+QUEUE_DEPTH = Gauge("queue_depth", "Jumlah sesi di antrian agent (termasuk yang sedang dilayani).")
+QUEUE_WAIT = Histogram("queue_wait_seconds", "Lama menunggu giliran di antrian.", ("hasil",), buckets=BUCKET_ANTRIAN)
+AGENT_SLOTS_TOTAL = Gauge("agent_slots_total", "Jumlah slot agent yang bisa memproses request bersamaan.")
+AGENT_SLOTS_ACTIVE = Gauge("agent_slots_active", "Slot agent yang sedang memproses request.")
+REQUEST_DURATION = Histogram("request_duration_seconds", "Durasi pemrosesan request oleh agent (tanpa antrian).", ("status",))
+
+LLM_CALLS = Counter("llm_calls_total", "Jumlah panggilan LLM per profil agent.", ("profile", "status"))
+LLM_LATENCY = Histogram("llm_latency_seconds", "Latensi panggilan LLM per profil agent.", ("profile",))
+LLM_TOKENS = Counter("llm_tokens_total", "Token LLM terpakai per profil.", ("profile", "jenis"))
+
+DB_QUERY_LATENCY = Histogram("db_query_seconds", "Latensi query PostgreSQL per jenis statement.", ("operasi",))
+DB_CONNECT_LATENCY = Histogram("db_connect_seconds", "Lama membuka koneksi PostgreSQL.")
+DB_CONNECTIONS_OPENED = Counter("db_connections_opened_total", "Koneksi PostgreSQL yang dibuka aplikasi.", ("status",))
+
+INGEST_FILES = Counter("ingest_files_total", "File upload yang diproses.", ("format", "status"))
+INGEST_BYTES = Counter("ingest_bytes_total", "Ukuran file upload yang diproses.", ("format",))
+INGEST_DURATION = Histogram("ingest_duration_seconds", "Durasi ingest satu file upload.", ("format",))
+INGEST_CHUNKS = Counter("ingest_chunks_total", "Chunk dokumen yang diindeks ke vectorstore.", ("backend",))
+
+
+def _metrik_cache():
+    from cache_utils import semua_cache
+
+    caches = semua_cache()
+    return [
+        ("cache_hits_total", "counter", "Hit cache in-process.", [({"cache": c.name}, c.hits) for c in caches]),
+        ("cache_misses_total", "counter", "Miss cache in-process.", [({"cache": c.name}, c.misses) for c in caches]),
+        ("cache_entries", "gauge", "Jumlah entry cache in-process.", [({"cache": c.name}, len(c)) for c in caches]),
+    ]
+
+
+register_collector(_metrik_cache)
+
+
+# === Server HTTP ===
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def mulai_server_metrics(host: str = METRICS_HOST, port: int = METRICS_PORT):
+    """
+    Jalankan endpoint /metrics di thread daemon. Aman dipanggil berulang.
+    """
+    global _server
+    if _server is not None or not port:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Gagal membuka port metrics {host}:{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 Metrics tersedia di http://{host}:{port}/metrics")
+    return _server
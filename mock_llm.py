@@ -0,0 +1,234 @@
+# mock_llm.py
+# LLM tiruan untuk benchmark / uji regresi tanpa jaringan. Jawaban ReAct
+# di-script secara deterministik dari isi prompt (daftar tool, pertanyaan,
+# Observation terakhir) dengan latensi yang bisa diatur.
+# - In-process: LLM_BACKEND=mock → get_llm() mengembalikan MockChatModel.
+# - Server HTTP kompatibel OpenAI: python mock_llm.py --port 8001, lalu
+#   LLM_BASE_URL=http://127.0.0.1:8001/v1 (API key boleh diisi apa saja).
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from prompt_utils import hitung_token
+
+# === Konfigurasi ===
+MOCK_LLM_LATENCY_MS = float(os.getenv("MOCK_LLM_LATENCY_MS", "300"))
+MOCK_LLM_JITTER_MS = float(os.getenv("MOCK_LLM_JITTER_MS", "50"))
+MOCK_MODEL_NAME = "mock-react"
+
+# Aturan routing: (pola regex pada pertanyaan, urutan tool yang dicoba).
+# Tool pertama yang tersedia di prompt agent dipakai, jadi aturan yang sama
+# berlaku untuk supervisor maupun sub-agent.
+ATURAN_ROUTING = [
+    (r"^(halo|hai|hi|selamat (pagi|siang|sore|malam))\b|terima kasih|makasih", ["GreetingAndChat"]),
+    (r"\brekap\b", ["RekapCatatan"]),
+    (r"\b(sudah|telah) (selesai|diperbaiki|teratasi|diganti|normal)\b", ["UpdateStatusCatatan"]),
+    (r"\b(unggah|upload|kirim file)\b", ["UnggahDokumen"]),
+    (r"\bsimpan (file|dokumen)\b", ["SimpanFile"]),
+    (r"^lanjut$|\b(tampilkan|lihat|baca)\b.*\b(catatan|notulensi|laporan)\b", ["TampilkanNotulensi"]),
+    (r"\b(site id|id site|daftar (nama )?site|nama site|site apa saja)\b", ["SiteResearcher", "SiteDatabaseQuery"]),
+    (r"\?|\b(sebutkan|berikan|tunjukkan|daftar)\b", ["JawabRAG"]),
+    (r"^\w+_(pl|mt|tb|ep)$|^\d{2}[a-z]{3}\d{4}$", ["SiteNameOnlyResponder"]),
+    (r"\b(catat|notulensi|cukup)\b", ["CatatNotulensi"]),
+]
+TOOL_DEFAULT = ["CatatNotulensi"]
+
+
+# === Logika skrip ReAct ===
+def _daftar_tool(prompt: str) -> list:
+    match = re.search(r"salah satu dari \[([^\]]*)\]", prompt)
+    if not match:
+        return []
+    return [t.strip() for t in match.group(1).split(",") if t.strip()]
+
+
+def _pertanyaan_dan_scratchpad(prompt: str) -> tuple:
+    posisi = prompt.rfind("\nPertanyaan:")
+    if posisi < 0:
+        return "", ""
+    sisa = prompt[posisi + len("\nPertanyaan:"):]
+    baris, _, scratchpad = sisa.partition("\n")
+    return baris.strip(), scratchpad
+
+
+def pilih_tool(pertanyaan: str, tools: list) -> str:
+    teks = pertanyaan.lower().strip()
+    for pola, kandidat in ATURAN_ROUTING:
+        if re.search(pola, teks):
+            for tool in kandidat:
+                if tool in tools:
+                    return tool
+    for tool in TOOL_DEFAULT:
+        if tool in tools:
+            return tool
+    return tools[0]
+
+
+def respon_mock(prompt: str) -> str:
+    """
+    Balasan deterministik: Action untuk langkah pertama, Final Answer setelah
+    ada Observation, atau jawaban teks biasa untuk prompt non-ReAct (chain RAG).
+    """
+    tools = _daftar_tool(prompt)
+    if not tools:
+        konteks = re.search(r"Pertanyaan:\s*(.+)", prompt)
+        topik = konteks.group(1).strip() if konteks else "pertanyaan"
+        return f"[mock] Ringkasan untuk: {topik[:200]}"
+
+    pertanyaan, scratchpad = _pertanyaan_dan_scratchpad(prompt)
+    if "Observation:" in scratchpad:
+        observasi = scratchpad.rsplit("Observation:", 1)[1].split("\nThought:", 1)[0].strip()
+        return f"Thought: Saya sekarang sudah tahu jawaban akhirnya.\nFinal Answer: {observasi or '[mock] selesai'}"
+
+    tool = pilih_tool(pertanyaan, tools)
+    return (
+        f"Thought: Pertanyaan ini ditangani oleh {tool}.\n"
+        f"Action: {tool}\n"
+        f"Action Input: {pertanyaan}"
+    )
+
+
+def _latensi_detik(prompt: str, latency_ms: float, jitter_ms: float) -> float:
+    # Jitter di-seed dari hash prompt: latensi sama untuk prompt yang sama
+    seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    jitter = random.Random(seed).uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0
+    return max(0.0, latency_ms + jitter) / 1000
+
+
+def _potong_stop(teks: str, stop) -> str:
+    for s in stop or []:
+        if s and s in teks:
+            teks = teks.split(s, 1)[0]
+    return teks
+
+
+def _usage(prompt: str, jawaban: str) -> dict:
+    prompt_tokens, completion_tokens = hitung_token(prompt), hitung_token(jawaban)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+# === In-process ===
+class MockChatModel(BaseChatModel):
+    """
+    Pengganti ChatOpenAI tanpa jaringan; dipakai llm_utils saat LLM_BACKEND=mock.
+    """
+
+    profile: str = "mock"
+    latency_ms: float = MOCK_LLM_LATENCY_MS
+    jitter_ms: float = MOCK_LLM_JITTER_MS
+
+    @property
+    def _llm_type(self) -> str:
+        return MOCK_MODEL_NAME
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": MOCK_MODEL_NAME, "profile": self.profile}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        time.sleep(_latensi_detik(prompt, self.latency_ms, self.jitter_ms))
+        jawaban = _potong_stop(respon_mock(prompt), stop)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=jawaban))],
+            llm_output={"token_usage": _usage(prompt, jawaban), "model_name": MOCK_MODEL_NAME},
+        )
+
+
+# === Server HTTP kompatibel OpenAI ===
+def buat_handler(latency_ms: float, jitter_ms: float):
+    class MockOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, sama seperti pool httpx di llm_utils
+
+        def _kirim_json(self, status: int, data: dict):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._kirim_json(200, {"object": "list", "data": [{"id": MOCK_MODEL_NAME, "object": "model"}]})
+            else:
+                self._kirim_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._kirim_json(404, {"error": {"message": "not found"}})
+                return
+            panjang = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(panjang) or b"{}")
+            except ValueError:
+                self._kirim_json(400, {"error": {"message": "JSON tidak valid"}})
+                return
+            if payload.get("stream"):
+                self._kirim_json(400, {"error": {"message": "stream tidak didukung server mock"}})
+                return
+
+            prompt = "\n".join(str(m.get("content") or "") for m in payload.get("messages", []))
+            time.sleep(_latensi_detik(prompt, latency_ms, jitter_ms))
+            stop = payload.get("stop")
+            jawaban = _potong_stop(respon_mock(prompt), [stop] if isinstance(stop, str) else stop)
+            self._kirim_json(200, {
+                "id": "chatcmpl-mock-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12],
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", MOCK_MODEL_NAME),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": jawaban},
+                    "finish_reason": "stop",
+                }],
+                "usage": _usage(prompt, jawaban),
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockOpenAIHandler
+
+
+def jalankan_server(host: str = "127.0.0.1", port: int = 8001, latency_ms: float = MOCK_LLM_LATENCY_MS,
+                    jitter_ms: float = MOCK_LLM_JITTER_MS) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), buat_handler(latency_ms, jitter_ms))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server LLM tiruan kompatibel OpenAI chat API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=MOCK_LLM_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=MOCK_LLM_JITTER_MS)
+    args = parser.parse_args()
+
+    server = jalankan_server(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(f"🤖 Mock LLM aktif di http://{args.host}:{args.port}/v1 "
+          f"(latensi {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Mock LLM dihentikan.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# prompt_tokens_report.py
+# Laporan anggaran token prompt: token per prompt agent (total dan prefix
+# statis yang bisa di-cache provider) serta perkiraan token prompt per request
+# untuk setiap rute supervisor.
+# Jalankan: python prompt_tokens_report.py [--input "apa gangguan site X?"] [--json]
+import argparse
+import json
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault("OPENROUTER_API_KEY_MISTRAL", "laporan-token")  # agent dibuat tanpa memanggil LLM
+
+from agents.agent_supervisor import create_supervisor_agent
+from agents.agent_researcher import create_researcher_agent
+from agents.agent_notulensi_teks import create_notulensi_teks_agent
+from agents.agent_dokumen import create_dokumen_agent
+from agents.agent_rag import create_rag_agent
+from prompt_utils import PROMPT_TERDAFTAR, hitung_token
+
+SENTINEL = "<<<DINAMIS>>>"
+
+# Rute supervisor: (tool, jumlah panggilan supervisor, sub-agent, jumlah panggilan sub-agent).
+# Tool return_direct cukup satu langkah supervisor; sub-agent ReAct biasanya
+# dua langkah (Action lalu Final Answer).
+RUTE = [
+    ("SiteResearcher", 1, "researcher", 2),
+    ("GreetingAndChat", 2, None, 0),
+    ("SiteNameOnlyResponder", 1, None, 0),
+    ("CatatNotulensi", 1, "notulensi", 2),
+    ("UpdateStatusCatatan", 1, "notulensi", 2),
+    ("TampilkanNotulensi", 1, "notulensi", 2),
+    ("RekapCatatan", 1, "notulensi", 2),
+    ("SimpanFile", 1, "dokumen", 2),
+    ("UnggahDokumen", 1, "dokumen", 2),
+    ("JawabRAG", 1, "rag", 2),
+]
+
+
+def bangun_agent():
+    create_supervisor_agent(
+        researcher_agent=create_researcher_agent(),
+        notulensi_teks_agent=create_notulensi_teks_agent(),
+        dokumen_agent=create_dokumen_agent(),
+        rag_agent=create_rag_agent(),
+    )
+
+
+def ukur_prompt(prompt, contoh_input: str) -> dict:
+    """
+    Token total dengan input contoh dan token prefix statis (sebelum
+    variabel dinamis pertama).
+    """
+    variabel = prompt.input_variables
+    dengan_sentinel = prompt.format(**{v: SENTINEL for v in variabel})
+    prefix = dengan_sentinel.split(SENTINEL, 1)[0]
+    isi = {v: "" for v in variabel}
+    isi["input"] = contoh_input
+    lengkap = prompt.format(**isi)
+    total = hitung_token(lengkap)
+    statis = hitung_token(prefix)
+    return {
+        "total": total,
+        "prefix_statis": statis,
+        "persen_statis": round(100 * statis / total, 1) if total else 0.0,
+        "karakter": len(lengkap),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token prompt per agent dan per request.")
+    parser.add_argument("--input", default="apa gangguan di site cilacap_pl?", help="Contoh pertanyaan pengguna.")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON.")
+    args = parser.parse_args()
+
+    bangun_agent()
+    per_prompt = {nama: ukur_prompt(prompt, args.input) for nama, prompt in PROMPT_TERDAFTAR.items()}
+
+    tool_supervisor = PROMPT_TERDAFTAR["supervisor"].partial_variables["tool_names"].split(", ")
+    per_request = []
+    for tool, n_sup, sub, n_sub in RUTE:
+        if tool not in tool_supervisor:
+            continue
+        token_sup = n_sup * per_prompt["supervisor"]["total"]
+        token_sub = n_sub * per_prompt[sub]["total"] if sub else 0
+        statis = n_sup * per_prompt["supervisor"]["prefix_statis"] + (n_sub * per_prompt[sub]["prefix_statis"] if sub else 0)
+        per_request.append({
+            "rute": tool,
+            "panggilan_llm": n_sup + n_sub,
+            "token_prompt": token_sup + token_sub,
+            "token_prefix_statis": statis,
+        })
+
+    if args.json:
+        print(json.dumps({"per_prompt": per_prompt, "per_request": per_request}, indent=2))
+        return
+
+    print("\n📏 Token per prompt (tanpa chat_history/scratchpad):")
+    print(f"{'agent':<12} {'total':>7} {'statis':>7} {'%statis':>8} {'karakter':>9}")
+    for nama, hasil in per_prompt.items():
+        print(f"{nama:<12} {hasil['total']:>7} {hasil['prefix_statis']:>7} {hasil['persen_statis']:>7}% {hasil['karakter']:>9}")
+
+    print("\n🧮 Perkiraan token prompt per request (per rute supervisor):")
+    print(f"{'rute':<22} {'LLM':>4} {'token':>7} {'statis':>7}")
+    for baris in per_request:
+        print(f"{baris['rute']:<22} {baris['panggilan_llm']:>4} {baris['token_prompt']:>7} {baris['token_prefix_statis']:>7}")
+
+
+if __name__ == "__main__":
+    main()
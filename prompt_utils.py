@@ -0,0 +1,48 @@
+# prompt_utils.py
+# Penyusunan prompt ReAct dari blok aturan modular + penghitung token.
+# Urutan blok: bagian statis (instruksi, daftar tool, aturan tool) di depan,
+# bagian dinamis (chat_history, input, scratchpad) di akhir, supaya prefix
+# prompt sama di setiap panggilan dan bisa di-cache oleh provider.
+from langchain_core.tools import render_text_description
+
+# === Penghitung token ===
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def hitung_token(teks: str) -> int:
+        return len(_encoding.encode(teks))
+except Exception:  # tiktoken tidak terpasang / file encoding tidak bisa diunduh (offline)
+    def hitung_token(teks: str) -> int:
+        # Perkiraan kasar: ±4 karakter per token
+        return max(1, len(teks) // 4)
+
+
+# === Penyusunan template ===
+def susun_template(pembuka: str, aturan_tool: dict, nama_tool: list, penutup: str, aturan_umum: tuple = ()) -> str:
+    """
+    Gabungkan blok aturan; aturan_tool hanya disertakan untuk tool yang
+    benar-benar terdaftar (nama_tool), sesuai urutan tool.
+    """
+    blok = [pembuka.strip()]
+    blok.extend(aturan.strip() for aturan in aturan_umum)
+    blok.extend(aturan_tool[nama].strip() for nama in nama_tool if nama in aturan_tool)
+    blok.append(penutup.strip())
+    return "\n\n".join(blok) + "\n"
+
+
+# === Registry prompt untuk laporan token ===
+PROMPT_TERDAFTAR = {}
+
+
+def daftarkan_prompt(nama_agent: str, prompt, tools: list):
+    """
+    Simpan prompt agent dengan {tools}/{tool_names} sudah terisi, persis
+    seperti yang dirender create_react_agent.
+    """
+    PROMPT_TERDAFTAR[nama_agent] = prompt.partial(
+        tools=render_text_description(list(tools)),
+        tool_names=", ".join(tool.name for tool in tools),
+    )
+    return prompt
@@ -0,0 +1,199 @@
+# tools/chunking.py
+# Chunker khusus notulensi: satu chunk per entri catatan (blok 📅/⏰ atau
+# Tanggal:/Jam:), metadata tanggal/status/site ikut disimpan. Teks yang tidak
+# terstruktur tetap dipecah dengan RecursiveCharacterTextSplitter.
+import re
+
+from langchain.docstore.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# === Konfigurasi ===
+NOTE_MIN_CHARS = 80  # entri lebih pendek dari ini boleh digabung dengan tetangganya
+NOTE_MAX_CHARS = 800  # entri lebih panjang dari ini dipecah lagi
+FALLBACK_BUFFER_CHARS = 4000  # batas buffer teks tidak terstruktur per sumber
+
+fallback_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+
+_RE_EMOJI_HEADER = re.compile(r"📅\s*(.*?)\s*-?\s*(?:📍\s*\S+\s*)?⏰\s*([\d:]+)(.*)$")
+_RE_LABEL_HEADER = re.compile(r"^tanggal\s*:\s*(.*?)\s*(?:-\s*)?(?:jam\s*:\s*([\d:]+))?\s*$", re.IGNORECASE)
+_RE_SELESAI = re.compile(r"^(?:📌\s*)?tanggal selesai\s*[:：]?\s*(.*)$", re.IGNORECASE)
+_RE_STATUS = re.compile(r"^status\s*:?\s*(.*)$", re.IGNORECASE)
+_RE_SITE_HEADER = re.compile(r"notulensi site\s+([\w\-]+)", re.IGNORECASE)
+_RE_SITE_LABEL = re.compile(r"^site(?:_name)?\s*:\s*([\w\-]+)\s*$", re.IGNORECASE)  # baris CSVLoader
+_RE_SELESAI_INLINE = re.compile(r"📌\s*tanggal selesai\s*[:：]?\s*(.+)$", re.IGNORECASE)
+_BASE_METADATA_KEYS = ("source", "site_name", "ingest_id", "indexed_at")  # ingest_* dipakai GC vectorstore
+
+
+def _normalisasi_status(teks: str) -> str:
+    teks = teks.lower()
+    return "selesai" if "selesai" in teks or "done" in teks else "aktif"
+
+
+class NotulensiChunker:
+    """
+    Dokumen dialirkan satu per satu (halaman PDF, elemen TXT, dst). Entri yang
+    terpotong di batas halaman tetap disambung selama sumbernya sama.
+    """
+
+    def __init__(self, min_chars: int = NOTE_MIN_CHARS, max_chars: int = NOTE_MAX_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._source = None
+        self._base_metadata = {}
+        self._entry = None
+        self._site_berikut = None  # dari baris "site:" sebelum header entri
+        self._tertunda = None  # chunk kecil yang menunggu kemungkinan digabung
+        self._buffer_bebas = []
+        self._buffer_bebas_chars = 0
+        self._buffer_bebas_metadata = {}
+
+    # ---------- Entri ----------
+    def _mulai_entri(self, tanggal, jam, page=None, sisa: str = ""):
+        self._entry = {
+            "tanggal": tanggal, "jam": jam, "status": "aktif", "tanggal_selesai": None,
+            "site_name": self._site_berikut, "page": page, "lines": [],
+        }
+        self._site_berikut = None
+        sisa = sisa.strip()
+        if sisa:
+            self._tambah_isi(sisa)
+
+    def _tambah_isi(self, line: str):
+        inline = _RE_SELESAI_INLINE.search(line)
+        if inline:
+            self._entry["tanggal_selesai"] = inline.group(1).strip()
+            self._entry["status"] = "selesai"
+            line = line[:inline.start()].strip()
+        if line.startswith("✅"):
+            self._entry["status"] = "selesai"
+        if line:
+            self._entry["lines"].append(line)
+
+    def _entri_ke_chunk(self):
+        entry, self._entry = self._entry, None
+        if not entry or not entry["lines"]:
+            return []
+        metadata = dict(self._base_metadata)
+        metadata.update({
+            k: entry[k] for k in ("tanggal", "jam", "status", "tanggal_selesai", "site_name", "page") if entry[k]
+        })
+        metadata["chunker"] = "notulensi"
+        header = f"📅 {entry['tanggal'] or '-'} ⏰ {entry['jam'] or '-'}"
+        if metadata.get("site_name"):
+            header = f"📍 {str(metadata['site_name']).upper()} {header}"
+        teks = header + "\n" + "\n".join(entry["lines"])
+        return [Document(page_content=teks, metadata=metadata)]
+
+    def _keluarkan(self, chunks: list):
+        """
+        Gabungkan chunk kecil berurutan yang tanggal & statusnya sama.
+        """
+        for chunk in chunks:
+            if len(chunk.page_content) > self.max_chars:
+                yield from self._flush_tertunda()
+                yield from fallback_splitter.split_documents([chunk])
+                continue
+
+            tertunda = self._tertunda
+            if tertunda is not None:
+                sama = all(
+                    tertunda.metadata.get(k) == chunk.metadata.get(k)
+                    for k in ("source", "site_name", "tanggal", "status")
+                )
+                gabungan = len(tertunda.page_content) + len(chunk.page_content) + 1
+                if sama and gabungan <= self.max_chars and (
+                    len(tertunda.page_content) < self.min_chars or len(chunk.page_content) < self.min_chars
+                ):
+                    isi_baru = chunk.page_content.split("\n", 1)[-1]
+                    self._tertunda = Document(
+                        page_content=tertunda.page_content + "\n" + isi_baru,
+                        metadata=tertunda.metadata,
+                    )
+                    continue
+                yield from self._flush_tertunda()
+            self._tertunda = chunk
+
+    def _flush_tertunda(self):
+        if self._tertunda is not None:
+            tertunda, self._tertunda = self._tertunda, None
+            yield tertunda
+
+    # ---------- Teks tidak terstruktur ----------
+    def _tambah_bebas(self, line: str, metadata: dict):
+        if not self._buffer_bebas:
+            self._buffer_bebas_metadata = dict(metadata)
+        self._buffer_bebas.append(line)
+        self._buffer_bebas_chars += len(line) + 1
+
+    def _flush_bebas(self):
+        if not self._buffer_bebas:
+            return
+        doc = Document(page_content="\n".join(self._buffer_bebas), metadata=self._buffer_bebas_metadata)
+        self._buffer_bebas, self._buffer_bebas_chars = [], 0
+        yield from fallback_splitter.split_documents([doc])
+
+    # ---------- API ----------
+    def feed(self, doc: Document):
+        source = doc.metadata.get("source")
+        if source != self._source:
+            yield from self.flush()
+            self._source = source
+            self._base_metadata = {k: doc.metadata[k] for k in _BASE_METADATA_KEYS if doc.metadata.get(k)}
+        page = doc.metadata.get("page")
+
+        for raw in doc.page_content.splitlines():
+            line = raw.replace("\u200b", "").replace("\xa0", " ").strip()
+            if not line:
+                continue
+
+            site_header = _RE_SITE_HEADER.search(line)
+            if site_header:
+                self._base_metadata.setdefault("site_name", site_header.group(1).lower())
+                continue
+            site_label = _RE_SITE_LABEL.match(line)
+            if site_label:
+                self._site_berikut = site_label.group(1).lower()
+                continue
+
+            emoji = _RE_EMOJI_HEADER.search(line)
+            label = None if emoji else _RE_LABEL_HEADER.match(line)
+            if emoji or label:
+                yield from self._flush_bebas()
+                yield from self._keluarkan(self._entri_ke_chunk())
+                if emoji:
+                    self._mulai_entri(emoji.group(1).strip(" -"), emoji.group(2), page, emoji.group(3))
+                else:
+                    self._mulai_entri(label.group(1).strip(" -"), label.group(2), page)
+                continue
+
+            if self._entry is None:
+                self._tambah_bebas(line, doc.metadata)
+                if self._buffer_bebas_chars >= FALLBACK_BUFFER_CHARS:
+                    yield from self._flush_bebas()
+                continue
+
+            selesai = _RE_SELESAI.match(line)
+            status = _RE_STATUS.match(line)
+            if selesai:
+                self._entry["tanggal_selesai"] = selesai.group(1).strip() or None
+            elif status:
+                self._entry["status"] = _normalisasi_status(status.group(1))
+            else:
+                if line.lower().startswith("isi:"):
+                    line = line[4:].strip()
+                self._tambah_isi(line)
+
+    def flush(self):
+        yield from self._flush_bebas()
+        yield from self._keluarkan(self._entri_ke_chunk())
+        yield from self._flush_tertunda()
+
+
+def iter_chunks(raw_docs):
+    """
+    Generator chunk dari aliran dokumen mentah (bounded memory).
+    """
+    chunker = NotulensiChunker()
+    for doc in raw_docs:
+        yield from chunker.feed(doc)
+    yield from chunker.flush()
@@ -1,24 +1,43 @@
 # tools/dokumen.py
 import os
 import re
+import io
+import csv
+import time
 import shutil
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from PIL import Image
 import pytesseract
-import fitz  # PyMuPDF
 import docx
 
 from langchain_core.documents import Document
 
-from db_utils import get_db_connection, user_sessions
-from tools.tools_rag import index_file
-from tools.tools_researcher import is_existing_site
+from db_utils import get_db_connection, user_sessions, bump_data_version
+from tracing import span
+from metrics import INGEST_BYTES, INGEST_DURATION, INGEST_FILES
+from tools.tools_rag import index_file, iter_pdf_pages
+from tools.tools_researcher import is_existing_site, get_site_catalog
+from tools.tools_tanggal import normalisasi_tanggal_db
 
 # === Konstanta folder dan tabel ===
 UPLOAD_FOLDER = "uploaded_files"
 TABLE_NAME = "catatan_site"
 
+# === Konfigurasi import CSV ===
+CSV_COLUMN_ALIASES = {
+    "site_name": ["site_name", "site", "nama_site", "nama site"],
+    "tanggal": ["tanggal", "tgl", "date"],
+    "jam": ["jam", "waktu", "time"],
+    "isi_catatan": ["isi_catatan", "isi", "catatan", "notulensi", "keterangan"],
+    "status": ["status"],
+    "tanggal_selesai": ["tanggal_selesai", "tanggal selesai", "tgl_selesai", "selesai"],
+}
+CSV_COPY_COLUMNS = [
+    "site_name", "tanggal", "jam", "isi_catatan", "status", "tanggal_selesai",
+    "file_path", "original_filename", "file_type",
+]
+
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # === Fungsi bantu ===
@@ -52,8 +71,7 @@ def extract_text_from_txt(filepath):
 
 def extract_text_from_pdf(filepath):
     try:
-        doc = fitz.open(filepath)
-        text = "\n".join(page.get_text() for page in doc)
+        text = "\n".join(iter_pdf_pages(filepath))
         return text.strip()
     except Exception as e:
         return f"[❌ Gagal ekstrak PDF: {e}]"
@@ -83,11 +101,12 @@ def extract_text_from_docx(filepath):
     except Exception as e:
         return f"[❌ Gagal ekstrak DOCX: {e}]"
 
-def parse_general_blocks(site_name: str, text: str, tanggal: str, jam: str, file_path: str, original_filename: str, custom_name=None, file_type=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    success = 0
-
+def parse_blok_umum(text: str) -> list:
+    """
+    Blok umum (dipisah baris kosong) → list (isi_catatan, status, tanggal_selesai).
+    Murni tanpa DB, dipakai parse_general_blocks dan bench_hot_paths.
+    """
+    hasil = []
     blocks = re.split(r"\n\s*\n", text.strip())  # Pisahkan blok berdasarkan newline ganda
 
     for block in blocks:
@@ -110,24 +129,39 @@ def parse_general_blocks(site_name: str, text: str, tanggal: str, jam: str, file
                 isi.append(line)
 
         if isi:
-            isi_catatan = " ".join(isi)
-            cursor.execute(f"""
-                INSERT INTO {TABLE_NAME}
-                (site_name, tanggal, jam, isi_catatan, file_path, original_filename, custom_name, file_type, status, tanggal_selesai)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                site_name, tanggal, jam, isi_catatan, file_path,
-                original_filename, custom_name, file_type, status, tanggal_selesai
-            ))
-            success += 1
+            hasil.append((" ".join(isi), status, tanggal_selesai))
+    return hasil
+
+
+def parse_general_blocks(site_name: str, text: str, tanggal: str, jam: str, file_path: str, original_filename: str, custom_name=None, file_type=None):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    success = 0
+
+    for isi_catatan, status, tanggal_selesai in parse_blok_umum(text):
+        cursor.execute(f"""
+            INSERT INTO {TABLE_NAME}
+            (site_name, tanggal, jam, isi_catatan, file_path, original_filename, custom_name, file_type, status, tanggal_selesai)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            site_name, tanggal, jam, isi_catatan, file_path,
+            original_filename, custom_name, file_type, status, tanggal_selesai
+        ))
+        success += 1
 
     conn.commit()
     cursor.close()
     conn.close()
+    if success:
+        bump_data_version(site_name)
     return f"✅ {success} catatan berhasil disimpan dari blok-blok umum."
 
 
-def parse_and_save_to_db(text, site_name, file_path=None, original_filename=None):
+def parse_catatan_teks(text: str) -> list:
+    """
+    Semua format notulensi upload (emoji multi-line, ⏳, emoji satu baris,
+    label Tanggal:/Jam:) → list dict catatan siap disimpan. Murni tanpa DB.
+    """
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     parsed_indexes = set()
 
@@ -273,35 +307,191 @@ def parse_and_save_to_db(text, site_name, file_path=None, original_filename=None
 
     simpan_catatan()
 
-    if not catatan_list:
-        return None
-
     # ✅ Clean dan validasi sebelum masukkan ke DB
     def clean_date(raw):
         if not raw:
             return None
         return raw.strip().rstrip("-").strip()
-    
+
+    for c in catatan_list:
+        c["tanggal"] = clean_date(c["tanggal"])
+        c["tanggal_selesai"] = clean_date(c["tanggal_selesai"])
+    return catatan_list
+
+
+def parse_and_save_to_db(text, site_name, file_path=None, original_filename=None):
+    catatan_list = parse_catatan_teks(text)
+    if not catatan_list:
+        return None
+
     success = 0
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             for c in catatan_list:
-                tanggal = clean_date(c["tanggal"])
-                tanggal_selesai = clean_date(c["tanggal_selesai"])
-
                 cur.execute(f"""
                     INSERT INTO {TABLE_NAME}
                     (site_name, tanggal, jam, isi_catatan, file_path, original_filename, status, tanggal_selesai)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 """, (
-                    site_name, tanggal, c["jam"], c["isi_catatan"],
-                    file_path, original_filename, c["status"], tanggal_selesai
+                    site_name, c["tanggal"], c["jam"], c["isi_catatan"],
+                    file_path, original_filename, c["status"], c["tanggal_selesai"]
                 ))
                 success += 1
             conn.commit()
 
+    bump_data_version(site_name)
     return f"✅ {success} catatan berhasil disimpan ke DB untuk site {site_name.upper()}"
 
+# === Import CSV catatan (bulk COPY) ===
+def parse_column_map(text: str | None) -> dict:
+    """
+    Ubah teks pemetaan kolom seperti "site_name=Site, isi_catatan=Keterangan"
+    menjadi dict {kolom_db: header_csv}.
+    """
+    mapping = {}
+    if not text:
+        return mapping
+    for pair in re.split(r"[,;\n]", text):
+        if "=" not in pair:
+            continue
+        target, source = [p.strip() for p in pair.split("=", 1)]
+        if target in CSV_COLUMN_ALIASES and source:
+            mapping[target] = source
+    return mapping
+
+def _resolve_csv_columns(header: list, column_map: dict) -> dict:
+    header_lc = [h.strip().lower() for h in header]
+    indexes = {}
+    for target, aliases in CSV_COLUMN_ALIASES.items():
+        candidates = [column_map[target]] if target in column_map else aliases
+        for name in candidates:
+            if name.strip().lower() in header_lc:
+                indexes[target] = header_lc.index(name.strip().lower())
+                break
+    return indexes
+
+class _CsvCopyStream:
+    """
+    File-like untuk copy_expert: baris CSV dibentuk dari generator saat
+    dibaca, jadi seluruh file tidak pernah ditampung di memori.
+    """
+    def __init__(self, rows):
+        self._rows = rows
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator="\n")
+        self._buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._writer.writerow(next(self._rows))
+            except StopIteration:
+                break
+            self._buffer += self._out.getvalue()
+            self._out.seek(0)
+            self._out.truncate(0)
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+def import_catatan_csv(filepath: str, default_site: str = None, column_map=None, original_filename: str = None) -> str:
+    if isinstance(column_map, str):
+        column_map = parse_column_map(column_map)
+    column_map = column_map or {}
+
+    with open(filepath, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+
+        header = next(reader, None)
+        if not header:
+            return "⚠️ File CSV kosong."
+
+        kolom = _resolve_csv_columns(header, column_map)
+        if "isi_catatan" not in kolom:
+            return ("❌ Kolom isi catatan tidak ditemukan. Gunakan pemetaan kolom, "
+                    "contoh: isi_catatan=Keterangan")
+        if "site_name" not in kolom and not default_site:
+            return "❌ Kolom site_name tidak ditemukan dan belum ada site aktif di session."
+
+        katalog = get_site_catalog()
+        stats = {"imported": 0, "site_invalid": 0, "kosong": 0, "tanggal_invalid": 0}
+        sites = set()
+        now = datetime.now()
+        tanggal_default = now.strftime("%A, %d %B %Y")
+        jam_default = now.strftime("%H:%M:%S")
+        source_name = original_filename or os.path.basename(filepath)
+
+        def ambil(row, target):
+            idx = kolom.get(target)
+            if idx is None or idx >= len(row):
+                return None
+            value = row[idx].strip()
+            return value or None
+
+        def iter_rows():
+            for row in reader:
+                site = (ambil(row, "site_name") or default_site or "").strip().lower()
+                if site not in katalog:
+                    stats["site_invalid"] += 1
+                    continue
+                isi = ambil(row, "isi_catatan")
+                if not isi:
+                    stats["kosong"] += 1
+                    continue
+                status_raw = (ambil(row, "status") or "").lower()
+                status = "selesai" if "selesai" in status_raw or "done" in status_raw else "aktif"
+                # Tanggal disimpan dalam format DB supaya sortir/filter periode konsisten
+                tanggal_raw = ambil(row, "tanggal")
+                tanggal = normalisasi_tanggal_db(tanggal_raw) if tanggal_raw else tanggal_default
+                selesai_raw = ambil(row, "tanggal_selesai") if status == "selesai" else None
+                tanggal_selesai = normalisasi_tanggal_db(selesai_raw) if selesai_raw else None
+                if not tanggal or (selesai_raw and not tanggal_selesai):
+                    stats["tanggal_invalid"] += 1
+                    continue
+                sites.add(site)
+                stats["imported"] += 1
+                yield (
+                    site,
+                    tanggal,
+                    ambil(row, "jam") or jam_default,
+                    isi,
+                    status,
+                    tanggal_selesai,
+                    source_name,
+                    source_name,
+                    "csv",
+                )
+
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.copy_expert(
+                        f"COPY {TABLE_NAME} ({', '.join(CSV_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                        _CsvCopyStream(iter_rows()),
+                    )
+                conn.commit()
+        except Exception as e:
+            return f"❌ Gagal import CSV: {e}"
+
+    bump_data_version(*sites)
+
+    pesan = f"✅ {stats['imported']} catatan berhasil diimport dari CSV untuk {len(sites)} site."
+    if stats["site_invalid"] or stats["kosong"] or stats["tanggal_invalid"]:
+        pesan += (f"\n⚠️ Dilewati: {stats['site_invalid']} baris site tidak dikenal, {stats['kosong']} baris tanpa isi, "
+                  f"{stats['tanggal_invalid']} baris tanggal tidak valid.")
+    return pesan
+
 def unggah_dokumen(query: str, user_id="default") -> str:
     if not is_upload_intent(query):
         return "⚠️ Jika ingin unggah dokumen, gunakan kata seperti *upload* atau *unggah* di kalimat kamu."
@@ -317,17 +507,45 @@ def unggah_dokumen(query: str, user_id="default") -> str:
     user_sessions[user_id] = site
     return f"📤 Silakan unggah dokumen untuk site **{site.upper()}** melalui box upload di bawah ini."
 
-def simpan_file(file, user_id="default", custom_name=None):
+def simpan_file(file, user_id="default", custom_name=None, column_map=None):
     if file is None:
         return "⚠️ Harap pilih file untuk diunggah."
 
+    # Metrics throughput ingest: jumlah file, byte dan durasi per format
+    fmt = os.path.splitext(file.name)[1].lower().lstrip(".") or "lain"
+    mulai = time.perf_counter()
+    hasil = _simpan_file(file, user_id, custom_name, column_map)
+    status = "gagal" if str(hasil).startswith(("❌", "⚠️", "⛔")) else "ok"
+    INGEST_FILES.inc(format=fmt, status=status)
+    INGEST_DURATION.observe(time.perf_counter() - mulai, format=fmt)
+    if status == "ok":
+        try:
+            INGEST_BYTES.inc(os.path.getsize(file.name), format=fmt)
+        except OSError:
+            pass
+    return hasil
+
+
+def _simpan_file(file, user_id="default", custom_name=None, column_map=None):
+
     site_name = user_sessions.get(user_id)
+    original_filename = secure_filename(os.path.basename(file.name))
+    file_ext = os.path.splitext(original_filename)[1].lower()
+
+    # CSV boleh berisi banyak site sekaligus, site di session hanya default
+    if file_ext == ".csv":
+        default_site = site_name.strip().lower() if isinstance(site_name, str) else None
+        return import_catatan_csv(
+            file.name,
+            default_site=default_site,
+            column_map=column_map,
+            original_filename=original_filename
+        )
+
     if not site_name:
         return "⚠️ Harap ketikkan nama site terlebih dahulu sebelum upload."
 
     site_name = site_name.strip().lower()
-    original_filename = secure_filename(os.path.basename(file.name))
-    file_ext = os.path.splitext(original_filename)[1].lower()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     safe_filename = f"{site_name}{file_ext}"
 
@@ -345,10 +563,11 @@ def simpan_file(file, user_id="default", custom_name=None):
         isi_catatan = None
         if file_ext in [".jpg", ".jpeg", ".png"]:
             image = Image.open(destination_path)
-            isi_catatan = pytesseract.image_to_string(image).strip()
+            with span("ocr", "ocr", source=safe_filename):
+                isi_catatan = pytesseract.image_to_string(image).strip()
             if isi_catatan:
-                doc = Document(page_content=isi_catatan, metadata={"source": safe_filename})
-                index_file([doc])
+                doc = Document(page_content=isi_catatan, metadata={"source": safe_filename, "site_name": site_name})
+                index_file(documents=[doc])
         elif file_ext in [".txt", ".pdf", ".docx"]:
             isi_catatan = extract_text_from_file(destination_path)
             index_file(file_path=destination_path, site_name=site_name)
@@ -391,6 +610,7 @@ def simpan_file(file, user_id="default", custom_name=None):
                         success_emoji += 1
 
             if success_emoji > 0:
+                bump_data_version(site_name)
                 return f"✅ {success_emoji} catatan berhasil disimpan dari format emoji."
             
             # === 2. Coba parse format structured ===
@@ -0,0 +1,79 @@
+# tools/ekspor.py
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cache_utils import LRUCache
+from db_utils import register_data_version_listener
+
+# === Konfigurasi ===
+EXPORT_WORKERS = 2
+EXPORT_CACHE_SIZE = 64
+
+
+def _hapus_file_ekspor(key, path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+# key: (scope, data_version, format) -> path file hasil render
+_export_cache = LRUCache(max_entries=EXPORT_CACHE_SIZE, on_evict=_hapus_file_ekspor, name="ekspor")
+_export_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="ekspor")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def ekspor_key(scope: tuple, version: int, fmt: str) -> tuple:
+    """
+    scope contoh: ("site", "maos_ep"), ("rekap", "2025-07-01", "2025-07-31"),
+    ("arsip", "2025-07-01", "2025-07-31"), ("rag", sha1)
+    """
+    return (scope, version, fmt.lower())
+
+
+def _render_dan_simpan(key, render_fn):
+    try:
+        path = render_fn()
+        if path and os.path.exists(path):
+            _export_cache.set(key, path)
+        return path
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def submit_ekspor(key: tuple, render_fn) -> Future:
+    """
+    Kembalikan Future berisi path file. Jika sudah ada di cache, langsung
+    selesai; jika sedang dirender, pakai Future yang sama (tidak render dua kali).
+    """
+    path = _export_cache.get(key)
+    if path and os.path.exists(path):
+        future = Future()
+        future.set_result(path)
+        return future
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _export_executor.submit(_render_dan_simpan, key, render_fn)
+            _inflight[key] = future
+    return future
+
+
+def _invalidate_sites(sites: set):
+    def basi(key):
+        scope = key[0]
+        if scope[0] == "site":
+            return scope[1] in sites
+        # rekap/arsip mencakup semua site, jadi ikut basi
+        return scope[0] in ("rekap", "arsip")
+
+    _export_cache.invalidate(basi)
+
+
+register_data_version_listener(_invalidate_sites)
+
+
+def export_cache_stats() -> dict:
+    return _export_cache.stats()
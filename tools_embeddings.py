@@ -0,0 +1,119 @@
+# tools/embeddings.py
+# Pemilihan backend embedding: PyTorch (sentence-transformers) atau
+# ONNX Runtime int8 untuk model yang sama (all-MiniLM-L6-v2).
+import os
+
+from langchain_core.embeddings import Embeddings
+
+from tracing import TRACE_ENABLED, span
+
+# === Konfigurasi ===
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch | onnx
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_minilm")
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", "64"))
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 = default ONNX Runtime
+ONNX_MAX_LENGTH = 256  # sama dengan max_seq_length MiniLM di sentence-transformers
+
+
+def siapkan_model_onnx(model_dir: str = ONNX_MODEL_DIR, model_name: str = EMBEDDING_MODEL) -> str:
+    """
+    Unduh export ONNX resmi model + tokenizer dari HuggingFace Hub, lalu
+    kuantisasi dinamis bobot ke int8. Cukup dijalankan sekali.
+    """
+    from huggingface_hub import hf_hub_download
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(model_dir, exist_ok=True)
+    quantized_path = os.path.join(model_dir, "model_quantized.onnx")
+    if os.path.exists(quantized_path):
+        return quantized_path
+
+    fp32_path = hf_hub_download(model_name, "onnx/model.onnx", local_dir=model_dir)
+    hf_hub_download(model_name, "tokenizer.json", local_dir=model_dir)
+    quantize_dynamic(fp32_path, quantized_path, weight_type=QuantType.QInt8)
+    print(f"✅ Model ONNX int8 disimpan di {quantized_path}")
+    return quantized_path
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """
+    Mean pooling + normalisasi L2, identik dengan pipeline sentence-transformers
+    untuk all-MiniLM-L6-v2, dijalankan dengan ONNX Runtime di CPU.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, batch_size: int = ONNX_BATCH_SIZE,
+                 intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        import numpy as np
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self._np = np
+        self.batch_size = batch_size
+        model_path = siapkan_model_onnx(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {inp.name for inp in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=ONNX_MAX_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    def _embed_batch(self, texts: list):
+        np = self._np
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: list) -> list:
+        hasil = []
+        for i in range(0, len(texts), self.batch_size):
+            hasil.extend(self._embed_batch(texts[i:i + self.batch_size]).tolist())
+        return hasil
+
+    def embed_query(self, text: str) -> list:
+        return self._embed_batch([text])[0].tolist()
+
+
+class TracedEmbeddings(Embeddings):
+    """
+    Bungkus backend embedding: tiap batch tercatat sebagai span "embedding".
+    """
+
+    def __init__(self, inner: Embeddings, backend: str):
+        self.inner = inner
+        self.backend = backend
+
+    def embed_documents(self, texts: list) -> list:
+        with span("embedding.documents", "embedding", backend=self.backend, n=len(texts)):
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list:
+        with span("embedding.query", "embedding", backend=self.backend, n=1):
+            return self.inner.embed_query(text)
+
+
+def get_embeddings(backend: str | None = None) -> Embeddings:
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    if backend == "onnx":
+        print(f"⚙️ Embedding backend: ONNX Runtime int8 ({ONNX_MODEL_DIR})")
+        model = OnnxMiniLMEmbeddings()
+    else:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        print(f"⚙️ Embedding backend: PyTorch ({EMBEDDING_MODEL})")
+        model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    return TracedEmbeddings(model, backend) if TRACE_ENABLED else model
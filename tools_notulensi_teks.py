@@ -1,27 +1,51 @@
 # notulensi.py
 import os
 import re
+import uuid
+import zipfile
+import tempfile
+import threading
+import multiprocessing
 import unicodedata
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
 from fpdf import FPDF
-from dateutil.parser import parse as parse_date
-import dateparser
 import calendar
 from collections import defaultdict
 from rapidfuzz import fuzz
 
-from db_utils import get_db_connection
+from db_utils import get_db_connection, get_data_version, bump_data_version, get_sesi_chat
 from tools.tools_researcher import query_site_from_db
+from tools.tools_ekspor import submit_ekspor, ekspor_key
+from tools.tools_tanggal import parse_tanggal, format_tanggal_db, bulan_ke_angka
 
 TXT_FOLDER = os.path.join(os.getcwd(), "catatan_txt")
 PDF_FOLDER = os.path.join(os.getcwd(), "generated_pdfs")
+ZIP_FOLDER = os.path.join(os.getcwd(), "generated_zips")
+ARSIP_WORKERS = max(1, min(4, os.cpu_count() or 1))
 TABLE_NAME = "catatan_site"
 TABLE_SITE = "site_name"
+NOTULENSI_PAGE_SIZE = 20
+# to_date error (bukan NULL) untuk teks bebas seperti "Senin, 04 Agustus 2025"
+# atau "04/08/2025", jadi hanya format DB yang dikonversi; sisanya ke 1900-01-01
+POLA_TANGGAL_DB = (
+    "^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), [0-9]{1,2} "
+    "(January|February|March|April|May|June|July|August|September|October|November|December) [0-9]{4}$"
+)
+ORDER_TANGGAL = (
+    f"COALESCE(CASE WHEN tanggal ~ '{POLA_TANGGAL_DB}' "
+    "THEN to_date(tanggal, 'FMDay, DD FMMonth YYYY') END, DATE '1900-01-01')"
+)
 
 os.makedirs(TXT_FOLDER, exist_ok=True)
 os.makedirs(PDF_FOLDER, exist_ok=True)
+os.makedirs(ZIP_FOLDER, exist_ok=True)
 
 user_sessions = {}
+_arsip_pool = None
+_arsip_pool_lock = threading.Lock()
+# Cursor "lanjut" per session chat (lihat db_utils.get_sesi_chat)
+_notulensi_cursor = {}
 db_write_lock = None  # pastikan ini didefinisikan sesuai implementasi lock DB
 
 
@@ -49,9 +73,9 @@ def extract_site_name(text: str) -> str | None:
 
 
 def parse_tanggal_to_db_format(tanggal_input: str) -> str:
-    tanggal = dateparser.parse(tanggal_input, languages=["id", "en"])
+    tanggal = parse_tanggal(tanggal_input)
     if tanggal:
-        return tanggal.strftime("%A, %d %B %Y")
+        return format_tanggal_db(tanggal)  # ex: 'Monday, 04 August 2025'
     return tanggal_input
 
 
@@ -106,6 +130,8 @@ def update_status_catatan(query: str) -> str | None:
                         updated += 1
 
                 conn.commit()
+                if updated:
+                    bump_data_version(site)
                 if updated == 0:
                     return f"ℹ Tidak ada catatan cocok yang diperbarui untuk site {site.upper()}."
                 return f"✅ {updated} catatan di site {site.upper()} ditandai selesai."
@@ -129,14 +155,45 @@ def query_site_from_db(site_input):
 # ----------------------------
 # Catat Notulensi
 # ----------------------------
-def catat_notulensi(query: str, user_id: str = "default") -> str:
-    isi_lower = query.lower().strip()
-    session = user_sessions.setdefault(user_id, {})
-
+def segmentasi_catatan(query: str, tanggal: str, jam: str) -> list:
+    """
+    Pecah pesan catat menjadi catatan per kalimat/baris (tanpa DB).
+    """
     abaikan = [
         'sedang diaudit', 'dalam proses audit', 'masih dicek', 'dalam pengecekan',
         'site ini sedang audit', 'audit site', 'belum diketik'
     ]
+    valid_notes = []
+
+    # Proses setiap baris catatan
+    for line in re.split(r"(?<=[\.,\n])\s+", query):
+        clean = line.strip("* .,\n").strip()
+        if not clean:
+            continue
+        if re.fullmatch(r"site\s+[a-zA-Z0-9_\-]+[:\s]*", clean.lower()):
+            continue
+        clean = re.sub(r"^\s*site\s+[a-zA-Z0-9_\-]+[:\s]*", "", clean, flags=re.IGNORECASE)
+        clean = re.sub(r"\bsite\s+[a-zA-Z0-9_\-]+[:\s]*$", "", clean, flags=re.IGNORECASE)
+        if len(clean) > 5 and ' ' in clean and not any(x in clean.lower() for x in abaikan):
+            status = "selesai" if any(k in clean.lower() for k in ["selesai", "sudah", "teratasi"]) else "aktif"
+            tanggal_selesai = tanggal if status == "selesai" else None
+            valid_notes.append({
+                "tanggal": tanggal,
+                "jam": jam,
+                "isi": clean,
+                "status": status,
+                "tanggal_selesai": tanggal_selesai,
+                "file_path": None,
+                "original_filename": None,
+                "custom_name": None,
+                "file_type": None
+            })
+    return valid_notes
+
+
+def catat_notulensi(query: str, user_id: str = "default") -> str:
+    isi_lower = query.lower().strip()
+    session = user_sessions.setdefault(user_id, {})
 
     # Update status jika ada kata kunci selesai
     if "sudah" in isi_lower and any(k in isi_lower for k in ["selesai", "teratasi", "ditangani"]):
@@ -167,31 +224,7 @@ def catat_notulensi(query: str, user_id: str = "default") -> str:
         return export_notulensi("pdf", user_id)
 
     tanggal, jam = _prepare_timestamp()
-    valid_notes = []
-
-    # Proses setiap baris catatan
-    for line in re.split(r"(?<=[\.,\n])\s+", query):
-        clean = line.strip("* .,\n").strip()
-        if not clean:
-            continue
-        if re.fullmatch(r"site\s+[a-zA-Z0-9_\-]+[:\s]*", clean.lower()):
-            continue
-        clean = re.sub(r"^\s*site\s+[a-zA-Z0-9_\-]+[:\s]*", "", clean, flags=re.IGNORECASE)
-        clean = re.sub(r"\bsite\s+[a-zA-Z0-9_\-]+[:\s]*$", "", clean, flags=re.IGNORECASE)
-        if len(clean) > 5 and ' ' in clean and not any(x in clean.lower() for x in abaikan):
-            status = "selesai" if any(k in clean.lower() for k in ["selesai", "sudah", "teratasi"]) else "aktif"
-            tanggal_selesai = tanggal if status == "selesai" else None
-            valid_notes.append({
-                "tanggal": tanggal,
-                "jam": jam,
-                "isi": clean,
-                "status": status,
-                "tanggal_selesai": tanggal_selesai,
-                "file_path": None,
-                "original_filename": None,
-                "custom_name": None,
-                "file_type": None
-            })
+    valid_notes = segmentasi_catatan(query, tanggal, jam)
 
     if not valid_notes:
         return "⚠ Catatan terlalu pendek atau tidak valid. Sertakan deskripsi yang jelas minimal 6 karakter."
@@ -220,6 +253,7 @@ def catat_notulensi(query: str, user_id: str = "default") -> str:
                         note.get("tanggal_selesai")
                     ))
             conn.commit()
+        bump_data_version(site)
     except Exception as e:
         return f"❌ Catatan dicatat di session, tapi gagal simpan ke database: {e}"
 
@@ -228,122 +262,193 @@ def catat_notulensi(query: str, user_id: str = "default") -> str:
 # ----------------------------
 # Export Notulensi (TXT/PDF)
 # ----------------------------
-def export_notulensi(tipe: str, user_id: str) -> str | None:
+def _ambil_catatan_site(site: str) -> list:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT tanggal, jam, isi_catatan, status, tanggal_selesai
+                FROM {TABLE_NAME}
+                WHERE LOWER(site_name) = %s AND isi_catatan IS NOT NULL
+                ORDER BY {ORDER_TANGGAL}, jam
+            """, (site.lower(),))
+            return [
+                {"tanggal": tgl, "jam": jam or "-", "isi": isi, "status": status, "tanggal_selesai": tgl_selesai}
+                for tgl, jam, isi, status, tgl_selesai in cur
+            ]
+
+
+def tulis_notulensi_txt(site: str, catatan: list, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"📝 Notulensi Site {site.upper()}\n\n")
+        for item in catatan:
+            simbol = "✅" if item.get("status") == "selesai" else "⏳"
+            f.write(f"📅 {item['tanggal']} ⏰ {item['jam']}\n{simbol} {item['isi']}\n\n")
+
+
+def tulis_notulensi_pdf(site: str, catatan: list, path: str):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, f"Notulensi Site {site.upper()}", ln=True, align="C")
+    pdf.ln(5)
+    pdf.set_font("Arial", size=12)
+    for item in catatan:
+        simbol = "Selesai" if item.get("status") == "selesai" else "Aktif"
+        teks = f"Tanggal: {item['tanggal']} - Jam: {item['jam']}\nIsi: {sanitize_text_for_pdf(item['isi'])}\nStatus: {simbol}\n"
+        pdf.multi_cell(0, 10, teks)
+        pdf.ln(2)
+    pdf.output(path)
+
+
+def siapkan_ekspor_notulensi(tipe: str, user_id: str):
+    """
+    Jadwalkan render ekspor di worker background.
+    Kembalikan Future berisi path file, atau string pesan jika tidak bisa ekspor.
+    """
     session = user_sessions.get(user_id, {})
     catatan = session.get("catatan")
     site = session.get("site") or session.get("last_site")
+    tipe = tipe.lower()
 
-    if not catatan or not site:
+    if tipe not in ("txt", "pdf"):
+        return f"⚠ Tipe ekspor '{tipe}' tidak dikenali."
+    if not site or (site == "REKAP_CATATAN" and not catatan):
         return f"⚠ Tidak bisa ekspor {tipe.upper()}. Belum ada catatan atau site."
 
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-    if tipe.lower() == "txt":
-        os.makedirs(TXT_FOLDER, exist_ok=True)
-        path = os.path.join(TXT_FOLDER, f"{site.upper()}_{timestamp}.txt")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(f"📝 Notulensi Site {site.upper()}\n\n")
-            for item in catatan:
-                simbol = "✅" if item.get("status") == "selesai" else "⏳"
-                f.write(f"📅 {item['tanggal']} ⏰ {item['jam']}\n{simbol} {item['isi']}\n\n")
-        session["last_txt_path"] = path
+    if site == "REKAP_CATATAN":
+        # Snapshot rekap di session, berlaku untuk semua site dalam periode
+        scope = ("rekap",) + tuple(session.get("periode") or ("-", "-"))
+        version = get_data_version()
+        ambil_catatan = lambda: catatan
+    else:
+        scope = ("site", site.lower())
+        version = get_data_version(site)
+        ambil_catatan = lambda: _ambil_catatan_site(site)
+
+    folder = TXT_FOLDER if tipe == "txt" else PDF_FOLDER
+    tulis = tulis_notulensi_txt if tipe == "txt" else tulis_notulensi_pdf
+
+    def render():
+        data = ambil_catatan()
+        if not data:
+            return None
+        os.makedirs(folder, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(folder, f"{site.upper()}_{timestamp}_{uuid.uuid4().hex[:6]}.{tipe}")
+        tulis(site, data, path)
         return path
 
-    elif tipe.lower() == "pdf":
-        os.makedirs(PDF_FOLDER, exist_ok=True)
-        path = os.path.join(PDF_FOLDER, f"{site.upper()}_{timestamp}.pdf")
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(0, 10, f"Notulensi Site {site.upper()}", ln=True, align="C")
-        pdf.ln(5)
-        pdf.set_font("Arial", size=12)
-        for item in catatan:
-            simbol = "Selesai" if item.get("status") == "selesai" else "Aktif"
-            teks = f"Tanggal: {item['tanggal']} - Jam: {item['jam']}\nIsi: {sanitize_text_for_pdf(item['isi'])}\nStatus: {simbol}\n"
-            pdf.multi_cell(0, 10, teks)
-            pdf.ln(2)
-        pdf.output(path)
-        session["last_pdf_path"] = path
-        return path
+    def simpan_path_session(future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            session[f"last_{tipe}_path"] = future.result()
 
-    return f"⚠ Tipe ekspor '{tipe}' tidak dikenali."
+    future = submit_ekspor(ekspor_key(scope, version, tipe), render)
+    future.add_done_callback(simpan_path_session)
+    return future
 
-def parse_tanggal_to_db_format(tanggal_input: str) -> str:
-    tanggal = dateparser.parse(tanggal_input, languages=["id", "en"])
+
+def export_notulensi(tipe: str, user_id: str) -> str | None:
+    hasil = siapkan_ekspor_notulensi(tipe, user_id)
+    if isinstance(hasil, str):
+        return hasil
+    try:
+        path = hasil.result()
+    except Exception as e:
+        return f"❌ Gagal ekspor {tipe.upper()}: {e}"
+    return path or f"⚠ Tidak bisa ekspor {tipe.upper()}. Belum ada catatan atau site."
+
+def _iter_halaman_notulensi(cur, site: str | None, tanggal: str | None, setelah: tuple | None, limit: int):
+    """
+    Keyset pagination: catatan terbaru dulu, lanjut dari kunci
+    (tanggal, jam, id) baris terakhir halaman sebelumnya.
+    """
+    sql = f"""
+        SELECT id, site_name, tanggal, jam, isi_catatan, status, tanggal_selesai,
+               {ORDER_TANGGAL} AS tgl_key, COALESCE(jam::text, '') AS jam_key
+        FROM {TABLE_NAME}
+        WHERE isi_catatan IS NOT NULL
+    """
+    params = []
+    if site:
+        sql += " AND LOWER(site_name) = %s"
+        params.append(site)
     if tanggal:
-        return tanggal.strftime("%A, %d %B %Y")  # ex: 'Monday, 04 August 2025'
-    return tanggal_input
+        sql += " AND tanggal = %s"
+        params.append(tanggal)
+    if setelah:
+        sql += f" AND ({ORDER_TANGGAL}, COALESCE(jam::text, ''), id) < (%s, %s, %s)"
+        params.extend(setelah)
+    sql += f" ORDER BY {ORDER_TANGGAL} DESC, COALESCE(jam::text, '') DESC, id DESC LIMIT %s"
+    params.append(limit)
+
+    cur.execute(sql, tuple(params))
+    yield from cur
+
 
 def tampilkan_notulensi(query: str, user_id: str = "default") -> str:
     query_lower = query.lower().strip()
+    cursor_key = (get_sesi_chat(), user_id)
 
     site_tanggal_match = re.search(r"site\s+([a-z0-9_\-]+).*tanggal\s+([\w\s,\-/]+)", query_lower)
     tanggal_match = re.search(r"tanggal\s+([\w\s,\-/]+)", query_lower)
     site_match = re.search(r"(?:catatan|notulensi)\s+site\s+([a-z0-9_\-]+)", query_lower)
 
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                hasil = []
-                catatan_terstruktur = []
-
-                # ===========================
-                # MODE 1 : SESSION KOSONG / LANGSUNG DB
-                # ===========================
-                site_to_query = None
-                tanggal_to_query = None
-
-                if site_tanggal_match:
-                    site_to_query = site_tanggal_match.group(1).strip().lower()
-                    tanggal_input = site_tanggal_match.group(2).strip()
-                    tanggal_to_query = parse_tanggal_to_db_format(tanggal_input)
-                elif site_match:
-                    site_to_query = site_match.group(1).strip().lower()
-                elif tanggal_match:
-                    tanggal_input = tanggal_match.group(1).strip()
-                    tanggal_to_query = parse_tanggal_to_db_format(tanggal_input)
-
-                if not site_to_query and not tanggal_to_query:
-                    return ("⚠ Format tidak dikenali. Gunakan:\n"
-                            "- tampilkan catatan site [nama_site]\n"
-                            "- tampilkan catatan tanggal [tanggal]\n"
-                            "- tampilkan catatan site [nama_site] tanggal [tanggal]\n"
-                            "- tampilkan catatannya / tampilkan catatan (session + DB)")
-
-                # Query DB sesuai filter
-                sql = f"SELECT site_name, tanggal, jam, isi_catatan, status, tanggal_selesai FROM {TABLE_NAME} WHERE isi_catatan IS NOT NULL"
-                params = []
-
-                if site_to_query:
-                    sql += " AND LOWER(site_name) = %s"
-                    params.append(site_to_query)
-                if tanggal_to_query:
-                    sql += " AND tanggal = %s"
-                    params.append(tanggal_to_query)
-                sql += """
-                ORDER BY 
-                    to_date(tanggal, 'FMDay, DD FMMonth YYYY'),
-                    jam
-                """
-
-                cur.execute(sql, tuple(params))
-                rows = cur.fetchall()
+    site_to_query = None
+    tanggal_to_query = None
+    tanggal_input = None
+    setelah = None
+    halaman = 1
+
+    # ===========================
+    # MODE LANJUT : ambil halaman berikutnya dari cursor di session
+    # ===========================
+    if re.match(r"^lanjut(kan)?\b", query_lower):
+        cursor_state = _notulensi_cursor.get(cursor_key)
+        if not cursor_state:
+            return "ℹ Tidak ada daftar catatan yang bisa dilanjutkan. Gunakan: tampilkan catatan site [nama_site]"
+        site_to_query = cursor_state["site"]
+        tanggal_to_query = cursor_state["tanggal"]
+        tanggal_input = cursor_state["tanggal_input"]
+        setelah = cursor_state["setelah"]
+        halaman = cursor_state["halaman"] + 1
+
+    elif site_tanggal_match:
+        site_to_query = site_tanggal_match.group(1).strip().lower()
+        tanggal_input = site_tanggal_match.group(2).strip()
+        tanggal_to_query = parse_tanggal_to_db_format(tanggal_input)
+    elif site_match:
+        site_to_query = site_match.group(1).strip().lower()
+    elif tanggal_match:
+        tanggal_input = tanggal_match.group(1).strip()
+        tanggal_to_query = parse_tanggal_to_db_format(tanggal_input)
+
+    if not site_to_query and not tanggal_to_query:
+        return ("⚠ Format tidak dikenali. Gunakan:\n"
+                "- tampilkan catatan site [nama_site]\n"
+                "- tampilkan catatan tanggal [tanggal]\n"
+                "- tampilkan catatan site [nama_site] tanggal [tanggal]\n"
+                "- lanjut (halaman catatan berikutnya)")
 
-                if not rows:
-                    if site_to_query and tanggal_to_query:
-                        return f"📭 Tidak ada catatan untuk site {site_to_query.upper()} tanggal {tanggal_input}."
-                    elif site_to_query:
-                        return f"📭 Tidak ada catatan untuk site {site_to_query.upper()}."
-                    elif tanggal_to_query:
-                        return f"📭 Tidak ada catatan untuk tanggal {tanggal_input}."
+    try:
+        hasil = []
+        jumlah = 0
+        ada_berikutnya = False
+        kunci_terakhir = None
 
-                # Format hasil DB
-                header = "📑 **Catatan Site {}**:\n".format(site_to_query.upper()) if site_to_query else f"🗓 **Catatan Tanggal {tanggal_input}**:\n"
-                hasil.append(header)
+        with get_db_connection() as conn:
+            # Named cursor = server-side cursor, baris dialirkan per itersize
+            with conn.cursor(name="notulensi_halaman") as cur:
+                cur.itersize = NOTULENSI_PAGE_SIZE + 1
+                rows = _iter_halaman_notulensi(
+                    cur, site_to_query, tanggal_to_query, setelah, NOTULENSI_PAGE_SIZE + 1
+                )
+                for row_id, site_name, tgl, jam, isi, status, tgl_selesai, tgl_key, jam_key in rows:
+                    if jumlah == NOTULENSI_PAGE_SIZE:
+                        ada_berikutnya = True
+                        break
+                    jumlah += 1
+                    kunci_terakhir = (tgl_key, jam_key, row_id)
 
-                for row in rows:
-                    site_name, tgl, jam, isi, status, tgl_selesai = row
                     poin = [p.strip() for p in isi.strip().splitlines() if p.strip()]
                     simbol = "✅" if status == "selesai" else "⏳"
                     selesai_info = f" (✅ selesai: {tgl_selesai})" if status == "selesai" and tgl_selesai else ""
@@ -351,12 +456,45 @@ def tampilkan_notulensi(query: str, user_id: str = "default") -> str:
                     lokasi = f"📍 {site_name.upper()} " if site_to_query is None else ""
                     hasil.append(f"📅 {tgl} - {lokasi}⏰ {jam or '-'}{selesai_info}\n{bullet}\n")
 
-                return format_notulensi_to_markdown("\n".join(hasil))
+        if not jumlah:
+            _notulensi_cursor.pop(cursor_key, None)
+            if halaman > 1:
+                return "📭 Tidak ada catatan lagi untuk ditampilkan."
+            if site_to_query and tanggal_to_query:
+                return f"📭 Tidak ada catatan untuk site {site_to_query.upper()} tanggal {tanggal_input}."
+            elif site_to_query:
+                return f"📭 Tidak ada catatan untuk site {site_to_query.upper()}."
+            return f"📭 Tidak ada catatan untuk tanggal {tanggal_input}."
+
+        if ada_berikutnya:
+            _notulensi_cursor[cursor_key] = {
+                "site": site_to_query,
+                "tanggal": tanggal_to_query,
+                "tanggal_input": tanggal_input,
+                "setelah": kunci_terakhir,
+                "halaman": halaman,
+            }
+        else:
+            _notulensi_cursor.pop(cursor_key, None)
+
+        # Format hasil DB
+        judul = f"📑 **Catatan Site {site_to_query.upper()}**" if site_to_query else f"🗓 **Catatan Tanggal {tanggal_input}**"
+        hasil.insert(0, f"{judul} (halaman {halaman}, terbaru dulu):\n")
+        if ada_berikutnya:
+            hasil.append(f"➡️ Ketik **lanjut** untuk menampilkan {NOTULENSI_PAGE_SIZE} catatan berikutnya.")
+
+        return format_notulensi_to_markdown("\n".join(hasil))
 
     except Exception as e:
         return f"⚠ Gagal mengambil data: {e}"
     
-def rekap_catatan(query: str, user_id: str = "default") -> str:
+FORMAT_PERIODE_REKAP = "- rekap minggu ini\n- rekap minggu kemarin\n- rekap bulan ini\n- rekap bulan kemarin\n- rekap bulan [nama_bulan] [tahun opsional]\n- rekap bulan [nama_bulan] [tahun opsional] tanggal [tgl1] sampai [tgl2]\n- rekap dari [tgl] sampai [tgl]"
+
+def parse_periode_rekap(query: str):
+    """
+    Ubah teks periode rekap menjadi (tanggal_awal, tanggal_akhir).
+    Kembalikan None jika format tidak dikenali, raise ValueError jika tanggal tidak valid.
+    """
     query = query.lower().strip()
     minggu_ini = "minggu ini" in query
     minggu_kemarin = "minggu kemarin" in query or "last week" in query
@@ -366,53 +504,66 @@ def rekap_catatan(query: str, user_id: str = "default") -> str:
     bulan_range_match = re.search(r"bulan\s+(\w+)\s*(\d{4})?\s*tanggal\s+(\d{1,2})\s+sampai\s+(\d{1,2})", query)
     bulan_match = re.search(r"bulan\s+(\w+)\s*(\d{4})?", query)
 
-    try:
-        today = datetime.now().date()
-
-        if minggu_ini:
-            tanggal_awal = today - timedelta(days=today.weekday())
-            tanggal_akhir = today
-
-        elif minggu_kemarin:
-            tanggal_awal = today - timedelta(days=today.weekday() + 7)
-            tanggal_akhir = tanggal_awal + timedelta(days=6)
-
-        elif bulan_ini:
-            tanggal_awal = today.replace(day=1)
-            tanggal_akhir = today
-
-        elif bulan_kemarin:
-            first_day_this_month = today.replace(day=1)
-            last_month_last_day = first_day_this_month - timedelta(days=1)
-            tanggal_awal = last_month_last_day.replace(day=1)
-            tanggal_akhir = last_month_last_day
-
-        elif bulan_range_match:
-            nama_bulan = bulan_range_match.group(1)
-            tahun = int(bulan_range_match.group(2) or today.year)
-            tanggal1 = int(bulan_range_match.group(3))
-            tanggal2 = int(bulan_range_match.group(4))
-            bulan_num = dateparser.parse(f"1 {nama_bulan} {tahun}", languages=["id"]).month
-            tanggal_awal = datetime(tahun, bulan_num, tanggal1).date()
-            tanggal_akhir = datetime(tahun, bulan_num, tanggal2).date()
-
-        elif bulan_match:
-            nama_bulan = bulan_match.group(1)
-            tahun = int(bulan_match.group(2) or today.year)
-            bulan_num = dateparser.parse(f"1 {nama_bulan} {tahun}", languages=["id"]).month
-            tanggal_awal = datetime(tahun, bulan_num, 1).date()
-            last_day = calendar.monthrange(tahun, bulan_num)[1]
-            tanggal_akhir = datetime(tahun, bulan_num, last_day).date()
-
-        elif rentang_match:
-            tanggal_awal = parse_date(rentang_match.group(1), dayfirst=True).date()
-            tanggal_akhir = parse_date(rentang_match.group(2), dayfirst=True).date()
-
-        else:
-            return "⚠️ Format tidak dikenali. Gunakan:\n- rekap minggu ini\n- rekap minggu kemarin\n- rekap bulan ini\n- rekap bulan kemarin\n- rekap bulan [nama_bulan] [tahun opsional]\n- rekap bulan [nama_bulan] [tahun opsional] tanggal [tgl1] sampai [tgl2]\n- rekap dari [tgl] sampai [tgl]"
+    today = datetime.now().date()
+
+    if minggu_ini:
+        tanggal_awal = today - timedelta(days=today.weekday())
+        tanggal_akhir = today
+
+    elif minggu_kemarin:
+        tanggal_awal = today - timedelta(days=today.weekday() + 7)
+        tanggal_akhir = tanggal_awal + timedelta(days=6)
+
+    elif bulan_ini:
+        tanggal_awal = today.replace(day=1)
+        tanggal_akhir = today
+
+    elif bulan_kemarin:
+        first_day_this_month = today.replace(day=1)
+        last_month_last_day = first_day_this_month - timedelta(days=1)
+        tanggal_awal = last_month_last_day.replace(day=1)
+        tanggal_akhir = last_month_last_day
+
+    elif bulan_range_match:
+        nama_bulan = bulan_range_match.group(1)
+        tahun = int(bulan_range_match.group(2) or today.year)
+        tanggal1 = int(bulan_range_match.group(3))
+        tanggal2 = int(bulan_range_match.group(4))
+        bulan_num = bulan_ke_angka(nama_bulan)
+        if not bulan_num:
+            raise ValueError(f"nama bulan '{nama_bulan}' tidak dikenali")
+        tanggal_awal = datetime(tahun, bulan_num, tanggal1).date()
+        tanggal_akhir = datetime(tahun, bulan_num, tanggal2).date()
+
+    elif bulan_match:
+        nama_bulan = bulan_match.group(1)
+        tahun = int(bulan_match.group(2) or today.year)
+        bulan_num = bulan_ke_angka(nama_bulan)
+        if not bulan_num:
+            raise ValueError(f"nama bulan '{nama_bulan}' tidak dikenali")
+        tanggal_awal = datetime(tahun, bulan_num, 1).date()
+        last_day = calendar.monthrange(tahun, bulan_num)[1]
+        tanggal_akhir = datetime(tahun, bulan_num, last_day).date()
+
+    elif rentang_match:
+        tanggal_awal = parse_tanggal(rentang_match.group(1))
+        tanggal_akhir = parse_tanggal(rentang_match.group(2))
+        if not tanggal_awal or not tanggal_akhir:
+            raise ValueError("rentang tanggal tidak dikenali")
+
+    else:
+        return None
+
+    return tanggal_awal, tanggal_akhir
 
+def rekap_catatan(query: str, user_id: str = "default") -> str:
+    try:
+        periode = parse_periode_rekap(query)
     except Exception as e:
         return f"❌ Gagal memproses tanggal: {e}"
+    if not periode:
+        return "⚠️ Format tidak dikenali. Gunakan:\n" + FORMAT_PERIODE_REKAP
+    tanggal_awal, tanggal_akhir = periode
 
     try:
         with get_db_connection() as conn:
@@ -423,7 +574,7 @@ def rekap_catatan(query: str, user_id: str = "default") -> str:
                     WHERE isi_catatan IS NOT NULL
                     ORDER BY 
                         site_name,
-                        to_date(tanggal, 'FMDay, DD FMMonth YYYY'),
+                        {ORDER_TANGGAL},
                         jam
                 """)
                 rows = cur.fetchall()
@@ -431,48 +582,189 @@ def rekap_catatan(query: str, user_id: str = "default") -> str:
         if not rows:
             return "📭 Tidak ada catatan ditemukan di database."
 
-        hasil = []
-        site_summary = defaultdict(lambda: {"total": 0, "selesai": 0, "aktif": 0, "catatan": []})
-        catatan_terstruktur = []
-
-        for site, tgl, jam, isi, status, tgl_selesai in rows:
-            try:
-                tgl_date = parse_date(tgl, dayfirst=True).date()
-            except:
-                continue
-            if not (tanggal_awal <= tgl_date <= tanggal_akhir):
-                continue
-            simbol = "✅" if status == "selesai" else "⏳"
-            selesai_info = f"\n📌 selesai: {tgl_selesai}" if status == "selesai" and tgl_selesai else ""
-            poin = [p.strip() for p in isi.strip().splitlines() if p.strip()]
-
-            site_data = site_summary[site]
-            site_data["total"] += 1
-            site_data["selesai"] += 1 if status == "selesai" else 0
-            site_data["aktif"] += 1 if status != "selesai" else 0
-            for p in poin:
-                site_data["catatan"].append(f"📅 {tgl} - ⏰ {jam or '-'}\n{simbol} {p}{selesai_info}")
-                catatan_terstruktur.append({
-                    "tanggal": tgl,
-                    "jam": jam or "-",
-                    "isi": p,
-                    "status": status,
-                    "tanggal_selesai": tgl_selesai
-                })
-
-        hasil.append(f"📊 **Rekap Catatan ({tanggal_awal.strftime('%d %B')} – {tanggal_akhir.strftime('%d %B %Y')}):**\n")
-        for site, data in site_summary.items():
-            hasil.append(f"### 📍 {site.upper()}\nTotal: {data['total']} | ✅ Selesai: {data['selesai']} | ⏳ Aktif: {data['aktif']}\n")
-            hasil.extend(data["catatan"])
-            hasil.append("")
+        teks, catatan_terstruktur = susun_rekap(rows, tanggal_awal, tanggal_akhir)
 
         user_sessions[user_id] = {
             "site": "REKAP_CATATAN",
             "catatan": catatan_terstruktur,
-            "last_site": "REKAP_CATATAN"
+            "last_site": "REKAP_CATATAN",
+            "periode": (tanggal_awal.isoformat(), tanggal_akhir.isoformat())
         }
 
-        return format_notulensi_to_markdown("\n".join(hasil))
+        return teks
 
     except Exception as e:
         return f"❌ Gagal mengambil data dari database: {e}"
+
+
+def dalam_periode(tgl, tanggal_awal: date, tanggal_akhir: date) -> bool:
+    """
+    Filter periode bersama untuk rekap teks dan arsip ZIP. Tanggal di-parse
+    di Python, baris yang tanggalnya tidak bisa di-parse dilewati.
+    """
+    tgl_date = parse_tanggal(tgl)
+    return bool(tgl_date) and tanggal_awal <= tgl_date <= tanggal_akhir
+
+
+def susun_rekap(rows, tanggal_awal, tanggal_akhir) -> tuple:
+    """
+    Agregasi baris (site, tanggal, jam, isi, status, tanggal_selesai) per site
+    dalam periode → (teks markdown rekap, catatan terstruktur untuk ekspor).
+    """
+    hasil = []
+    site_summary = defaultdict(lambda: {"total": 0, "selesai": 0, "aktif": 0, "catatan": []})
+    catatan_terstruktur = []
+
+    for site, tgl, jam, isi, status, tgl_selesai in rows:
+        if not dalam_periode(tgl, tanggal_awal, tanggal_akhir):
+            continue
+        simbol = "✅" if status == "selesai" else "⏳"
+        selesai_info = f"\n📌 selesai: {tgl_selesai}" if status == "selesai" and tgl_selesai else ""
+        poin = [p.strip() for p in isi.strip().splitlines() if p.strip()]
+
+        site_data = site_summary[site]
+        site_data["total"] += 1
+        site_data["selesai"] += 1 if status == "selesai" else 0
+        site_data["aktif"] += 1 if status != "selesai" else 0
+        for p in poin:
+            site_data["catatan"].append(f"📅 {tgl} - ⏰ {jam or '-'}\n{simbol} {p}{selesai_info}")
+            catatan_terstruktur.append({
+                "tanggal": tgl,
+                "jam": jam or "-",
+                "isi": p,
+                "status": status,
+                "tanggal_selesai": tgl_selesai
+            })
+
+    hasil.append(f"📊 **Rekap Catatan ({tanggal_awal.strftime('%d %B')} – {tanggal_akhir.strftime('%d %B %Y')}):**\n")
+    for site, data in site_summary.items():
+        hasil.append(f"### 📍 {site.upper()}\nTotal: {data['total']} | ✅ Selesai: {data['selesai']} | ⏳ Aktif: {data['aktif']}\n")
+        hasil.extend(data["catatan"])
+        hasil.append("")
+
+    return format_notulensi_to_markdown("\n".join(hasil)), catatan_terstruktur
+
+# ----------------------------
+# Arsip Rekap (ZIP berisi PDF per site)
+# ----------------------------
+def _iter_site_periode(cur, tanggal_awal: str, tanggal_akhir: str):
+    # Filter periode sama dengan susun_rekap, supaya isi ZIP = isi rekap
+    awal, akhir = date.fromisoformat(tanggal_awal), date.fromisoformat(tanggal_akhir)
+    cur.execute(f"""
+        SELECT DISTINCT LOWER(site_name), tanggal
+        FROM {TABLE_NAME}
+        WHERE isi_catatan IS NOT NULL
+        ORDER BY 1
+    """)
+    terakhir = None
+    for site, tgl in cur:
+        if site != terakhir and dalam_periode(tgl, awal, akhir):
+            terakhir = site
+            yield site
+
+
+def render_pdf_site_periode(site: str, tanggal_awal: str, tanggal_akhir: str, out_dir: str) -> str | None:
+    """
+    Dijalankan di proses worker: buka koneksi DB sendiri, render PDF satu site.
+    """
+    awal, akhir = date.fromisoformat(tanggal_awal), date.fromisoformat(tanggal_akhir)
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT tanggal, jam, isi_catatan, status, tanggal_selesai
+                FROM {TABLE_NAME}
+                WHERE LOWER(site_name) = %s AND isi_catatan IS NOT NULL
+            """, (site,))
+            rows = [row for row in cur if dalam_periode(row[0], awal, akhir)]
+    finally:
+        conn.close()
+
+    rows.sort(key=lambda row: (parse_tanggal(row[0]), str(row[1] or "")))
+    catatan = [
+        {"tanggal": tgl, "jam": jam or "-", "isi": isi, "status": status, "tanggal_selesai": tgl_selesai}
+        for tgl, jam, isi, status, tgl_selesai in rows
+    ]
+
+    if not catatan:
+        return None
+    path = os.path.join(out_dir, f"{site.upper()}_{tanggal_awal}_{tanggal_akhir}.pdf")
+    tulis_notulensi_pdf(site, catatan, path)
+    return path
+
+
+def _get_arsip_pool() -> ProcessPoolExecutor:
+    """
+    Satu pool proses untuk semua arsip, dibuat sekali. Pakai spawn, bukan
+    fork: server multi-thread (Gradio, thread pool ekspor, client HTTP) bisa
+    sedang memegang lock saat fork sehingga worker deadlock.
+    """
+    global _arsip_pool
+    with _arsip_pool_lock:
+        if _arsip_pool is None:
+            _arsip_pool = ProcessPoolExecutor(
+                max_workers=ARSIP_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _arsip_pool
+
+
+def _masukkan_ke_zip(zf: zipfile.ZipFile, futures) -> int:
+    jumlah = 0
+    for future in futures:
+        path = future.result()
+        if path:
+            zf.write(path, arcname=os.path.basename(path))
+            os.remove(path)
+            jumlah += 1
+    return jumlah
+
+
+def buat_arsip_rekap(tanggal_awal: str, tanggal_akhir: str) -> str | None:
+    """
+    Render PDF per site secara paralel (process pool) lalu langsung dialirkan
+    ke ZIP. Jumlah task yang berjalan dibatasi, jadi memori tidak tumbuh
+    seiring jumlah site.
+    """
+    zip_path = os.path.join(ZIP_FOLDER, f"REKAP_{tanggal_awal}_{tanggal_akhir}_{uuid.uuid4().hex[:6]}.zip")
+    max_pending = ARSIP_WORKERS * 2
+    jumlah = 0
+
+    pool = _get_arsip_pool()
+    conn = get_db_connection()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            # Named cursor: daftar site juga dialirkan dari server
+            with conn.cursor(name="arsip_site") as cur:
+                pending = set()
+                for site in _iter_site_periode(cur, tanggal_awal, tanggal_akhir):
+                    pending.add(pool.submit(render_pdf_site_periode, site, tanggal_awal, tanggal_akhir, tmp_dir))
+                    if len(pending) >= max_pending:
+                        selesai, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        jumlah += _masukkan_ke_zip(zf, selesai)
+                jumlah += _masukkan_ke_zip(zf, pending)
+    finally:
+        conn.close()
+
+    if not jumlah:
+        os.remove(zip_path)
+        return None
+    print(f"✅ Arsip rekap {tanggal_awal} – {tanggal_akhir}: {jumlah} site → {zip_path}")
+    return zip_path
+
+
+def siapkan_arsip_rekap(periode_text: str):
+    """
+    Kembalikan Future berisi path ZIP (di-cache per periode + versi data),
+    atau string pesan jika periode tidak valid.
+    """
+    try:
+        periode = parse_periode_rekap(periode_text or "")
+    except Exception as e:
+        return f"❌ Gagal memproses tanggal: {e}"
+    if not periode:
+        return "⚠️ Format periode tidak dikenali. Gunakan:\n" + FORMAT_PERIODE_REKAP
+
+    tanggal_awal, tanggal_akhir = (t.isoformat() for t in periode)
+    key = ekspor_key(("arsip", tanggal_awal, tanggal_akhir), get_data_version(), "zip")
+    return submit_ekspor(key, lambda: buat_arsip_rekap(tanggal_awal, tanggal_akhir))
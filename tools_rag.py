@@ -2,47 +2,159 @@
 
 import os
 import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from PIL import Image
 import pytesseract
+import fitz  # PyMuPDF
 import unicodedata
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from langchain.chat_models import ChatOpenAI
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import PGVector
 from langchain_community.document_loaders import (
-    PDFMinerLoader,
     UnstructuredWordDocumentLoader,
     CSVLoader,
     UnstructuredFileLoader,
 )
 
 from langchain.docstore.document import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from fpdf import FPDF
-from db_utils import get_db_connection
+from db_utils import get_db_connection, get_data_version, bump_data_version, register_data_version_listener
+from cache_utils import LRUCache
+from llm_utils import get_llm
+from tools.tools_status import jawab_pertanyaan_status
+from tools.tools_researcher import get_site_catalog
+from tools.tools_embeddings import get_embeddings
+from tools.tools_chunking import iter_chunks
+from tools.tools_rerank import RERANK_ENABLED, RERANK_CANDIDATES, rerank, rerank_batch
+from tracing import bawa_konteks, span
+from metrics import INGEST_CHUNKS
 
 # === Konfigurasi Vectorstore ===
 COLLECTION_NAME = "notulensi_vector"
 CONNECTION_STRING = "......."
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=100)
+embeddings = get_embeddings()  # EMBEDDING_BACKEND=torch | onnx
+INDEX_BATCH_SIZE = 64  # jumlah chunk per batch embedding + insert
+
+# === Konfigurasi retrieval ===
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")  # vector | lexical | hybrid
+RETRIEVAL_K = 8
+RRF_K = 60  # konstanta reciprocal rank fusion
+FTS_CONFIG = "simple"
+STOPWORDS_QUERY = {
+    "apa", "apakah", "yang", "di", "ke", "dari", "dan", "atau", "ada", "saja", "mana", "site",
+    "sudah", "belum", "sedang", "untuk", "dengan", "ini", "itu", "terjadi", "gangguan",
+    "sebutkan", "berikan", "tunjukkan", "daftar", "semua", "bagaimana", "kenapa", "masalah",
+}
+
+# === Konfigurasi batch RAG ===
+RAG_BATCH_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", "4"))  # panggilan LLM paralel
+
+# === Konfigurasi cache jawaban ===
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("RAG_ANSWER_CACHE_TTL", "3600"))  # detik
+
+# === Backend vektor: pgvector (remote) atau faiss (lokal, in-process) ===
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pgvector")
+_vector_stores = {}
 
 # === Fungsi koneksi PGVector ===
 def get_pgvector_store():
-    return PGVector(
-        collection_name=COLLECTION_NAME,
-        connection_string=CONNECTION_STRING,
-        embedding_function=embeddings,
-    )
+    # Dipakai ulang supaya engine/pool koneksi SQLAlchemy tidak dibuat per query
+    if "pgvector" not in _vector_stores:
+        _vector_stores["pgvector"] = PGVector(
+            collection_name=COLLECTION_NAME,
+            connection_string=CONNECTION_STRING,
+            embedding_function=embeddings,
+        )
+    return _vector_stores["pgvector"]
+
+def get_faiss_store():
+    if "faiss" not in _vector_stores:
+        from tools.tools_vectorstore import FaissVectorIndex
+        _vector_stores["faiss"] = FaissVectorIndex(embeddings)
+    return _vector_stores["faiss"]
+
+def get_vector_backend():
+    if VECTOR_BACKEND == "faiss":
+        return get_faiss_store()
+    return get_pgvector_store()
+
+# === Ekstraksi PDF per halaman (streaming) ===
+def iter_pdf_pages(file_path: str):
+    """
+    Generator teks PDF halaman per halaman, supaya PDF besar tidak
+    dimuat sekaligus ke memori.
+    """
+    doc = fitz.open(file_path)
+    try:
+        for page in doc:
+            yield page.get_text()
+    finally:
+        doc.close()
+
+def _iter_raw_documents(file_path: str, ext: str, basename: str, site_name: str = None):
+    if ext == ".pdf":
+        for nomor, teks in enumerate(iter_pdf_pages(file_path), start=1):
+            if not teks.strip():
+                continue
+            metadata = {"source": basename, "page": nomor}
+            if site_name:
+                metadata["site_name"] = site_name
+            yield Document(page_content=teks, metadata=metadata)
+        return
+
+    if ext == ".txt":
+        loader = UnstructuredFileLoader(file_path, mode="elements")
+    elif ext in [".docx", ".doc"]:
+        loader = UnstructuredWordDocumentLoader(file_path)
+    elif ext == ".csv":
+        loader = CSVLoader(file_path)
+    else:
+        raise ValueError(f"Format file tidak dikenali: {file_path}")
+
+    for doc in loader.lazy_load():
+        doc.metadata["source"] = basename
+        if site_name:
+            doc.metadata["site_name"] = site_name
+        yield doc
+
+def _index_in_batches(raw_docs, batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """
+    Chunk per entri notulensi (lihat tools_chunking), embed, dan simpan ke
+    backend vektor per batch berukuran tetap. Puncak memori bergantung pada
+    batch_size, bukan ukuran dokumen.
+    """
+    vectorstore = get_vector_backend()
+    buffer = []
+    total = 0
+
+    for chunk in iter_chunks(raw_docs):
+        buffer.append(chunk)
+        if len(buffer) >= batch_size:
+            vectorstore.add_documents(buffer)
+            total += len(buffer)
+            buffer = []
+
+    if buffer:
+        vectorstore.add_documents(buffer)
+        total += len(buffer)
+    if hasattr(vectorstore, "persist"):
+        vectorstore.persist()
+    return total
+
+def _tandai_ingest(raw_docs, ingest_id: str, indexed_at: str):
+    for doc in raw_docs:
+        doc.metadata["ingest_id"] = ingest_id
+        doc.metadata["indexed_at"] = indexed_at
+        yield doc
 
 # === Fungsi untuk mengindeks dokumen/file ===
 def index_file(file_path: str = None, documents: list = None, site_name: str = None):
-    docs = []
-
     if documents:
-        docs = splitter.split_documents(documents)
+        raw_docs = iter(documents)
 
     elif file_path:
         ext = os.path.splitext(file_path)[1].lower()
@@ -51,64 +163,48 @@ def index_file(file_path: str = None, documents: list = None, site_name: str = N
         if ext in [".jpg", ".jpeg", ".png"]:
             try:
                 image = Image.open(file_path)
-                extracted_text = pytesseract.image_to_string(image)
+                with span("ocr", "ocr", source=basename):
+                    extracted_text = pytesseract.image_to_string(image)
 
                 if not extracted_text.strip():
                     print("⚠️ Tidak ada teks di gambar.")
                     return
 
-                raw_docs = [Document(
+                raw_docs = iter([Document(
                     page_content=extracted_text,
                     metadata={"source": basename, "site_name": site_name}
-                )]
+                )])
             except Exception as e:
                 print(f"❌ Gagal OCR: {e}")
                 return
 
-        else:
-            try:
-                if ext == ".txt":
-                    loader = UnstructuredFileLoader(file_path, mode="elements")
-                elif ext == ".pdf":
-                    loader = PDFMinerLoader(file_path)
-                elif ext in [".docx", ".doc"]:
-                    loader = UnstructuredWordDocumentLoader(file_path)
-                elif ext == ".csv":
-                    loader = CSVLoader(file_path)
-                else:
-                    print(f"⛔ Format file tidak dikenali: {file_path}")
-                    return
-
-                raw_docs = loader.load()
-                for doc in raw_docs:
-                    doc.metadata["source"] = basename
-                    if site_name:
-                        doc.metadata["site_name"] = site_name
-
-            except Exception as e:
-                print(f"❌ Gagal load dokumen: {e}")
-                return
+        elif ext in [".txt", ".pdf", ".docx", ".doc", ".csv"]:
+            raw_docs = _iter_raw_documents(file_path, ext, basename, site_name)
 
-        docs = splitter.split_documents(raw_docs)
+        else:
+            print(f"⛔ Format file tidak dikenali: {file_path}")
+            return
 
     else:
         print("❌ Harus beri file_path atau documents.")
         return
 
-    if not docs:
-        print("⚠️ Tidak ada dokumen untuk diindeks.")
-        return
-
+    # ingest_id dipakai GC vectorstore untuk membuang hasil indeks lama dari sumber yang sama
+    raw_docs = _tandai_ingest(raw_docs, uuid.uuid4().hex, datetime.now().isoformat(timespec="seconds"))
     try:
-        PGVector.from_documents(
-            documents=docs,
-            embedding=embeddings,
-            collection_name=COLLECTION_NAME,
-            connection_string=CONNECTION_STRING,
-        )
-        print("✅ Dokumen berhasil diindeks.")
+        with span("vector.index", "vector", backend=VECTOR_BACKEND, site=site_name) as s:
+            total = _index_in_batches(raw_docs)
+            s.set(chunks=total)
+        INGEST_CHUNKS.inc(total, backend=VECTOR_BACKEND)
     except Exception as e:
-        print(f"❌ Gagal menyimpan ke PGVector: {e}")
+        print(f"❌ Gagal mengindeks dokumen ke {VECTOR_BACKEND}: {e}")
+        return
+
+    if not total:
+        print("⚠️ Tidak ada dokumen untuk diindeks.")
+        return
+    bump_data_version(site_name)
+    print(f"✅ {total} chunk dokumen berhasil diindeks.")
 
 # === Ambil konteks dari database ===
 def get_catatan_site_context(site_name: str | None) -> str:
@@ -125,47 +221,146 @@ def get_catatan_site_context(site_name: str | None) -> str:
                 """, (site_name.lower(),))
                 rows = cur.fetchall()
 
-        if not rows:
-            return f"Tidak ada catatan ditemukan untuk site {site_name.upper()}."
-
-        lines = [f"📍 Ringkasan catatan site {site_name.upper()}:"]
-        for tanggal, jam, isi, status, tanggal_selesai in rows:
-            simbol = "✅" if status == "selesai" else "⏳"
-            selesai_info = f" (selesai: {tanggal_selesai})" if status == "selesai" and tanggal_selesai else ""
-            lines.append(f" 📅 {tanggal} ⏰ {jam} {simbol}{selesai_info} {(isi or '').strip()}")
-        return "\n".join(lines)
+        return _format_konteks_site(site_name, rows)
 
     except Exception as e:
         return f"⚠️ Gagal mengambil data catatan dari database (Error: {e})"
 
-# === Jawaban berbasis RAG ===
-def jawab_pertanyaan_pgvector(pertanyaan: str, user_id: str = "default") -> str:
-    match = re.search(r"site\s+([\w\-]+)", pertanyaan, re.IGNORECASE)
-    site_name = match.group(1) if match else None
-
-    db_context = get_catatan_site_context(site_name)
-
-    vectorstore = PGVector(
-        collection_name=COLLECTION_NAME,
-        connection_string=CONNECTION_STRING,
-        embedding_function=embeddings,
-    )
-    retriever = vectorstore.as_retriever(search_type="similarity", k=8)
-    docs = retriever.get_relevant_documents(pertanyaan)
-    vector_context = "\n".join([doc.page_content for doc in docs])
-
-    full_context = f"{db_context}\n\n{vector_context}".strip()
-
-    llm = ChatOpenAI(
-        temperature=0.2,
-        model="mistralai/mistral-small-3.2-24b-instruct",
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY_MISTRAL"),
-    )
+def _format_konteks_site(site_name: str, rows: list) -> str:
+    if not rows:
+        return f"Tidak ada catatan ditemukan untuk site {site_name.upper()}."
+
+    lines = [f"📍 Ringkasan catatan site {site_name.upper()}:"]
+    for tanggal, jam, isi, status, tanggal_selesai in rows:
+        simbol = "✅" if status == "selesai" else "⏳"
+        selesai_info = f" (selesai: {tanggal_selesai})" if status == "selesai" and tanggal_selesai else ""
+        lines.append(f" 📅 {tanggal} ⏰ {jam} {simbol}{selesai_info} {(isi or '').strip()}")
+    return "\n".join(lines)
+
+# === Retrieval: leksikal (full-text), vektor, dan hybrid (RRF) ===
+def init_fts_index():
+    """
+    GIN index full-text di tabel embedding PGVector untuk pencarian leksikal.
+    """
+    if VECTOR_BACKEND == "faiss":
+        return  # backend faiss memakai FTS5 di docstore SQLite
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_langchain_pg_embedding_fts
+                    ON langchain_pg_embedding
+                    USING GIN (to_tsvector('{FTS_CONFIG}', document))
+                """)
+            conn.commit()
+        print("✅ Index full-text vectorstore siap.")
+    except Exception as e:
+        print(f"⚠️ Gagal membuat index full-text: {e}")
+
+def _token_query(pertanyaan: str) -> list:
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", pertanyaan.lower()):
+        if len(token) > 1 and token not in STOPWORDS_QUERY and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+def cari_leksikal(pertanyaan: str, k: int = RETRIEVAL_K) -> list:
+    tokens = _token_query(pertanyaan)
+    if not tokens:
+        return []
+    if VECTOR_BACKEND == "faiss":
+        return get_faiss_store().lexical_search(tokens, k)
+
+    tsquery = " | ".join(tokens)
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT e.document, e.cmetadata,
+                       ts_rank_cd(to_tsvector('{FTS_CONFIG}', e.document), q) AS rank
+                FROM langchain_pg_embedding e
+                JOIN langchain_pg_collection c ON c.uuid = e.collection_id,
+                     to_tsquery('{FTS_CONFIG}', %s) q
+                WHERE c.name = %s
+                  AND to_tsvector('{FTS_CONFIG}', e.document) @@ q
+                ORDER BY rank DESC
+                LIMIT %s
+            """, (tsquery, COLLECTION_NAME, k))
+            rows = cur.fetchall()
+    return [Document(page_content=doc, metadata=meta or {}) for doc, meta, _ in rows]
+
+def cari_vektor(pertanyaan: str, k: int = RETRIEVAL_K) -> list:
+    with span("vector.search", "vector", backend=VECTOR_BACKEND, k=k):
+        return get_vector_backend().similarity_search(pertanyaan, k=k)
+
+def gabung_rrf(rankings: list, k: int = RETRIEVAL_K, rrf_k: int = RRF_K) -> list:
+    """
+    Reciprocal rank fusion: skor = sum(1 / (rrf_k + rank)) dari tiap ranking.
+    """
+    skor = {}
+    dokumen = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = (doc.page_content, doc.metadata.get("source"))
+            skor[key] = skor.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            dokumen.setdefault(key, doc)
+    urut = sorted(skor, key=skor.get, reverse=True)
+    return [dokumen[key] for key in urut[:k]]
+
+def retrieve_documents(pertanyaan: str, k: int = RETRIEVAL_K, mode: str | None = None) -> list:
+    mode = (mode or RETRIEVAL_MODE).lower()
+    if mode == "vector":
+        return cari_vektor(pertanyaan, k)
+    if mode == "lexical":
+        return cari_leksikal(pertanyaan, k)
+    if mode != "hybrid":
+        raise ValueError(f"Mode retrieval tidak dikenal: {mode}")
+
+    # Ambil kandidat lebih banyak dari k supaya fusi punya ruang memilih
+    kandidat = k * 2
+    try:
+        leksikal = cari_leksikal(pertanyaan, kandidat)
+    except Exception as e:
+        print(f"⚠️ Pencarian leksikal gagal, pakai vektor saja: {e}")
+        leksikal = []
+    return gabung_rrf([cari_vektor(pertanyaan, kandidat), leksikal], k=k)
+
+def ambil_dokumen_konteks(pertanyaan: str, k: int = RETRIEVAL_K, mode: str | None = None,
+                          pakai_rerank: bool | None = None) -> list:
+    """
+    Dokumen untuk konteks LLM. Dengan rerank (RAG_RERANK=1), kandidat diambil
+    lebih banyak lalu disaring cross-encoder sehingga konteks lebih pendek.
+    """
+    pakai_rerank = RERANK_ENABLED if pakai_rerank is None else pakai_rerank
+    if not pakai_rerank:
+        return retrieve_documents(pertanyaan, k=k, mode=mode)
+    kandidat = retrieve_documents(pertanyaan, k=max(k, RERANK_CANDIDATES), mode=mode)
+    return rerank(pertanyaan, kandidat)
+
+# === Cache jawaban RAG ===
+# key: (pertanyaan ternormalisasi, site, versi data, mode, k). Versi data naik
+# setiap ada penulisan ke site (atau global), jadi jawaban lama tidak terpakai.
+# Retrieval tidak difilter per site, jadi jawaban yang konteksnya memuat chunk
+# site lain disimpan dengan site None (versi global).
+_answer_cache = LRUCache(max_entries=ANSWER_CACHE_SIZE, ttl_seconds=ANSWER_CACHE_TTL, name="jawaban_rag")
+
+def normalisasi_pertanyaan(pertanyaan: str) -> str:
+    teks = unicodedata.normalize("NFKC", pertanyaan).lower()
+    teks = re.sub(r"[^\w\s\-]", " ", teks)
+    return " ".join(teks.split())
+
+def _invalidate_jawaban(sites: set):
+    # Pertanyaan tanpa site bergantung pada versi global yang selalu ikut naik
+    _answer_cache.invalidate(lambda key: key[1] is None or key[1] in sites)
+
+register_data_version_listener(_invalidate_jawaban)
+
+def answer_cache_stats() -> dict:
+    return _answer_cache.stats()
 
-    prompt = PromptTemplate(
-        input_variables=["context", "question"],
-        template="""\
+# === Jawaban berbasis RAG ===
+RAG_PROMPT = PromptTemplate(
+    input_variables=["context", "question"],
+    template="""\
 Anda adalah asisten teknis yang bertugas menganalisis dokumen gangguan teknis pada site. Berdasarkan informasi berikut:
 
 {context}
@@ -184,16 +379,186 @@ Contoh:
 
 Jangan hilangkan gangguan kecil sekalipun seperti sinyal down, kabel rusak, atau baterai soak.
 """
-    )
+)
 
-    chain = LLMChain(llm=llm, prompt=prompt)
+def _buat_rag_chain() -> LLMChain:
+    return LLMChain(llm=get_llm("rag_jawaban"), prompt=RAG_PROMPT)
+
+def _site_dari_pertanyaan(pertanyaan: str) -> str | None:
+    # "site mana ..." / "site yang ..." adalah pertanyaan lintas site, bukan nama site
+    katalog = get_site_catalog()
+    for match in re.finditer(r"site\s+([\w\-]+)", pertanyaan, re.IGNORECASE):
+        site = match.group(1).lower()
+        if site in katalog:
+            return site
+    return None
+
+def _cache_keys_jawaban(pertanyaan: str, site_name: str | None, mode: str | None, k: int) -> list:
+    """
+    Key yang dicoba saat lookup: versi site (jika ada) lalu versi global.
+    """
+    teks = normalisasi_pertanyaan(pertanyaan)
+    mode = (mode or RETRIEVAL_MODE).lower()
+    keys = [(teks, None, get_data_version(None), mode, k)]
+    if site_name:
+        keys.insert(0, (teks, site_name, get_data_version(site_name), mode, k))
+    return keys
+
+def _key_simpan_jawaban(keys: list, site_name: str | None, docs: list) -> tuple:
+    if site_name and all((doc.metadata.get("site_name") or "").lower() == site_name for doc in docs):
+        return keys[0]
+    return keys[-1]
+
+def _jawab_dengan_llm(chain: LLMChain, pertanyaan: str, db_context: str, docs: list) -> str:
+    vector_context = "\n".join([doc.page_content for doc in docs])
+    full_context = f"{db_context}\n\n{vector_context}".strip()
     result = chain.invoke({
         "context": full_context,
         "question": pertanyaan
     })
-
     return f"[Hasil dari JawabRAG]:\n{result['text'].strip()}"
 
+def _jawaban_tanpa_llm(pertanyaan: str, cache_keys: list, pakai_cache: bool) -> str | None:
+    # Pertanyaan agregat status ("site mana yang sedang gangguan?") dijawab SQL
+    jawaban_status = jawab_pertanyaan_status(pertanyaan)
+    if jawaban_status:
+        return f"[Hasil dari JawabRAG]:\n{jawaban_status}"
+    if pakai_cache:
+        for cache_key in cache_keys:
+            cached = _answer_cache.get(cache_key)
+            if cached is not None:
+                print("♻️ Jawaban RAG diambil dari cache.")
+                return cached
+    return None
+
+def jawab_pertanyaan_pgvector(pertanyaan: str, user_id: str = "default", mode: str | None = None,
+                              k: int = RETRIEVAL_K, pakai_cache: bool = True) -> str:
+    site_name = _site_dari_pertanyaan(pertanyaan)
+    cache_keys = _cache_keys_jawaban(pertanyaan, site_name, mode, k)
+    jawaban = _jawaban_tanpa_llm(pertanyaan, cache_keys, pakai_cache)
+    if jawaban:
+        return jawaban
+
+    db_context = get_catatan_site_context(site_name)
+    docs = ambil_dokumen_konteks(pertanyaan, k=k, mode=mode)
+    jawaban = _jawab_dengan_llm(_buat_rag_chain(), pertanyaan, db_context, docs)
+    if pakai_cache:
+        _answer_cache.set(_key_simpan_jawaban(cache_keys, site_name, docs), jawaban)
+    return jawaban
+
+# === Batch RAG: banyak pertanyaan sekaligus ===
+def buat_pertanyaan_per_site(template: str, sites) -> list:
+    """
+    template memakai placeholder {site}, misal "ringkas gangguan site {site} bulan ini".
+    """
+    return [template.replace("{site}", site) for site in sites]
+
+def get_catatan_site_context_batch(site_names) -> dict:
+    """
+    Konteks catatan untuk banyak site dalam satu query.
+    """
+    sites = sorted({s.lower() for s in site_names if s})
+    if not sites:
+        return {}
+    rows_per_site = {site: [] for site in sites}
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT LOWER(site_name), tanggal, jam, isi_catatan, status, tanggal_selesai
+                    FROM catatan_site
+                    WHERE LOWER(site_name) = ANY(%s)
+                    ORDER BY LOWER(site_name), tanggal, jam
+                """, (sites,))
+                for site, *row in cur:
+                    rows_per_site[site].append(row)
+    except Exception as e:
+        pesan = f"⚠️ Gagal mengambil data catatan dari database (Error: {e})"
+        return {site: pesan for site in sites}
+    return {site: _format_konteks_site(site, rows) for site, rows in rows_per_site.items()}
+
+def retrieve_documents_batch(pertanyaan_list: list, k: int = RETRIEVAL_K, mode: str | None = None) -> list:
+    """
+    Semua pertanyaan di-embed dalam satu panggilan embed_documents, lalu
+    dicari per vektor. Leksikal (FTS) tetap per pertanyaan karena murah.
+    """
+    mode = (mode or RETRIEVAL_MODE).lower()
+    if mode == "lexical":
+        return [cari_leksikal(p, k) for p in pertanyaan_list]
+    if mode not in ("vector", "hybrid"):
+        raise ValueError(f"Mode retrieval tidak dikenal: {mode}")
+
+    kandidat = k if mode == "vector" else k * 2
+    store = get_vector_backend()
+    vektor = embeddings.embed_documents(pertanyaan_list)
+    hasil = []
+    for pertanyaan, vec in zip(pertanyaan_list, vektor):
+        with span("vector.search", "vector", backend=VECTOR_BACKEND, k=kandidat):
+            docs_vektor = store.similarity_search_by_vector(vec, k=kandidat)
+        if mode == "vector":
+            hasil.append(docs_vektor)
+            continue
+        try:
+            leksikal = cari_leksikal(pertanyaan, kandidat)
+        except Exception as e:
+            print(f"⚠️ Pencarian leksikal gagal, pakai vektor saja: {e}")
+            leksikal = []
+        hasil.append(gabung_rrf([docs_vektor, leksikal], k=k))
+    return hasil
+
+def jawab_pertanyaan_batch(pertanyaan_list: list, mode: str | None = None, k: int = RETRIEVAL_K,
+                           max_concurrency: int = RAG_BATCH_CONCURRENCY, pakai_cache: bool = True,
+                           sites: list | None = None):
+    """
+    Generator (index, pertanyaan, jawaban) yang keluar sesuai urutan selesai.
+    Embedding dan konteks DB diambil sekali untuk semua pertanyaan; panggilan
+    LLM berjalan paralel dengan batas max_concurrency. sites (sejajar dengan
+    pertanyaan_list) dipakai apa adanya; tanpa sites, site ditebak dari teks.
+    """
+    if sites is None:
+        sites = [_site_dari_pertanyaan(p) for p in pertanyaan_list]
+    elif len(sites) != len(pertanyaan_list):
+        raise ValueError("Jumlah sites harus sama dengan jumlah pertanyaan.")
+    sites = [site.lower() if site else None for site in sites]
+    keys = [_cache_keys_jawaban(p, site, mode, k) for p, site in zip(pertanyaan_list, sites)]
+
+    sisa = []
+    for i, pertanyaan in enumerate(pertanyaan_list):
+        jawaban = _jawaban_tanpa_llm(pertanyaan, keys[i], pakai_cache)
+        if jawaban:
+            yield i, pertanyaan, jawaban
+        else:
+            sisa.append(i)
+    if not sisa:
+        return
+
+    konteks_site = get_catatan_site_context_batch(sites[i] for i in sisa)
+    pertanyaan_sisa = [pertanyaan_list[i] for i in sisa]
+    if RERANK_ENABLED:
+        kandidat = retrieve_documents_batch(pertanyaan_sisa, k=max(k, RERANK_CANDIDATES), mode=mode)
+        docs_list = rerank_batch(pertanyaan_sisa, kandidat)
+    else:
+        docs_list = retrieve_documents_batch(pertanyaan_sisa, k=k, mode=mode)
+    chain = _buat_rag_chain()
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="rag-batch") as executor:
+        futures = {
+            executor.submit(
+                bawa_konteks(_jawab_dengan_llm), chain, pertanyaan_list[i], konteks_site.get(sites[i], ""), docs
+            ): (i, docs)
+            for i, docs in zip(sisa, docs_list)
+        }
+        for future in as_completed(futures):
+            i, docs = futures[future]
+            try:
+                jawaban = future.result()
+            except Exception as e:
+                yield i, pertanyaan_list[i], f"❌ Gagal menjawab: {e}"
+                continue
+            if pakai_cache:
+                _answer_cache.set(_key_simpan_jawaban(keys[i], sites[i], docs), jawaban)
+            yield i, pertanyaan_list[i], jawaban
+
 # === Simpan jawaban ke file TXT ===
 def simpan_jawaban_ke_txt(jawaban: str, filename: str = "jawaban_rag.txt"):
     with open(filename, "w", encoding="utf-8") as f:
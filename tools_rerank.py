@@ -0,0 +1,91 @@
+# tools/rerank.py
+# Tahap rerank opsional (CPU): ambil kandidat lebih banyak dari retrieval,
+# skor pasangan (pertanyaan, chunk) dengan cross-encoder kecil dalam satu
+# batch, lalu simpan hanya beberapa teratas yang skornya di atas ambang.
+import os
+import time
+import threading
+
+from prompt_utils import hitung_token
+from tracing import span
+
+# === Konfigurasi ===
+RERANK_ENABLED = os.getenv("RAG_RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")  # multilingual
+RERANK_CANDIDATES = int(os.getenv("RAG_RERANK_CANDIDATES", "20"))
+RERANK_TOP_N = int(os.getenv("RAG_RERANK_TOP_N", "4"))
+RERANK_MIN_SCORE = float(os.getenv("RAG_RERANK_MIN_SCORE", "0.2"))  # skor sigmoid 0..1
+RERANK_MIN_KEEP = 1  # konteks tidak pernah kosong
+RERANK_BATCH_SIZE = 32
+RERANK_MAX_LENGTH = 256
+
+_reranker = None
+_reranker_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"panggilan": 0, "pertanyaan": 0, "rerank_ms": 0.0, "token_sebelum": 0, "token_sesudah": 0}
+
+
+def get_reranker():
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            from sentence_transformers import CrossEncoder
+
+            print(f"⚙️ Memuat cross-encoder rerank ({RERANK_MODEL})")
+            _reranker = CrossEncoder(RERANK_MODEL, max_length=RERANK_MAX_LENGTH, device="cpu")
+    return _reranker
+
+
+# === Estimasi token konteks ===
+def _token_dokumen(docs: list) -> int:
+    return sum(hitung_token(doc.page_content) for doc in docs)
+
+
+# === Rerank ===
+def rerank_batch(pertanyaan_list: list, docs_list: list, top_n: int = RERANK_TOP_N,
+                 min_score: float = RERANK_MIN_SCORE) -> list:
+    """
+    Semua pasangan dari semua pertanyaan diskor dalam satu panggilan predict.
+    Skor disimpan di metadata["rerank_score"].
+    """
+    pasangan = [(p, doc.page_content) for p, docs in zip(pertanyaan_list, docs_list) for doc in docs]
+    if not pasangan:
+        return [list(docs) for docs in docs_list]
+
+    start = time.perf_counter()
+    with span("rerank", "internal", pasangan=len(pasangan)):
+        skor = get_reranker().predict(pasangan, batch_size=RERANK_BATCH_SIZE, show_progress_bar=False)
+    durasi_ms = (time.perf_counter() - start) * 1000
+
+    hasil = []
+    pos = 0
+    for docs in docs_list:
+        skor_docs = [float(s) for s in skor[pos:pos + len(docs)]]
+        pos += len(docs)
+        urut = sorted(zip(skor_docs, docs), key=lambda x: x[0], reverse=True)
+        terpilih = [doc for s, doc in urut[:top_n] if s >= min_score] or [doc for _, doc in urut[:RERANK_MIN_KEEP]]
+        for s, doc in urut:
+            doc.metadata["rerank_score"] = s
+        hasil.append(terpilih)
+
+    with _stats_lock:
+        _stats["panggilan"] += 1
+        _stats["pertanyaan"] += len(docs_list)
+        _stats["rerank_ms"] += durasi_ms
+        _stats["token_sebelum"] += sum(_token_dokumen(docs) for docs in docs_list)
+        _stats["token_sesudah"] += sum(_token_dokumen(docs) for docs in hasil)
+    return hasil
+
+
+def rerank(pertanyaan: str, docs: list, top_n: int = RERANK_TOP_N, min_score: float = RERANK_MIN_SCORE) -> list:
+    return rerank_batch([pertanyaan], [docs], top_n=top_n, min_score=min_score)[0]
+
+
+def rerank_stats() -> dict:
+    with _stats_lock:
+        n = _stats["pertanyaan"]
+        return {
+            **_stats,
+            "rerank_ms_per_pertanyaan": _stats["rerank_ms"] / n if n else 0.0,
+            "token_hemat_per_pertanyaan": (_stats["token_sebelum"] - _stats["token_sesudah"]) / n if n else 0.0,
+        }
@@ -5,6 +5,7 @@ import re
 
 TABLE_SITE = "site_name"
 site_names_from_db = []
+_site_catalog = {"source": None, "names": frozenset()}
 
 
 def load_all_site_names():
@@ -25,10 +26,20 @@ def load_all_site_names():
         print(f"❌ Error load site_name: {e}")
 
 
-def query_site_from_db(full_query: str) -> str:
-    print(f"🛠 Tool 'query_site_from_db' dipanggil dengan query: '{full_query}'")
+def get_site_catalog() -> frozenset:
+    """
+    Set nama site (lowercase) dari katalog in-memory, untuk validasi cepat
+    tanpa query ke DB per baris.
+    """
+    if not site_names_from_db:
+        load_all_site_names()
+    if _site_catalog["source"] is not site_names_from_db:
+        _site_catalog["names"] = frozenset(name.strip().lower() for name in site_names_from_db)
+        _site_catalog["source"] = site_names_from_db
+    return _site_catalog["names"]
 
-    # LANGKAH 1: Ekstrak keyword
+
+def ekstrak_keyword_site(full_query: str) -> str:
     words_to_ignore = {
         "daftar", "nama", "site", "di", "lokasi", "apa", "id", "dari", "yang",
         "ada", "berada", "untuk", "dan", "cari", "saja", "kode", "wilayah",
@@ -37,7 +48,25 @@ def query_site_from_db(full_query: str) -> str:
 
     words = re.findall(r'\b\w+\b', full_query.lower())
     filtered_words = [word for word in words if word not in words_to_ignore]
-    extracted_keyword = " ".join(filtered_words)
+    return " ".join(filtered_words)
+
+
+def koreksi_nama_site(keyword: str, names: list) -> tuple:
+    """
+    Fuzzy match keyword ke daftar nama site → (search_term, skor). Keyword
+    asli dipakai jika tidak ada kecocokan yang kuat.
+    """
+    corrected_name, score, _ = process.extractOne(keyword, names)
+    if score > 75:
+        return corrected_name, score
+    return keyword, score
+
+
+def query_site_from_db(full_query: str) -> str:
+    print(f"🛠 Tool 'query_site_from_db' dipanggil dengan query: '{full_query}'")
+
+    # LANGKAH 1: Ekstrak keyword
+    extracted_keyword = ekstrak_keyword_site(full_query)
 
     if not extracted_keyword or len(extracted_keyword) < 3:
         return "❗ Pertanyaan terlalu pendek atau tidak spesifik. Coba sebutkan nama lokasi atau site yang lengkap."
@@ -63,13 +92,11 @@ def query_site_from_db(full_query: str) -> str:
                     return response.strip()
 
                 # LANGKAH 3: Cari di site_name pakai fuzzy match
-                corrected_name, score, _ = process.extractOne(extracted_keyword, site_names_from_db)
+                search_term, score = koreksi_nama_site(extracted_keyword, site_names_from_db)
 
                 if score > 75:
-                    search_term = corrected_name
                     print(f"✅ Fuzzy match: '{extracted_keyword}' → '{search_term}' (Skor: {score})")
                 else:
-                    search_term = extracted_keyword
                     print(f"⚠ Tidak ada fuzzy match yang kuat. Menggunakan keyword asli: '{search_term}'")
 
                 cur.execute(f"""
@@ -0,0 +1,109 @@
+# tools/status.py
+# Jawaban terstruktur untuk pertanyaan agregat status site, misalnya
+# "sebutkan semua site yang sedang gangguan" atau "site mana yang sudah normal".
+# Dijawab langsung dengan SQL atas catatan_site, tanpa retrieval maupun LLM.
+import re
+
+from db_utils import get_db_connection
+from tools.tools_notulensi_teks import ORDER_TANGGAL
+
+# === Pola pertanyaan ===
+_RE_AGREGAT = re.compile(
+    r"\b(semua|seluruh|daftar|list|sebutkan|berapa|jumlah|mana saja|site mana|site apa|situs mana)\b"
+)
+_RE_GANGGUAN = re.compile(
+    r"\b(gangguan|belum normal|belum selesai|belum beres|belum pulih|masih (?:down|error|bermasalah|gangguan)|bermasalah|down)\b"
+)
+_RE_NORMAL = re.compile(r"\b(sudah normal|normal kembali|sudah pulih|sudah selesai|sudah beres|teratasi|normal)\b")
+# Hanya pertanyaan tanpa kualifikasi yang dijawab SQL. Kata di luar daftar ini
+# (topik "power"/"baterai", periode "minggu ini"/"juli", lokasi "di cilacap",
+# nama site) berarti pertanyaan perlu filter → diteruskan ke RAG.
+_KATA_AGREGAT_MURNI = {
+    "semua", "seluruh", "daftar", "list", "sebutkan", "tampilkan", "berapa", "jumlah", "mana", "apa", "saja",
+    "site", "situs", "yang", "yg", "sedang", "masih", "sudah", "belum", "saat", "ini", "sekarang", "ada",
+    "status", "gangguan", "normal", "kembali", "selesai", "beres", "pulih", "teratasi", "down", "error",
+    "bermasalah", "tolong", "dong", "ya", "kah",
+}
+ISI_MAX_CHARS = 120
+
+
+def deteksi_pertanyaan_status(pertanyaan: str) -> str | None:
+    """
+    Kembalikan "gangguan" / "normal" jika pertanyaan berupa agregat status
+    lintas site, selain itu None (diteruskan ke RAG biasa).
+    """
+    teks = " ".join(pertanyaan.lower().split())
+    if not _RE_AGREGAT.search(teks):
+        return None
+    if any(kata not in _KATA_AGREGAT_MURNI for kata in re.findall(r"[\w\-]+", teks)):
+        return None  # ada topik / periode / lokasi / site tertentu
+
+    # "belum normal" harus dicek sebagai gangguan sebelum pola "normal"
+    if _RE_GANGGUAN.search(teks):
+        return "gangguan"
+    if _RE_NORMAL.search(teks):
+        return "normal"
+    return None
+
+
+def _site_gangguan(cur) -> list:
+    cur.execute(f"""
+        SELECT site, jumlah, tanggal, isi_catatan
+        FROM (
+            SELECT LOWER(site_name) AS site, tanggal, isi_catatan,
+                   COUNT(*) OVER (PARTITION BY LOWER(site_name)) AS jumlah,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY LOWER(site_name) ORDER BY {ORDER_TANGGAL} DESC, id DESC
+                   ) AS urutan
+            FROM catatan_site
+            WHERE status IS DISTINCT FROM 'selesai' AND site_name IS NOT NULL
+        ) aktif
+        WHERE urutan = 1
+        ORDER BY jumlah DESC, site
+    """)
+    return cur.fetchall()
+
+
+def _site_normal(cur) -> list:
+    cur.execute("""
+        SELECT LOWER(site_name) AS site, COUNT(*) AS jumlah
+        FROM catatan_site
+        WHERE site_name IS NOT NULL
+        GROUP BY LOWER(site_name)
+        HAVING BOOL_AND(COALESCE(status, '') = 'selesai')
+        ORDER BY site
+    """)
+    return cur.fetchall()
+
+
+def _potong(teks: str) -> str:
+    teks = " ".join((teks or "").split())
+    return teks if len(teks) <= ISI_MAX_CHARS else teks[:ISI_MAX_CHARS - 1] + "…"
+
+
+def jawab_pertanyaan_status(pertanyaan: str) -> str | None:
+    jenis = deteksi_pertanyaan_status(pertanyaan)
+    if not jenis:
+        return None
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                rows = _site_gangguan(cur) if jenis == "gangguan" else _site_normal(cur)
+    except Exception as e:
+        print(f"⚠️ Query status agregat gagal, lanjut ke RAG: {e}")
+        return None
+
+    if jenis == "gangguan":
+        if not rows:
+            return "✅ Tidak ada site yang sedang gangguan, semua catatan sudah selesai."
+        lines = [f"⏳ {len(rows)} site masih gangguan / belum normal:"]
+        for site, jumlah, tanggal, isi in rows:
+            lines.append(f"- {site.upper()} ({jumlah} catatan aktif) — terakhir {tanggal or '-'}: {_potong(isi)}")
+        return "\n".join(lines)
+
+    if not rows:
+        return "⚠️ Belum ada site yang seluruh catatannya berstatus selesai."
+    lines = [f"✅ {len(rows)} site sudah normal (semua catatan selesai):"]
+    lines.extend(f"- {site.upper()} ({jumlah} catatan)" for site, jumlah in rows)
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+# tools/tanggal.py
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+# === Konfigurasi ===
+TANGGAL_CACHE_SIZE = 4096
+
+NAMA_BULAN = {
+    # Indonesia
+    "januari": 1, "februari": 2, "pebruari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6,
+    "juli": 7, "agustus": 8, "september": 9, "oktober": 10, "november": 11, "nopember": 11,
+    "desember": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "agu": 8, "agt": 8, "ags": 8,
+    "sep": 9, "sept": 9, "okt": 10, "nov": 11, "des": 12,
+    # Inggris
+    "january": 1, "february": 2, "march": 3, "may": 5, "june": 6, "july": 7, "august": 8,
+    "october": 10, "december": 12, "aug": 8, "oct": 10, "dec": 12,
+}
+
+# "Monday, 04 August 2025", "Senin 4 agustus", "10 juli", "4 agt 2025"
+_RE_HARI_BULAN = re.compile(
+    r"^(?:[a-z']+,?\s+)?(\d{1,2})\s+([a-z]+)\.?(?:,?\s+(\d{4}|\d{2}))?$"
+)
+# "04/08/2025", "4-8-25", "04.08.2025"
+_RE_NUMERIK_DMY = re.compile(r"^(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4}|\d{2})$")
+# "2025-08-04"
+_RE_ISO = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+
+
+def normalisasi_teks_tanggal(teks: str) -> str:
+    teks = teks.lower().replace("\u200b", "").replace("\xa0", " ")
+    return re.sub(r"\s+", " ", teks).strip(" ,.-")
+
+
+def bulan_ke_angka(nama_bulan: str) -> int | None:
+    return NAMA_BULAN.get(normalisasi_teks_tanggal(nama_bulan))
+
+
+def _tahun(raw: str | None, default_year: int) -> int:
+    if not raw:
+        return default_year
+    tahun = int(raw)
+    return tahun + 2000 if tahun < 100 else tahun
+
+
+def _buat_tanggal(tahun: int, bulan: int, hari: int) -> date | None:
+    try:
+        return date(tahun, bulan, hari)
+    except ValueError:
+        return None
+
+
+def _parse_cepat(teks: str, default_year: int) -> date | None:
+    """
+    Jalur cepat untuk format yang memang dipakai di catatan_site.
+    Mengembalikan None jika format tidak dikenali.
+    """
+    match = _RE_HARI_BULAN.match(teks)
+    if match:
+        bulan = NAMA_BULAN.get(match.group(2))
+        if bulan:
+            return _buat_tanggal(_tahun(match.group(3), default_year), bulan, int(match.group(1)))
+        return None
+
+    match = _RE_NUMERIK_DMY.match(teks)
+    if match:
+        return _buat_tanggal(_tahun(match.group(3), default_year), int(match.group(2)), int(match.group(1)))
+
+    match = _RE_ISO.match(teks)
+    if match:
+        return _buat_tanggal(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    return None
+
+
+def _parse_fallback(teks: str) -> date | None:
+    # dateparser lambat (deteksi bahasa + load locale), jadi hanya untuk teks bebas
+    import dateparser
+
+    try:
+        hasil = dateparser.parse(teks, languages=["id", "en"])
+    except Exception as e:
+        print(f"⚠️ Gagal parse tanggal '{teks}': {e}")
+        return None
+    return hasil.date() if hasil else None
+
+
+@lru_cache(maxsize=TANGGAL_CACHE_SIZE)
+def _parse_cached(teks_mentah: str, default_year: int) -> date | None:
+    teks = normalisasi_teks_tanggal(teks_mentah)
+    if not teks:
+        return None
+    return _parse_cepat(teks, default_year)
+
+
+@lru_cache(maxsize=TANGGAL_CACHE_SIZE)
+def _parse_fallback_cached(teks_mentah: str, hari_ini: date) -> date | None:
+    # Frasa relatif ("kemarin", "minggu lalu") bergantung hari ini, jadi hari_ini ikut key
+    teks = normalisasi_teks_tanggal(teks_mentah)
+    if not teks:
+        return None
+    return _parse_fallback(teks)
+
+
+def parse_tanggal(teks: str | None, default_year: int | None = None) -> date | None:
+    """
+    Parse tanggal Indonesia/Inggris ke date. Hasil di-memo (LRU) karena
+    nilai tanggal di DB sangat berulang.
+    """
+    if not teks:
+        return None
+    hasil = _parse_cached(str(teks), default_year or datetime.now().year)
+    if hasil is None:
+        hasil = _parse_fallback_cached(str(teks), date.today())
+    return hasil
+
+
+def format_tanggal_db(tanggal: date) -> str:
+    return tanggal.strftime("%A, %d %B %Y")  # ex: 'Monday, 04 August 2025'
+
+
+def normalisasi_tanggal_db(teks: str | None) -> str | None:
+    """
+    Ubah tanggal bebas ("04/08/2025", "4 Agustus 2025") ke format DB.
+    None jika tidak bisa di-parse.
+    """
+    tanggal = parse_tanggal(teks)
+    return format_tanggal_db(tanggal) if tanggal else None
+
+
+def cache_info():
+    return _parse_cached.cache_info()
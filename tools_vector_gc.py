@@ -0,0 +1,228 @@
+# tools/vector_gc.py
+# Garbage collection koleksi vektor: buang embedding yang sumbernya sudah
+# tidak ada, hasil indeks lama dari file yang di-upload ulang, dan duplikat
+# indeks lama (sebelum ada ingest_id). Setelah itu VACUUM dan laporkan
+# ruang + waktu scan yang didapat kembali.
+import os
+import time
+import statistics
+import threading
+from datetime import datetime
+
+from db_utils import get_db_connection, bump_data_version
+from tools.tools_rag import (
+    COLLECTION_NAME, RETRIEVAL_K, VECTOR_BACKEND, get_vector_backend, get_faiss_store,
+)
+from tools.tools_dokumen import UPLOAD_FOLDER
+
+# === Konfigurasi ===
+GC_BATCH_SIZE = 1000
+GC_PROBE_QUERY = "gangguan baterai genset link down"
+GC_PROBE_RUNS = 3
+VECTOR_GC_INTERVAL_HOURS = float(os.getenv("VECTOR_GC_INTERVAL_HOURS", "0"))  # 0 = tidak terjadwal
+
+_gc_lock = threading.Lock()
+
+
+# === Rekonsiliasi ===
+def sumber_yang_masih_ada() -> set:
+    """
+    Nama file (basename, sama dengan metadata "source") yang masih ada di
+    folder upload atau masih dirujuk catatan_site.file_path.
+    """
+    sumber = set()
+    for _, _, files in os.walk(UPLOAD_FOLDER):
+        sumber.update(files)
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT DISTINCT file_path FROM catatan_site WHERE file_path IS NOT NULL")
+            sumber.update(os.path.basename(row[0]) for row in cur)
+    return sumber
+
+
+def klasifikasi_orphan(iter_rows, sumber_ada: set, snapshot: str) -> dict:
+    """
+    iter_rows() mengembalikan iterable baru (id, source, ingest_id, indexed_at, hash_dokumen).
+    Dua pass supaya yang disimpan di memori hanya id yang akan dihapus.
+    Baris dengan indexed_at >= snapshot (diindeks selama GC berjalan) tidak
+    pernah dihapus, jadi index_file yang berjalan di antara pass 1 dan 2 aman.
+    """
+    terbaru = {}
+    for _, source, ingest_id, indexed_at, _ in iter_rows():
+        if indexed_at and indexed_at >= snapshot:
+            continue
+        if source and ingest_id and (source not in terbaru or (indexed_at or "") > terbaru[source][1]):
+            terbaru[source] = (ingest_id, indexed_at or "")
+
+    hasil = {"sumber_hilang": [], "ingest_lama": [], "duplikat": []}
+    dilihat = set()
+    for row_id, source, ingest_id, indexed_at, doc_hash in iter_rows():
+        if not source or (indexed_at and indexed_at >= snapshot):
+            continue
+        if sumber_ada and source not in sumber_ada:
+            hasil["sumber_hilang"].append(row_id)
+        elif source in terbaru:
+            if ingest_id != terbaru[source][0]:
+                hasil["ingest_lama"].append(row_id)
+        elif (source, doc_hash) in dilihat:
+            hasil["duplikat"].append(row_id)
+        else:
+            dilihat.add((source, doc_hash))
+    return hasil
+
+
+def _ukur_scan_ms() -> float:
+    store = get_vector_backend()
+    durasi = []
+    for _ in range(GC_PROBE_RUNS):
+        start = time.perf_counter()
+        store.similarity_search(GC_PROBE_QUERY, k=RETRIEVAL_K)
+        durasi.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durasi)
+
+
+# === Backend pgvector ===
+def _iter_rows_pgvector(conn):
+    def iter_rows():
+        with conn.cursor(name="vector_gc") as cur:
+            cur.itersize = 10000
+            cur.execute("""
+                SELECT e.uuid::text, e.cmetadata->>'source', e.cmetadata->>'ingest_id',
+                       e.cmetadata->>'indexed_at', md5(e.document)
+                FROM langchain_pg_embedding e
+                JOIN langchain_pg_collection c ON c.uuid = e.collection_id
+                WHERE c.name = %s
+            """, (COLLECTION_NAME,))
+            yield from cur
+    return iter_rows
+
+
+def _ukuran_tabel_pgvector(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_total_relation_size('langchain_pg_embedding')")
+        return cur.fetchone()[0]
+
+
+def _gc_pgvector(sumber_ada: set, snapshot: str, dry_run: bool, full: bool, batch_size: int) -> dict:
+    conn = get_db_connection()
+    try:
+        ukuran_awal = _ukuran_tabel_pgvector(conn)
+        orphan = klasifikasi_orphan(_iter_rows_pgvector(conn), sumber_ada, snapshot)
+        conn.commit()  # tutup transaksi named cursor
+        ids = [row_id for daftar in orphan.values() for row_id in daftar]
+
+        if not dry_run:
+            with conn.cursor() as cur:
+                for i in range(0, len(ids), batch_size):
+                    # Guard kedua: jangan hapus baris yang ditulis ulang setelah snapshot
+                    cur.execute("""
+                        DELETE FROM langchain_pg_embedding
+                        WHERE uuid = ANY(%s::uuid[])
+                          AND COALESCE(cmetadata->>'indexed_at', '') < %s
+                    """, (ids[i:i + batch_size], snapshot))
+                    conn.commit()
+            # VACUUM tidak boleh berjalan di dalam transaksi
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"VACUUM ({'FULL, ' if full else ''}ANALYZE) langchain_pg_embedding")
+
+        return {
+            "orphan": {alasan: len(daftar) for alasan, daftar in orphan.items()},
+            "ukuran_awal": ukuran_awal,
+            "ukuran_akhir": _ukuran_tabel_pgvector(conn),
+        }
+    finally:
+        conn.close()
+
+
+# === Backend faiss ===
+def _ukuran_faiss(store) -> int:
+    return sum(os.path.getsize(p) for p in (store.index_path, store.docstore_path) if os.path.exists(p))
+
+
+def _gc_faiss(sumber_ada: set, snapshot: str, dry_run: bool) -> dict:
+    store = get_faiss_store()
+    ukuran_awal = _ukuran_faiss(store)
+
+    def iter_rows():
+        for row_id, document, meta in store.iter_docstore():
+            yield row_id, meta.get("source"), meta.get("ingest_id"), meta.get("indexed_at"), hash(document)
+
+    orphan = klasifikasi_orphan(iter_rows, sumber_ada, snapshot)
+    if not dry_run:
+        store.kompaksi(row_id for daftar in orphan.values() for row_id in daftar)
+    return {
+        "orphan": {alasan: len(daftar) for alasan, daftar in orphan.items()},
+        "ukuran_awal": ukuran_awal,
+        "ukuran_akhir": _ukuran_faiss(store),
+    }
+
+
+# === Entry point ===
+def jalankan_gc(dry_run: bool = False, full: bool = False, batch_size: int = GC_BATCH_SIZE) -> dict:
+    if not _gc_lock.acquire(blocking=False):
+        return {"error": "GC vectorstore sedang berjalan."}
+    try:
+        start = time.perf_counter()
+        # Format sama dengan indexed_at dari tools_rag.index_file
+        snapshot = datetime.now().isoformat(timespec="seconds")
+        sumber_ada = sumber_yang_masih_ada()
+        if not sumber_ada:
+            print("⚠️ Tidak ada file/catatan sumber ditemukan, aturan 'sumber_hilang' dilewati.")
+
+        scan_awal = _ukur_scan_ms()
+        if VECTOR_BACKEND == "faiss":
+            laporan = _gc_faiss(sumber_ada, snapshot, dry_run)
+        else:
+            laporan = _gc_pgvector(sumber_ada, snapshot, dry_run, full, batch_size)
+
+        laporan["dihapus"] = 0 if dry_run else sum(laporan["orphan"].values())
+        if laporan["dihapus"]:
+            bump_data_version()  # jawaban RAG yang di-cache bisa merujuk chunk yang dihapus
+        laporan.update({
+            "backend": VECTOR_BACKEND,
+            "dry_run": dry_run,
+            "scan_awal_ms": scan_awal,
+            "scan_akhir_ms": _ukur_scan_ms(),
+            "durasi_detik": time.perf_counter() - start,
+        })
+        return laporan
+    finally:
+        _gc_lock.release()
+
+
+def format_laporan_gc(laporan: dict) -> str:
+    if "error" in laporan:
+        return f"⚠️ {laporan['error']}"
+    mb = 1024 * 1024
+    orphan = ", ".join(f"{alasan}={jumlah}" for alasan, jumlah in laporan["orphan"].items())
+    judul = "🔍 GC vectorstore (dry run)" if laporan["dry_run"] else "🧹 GC vectorstore selesai"
+    return "\n".join([
+        f"{judul} [{laporan['backend']}] dalam {laporan['durasi_detik']:.1f} detik",
+        f"- Orphan: {orphan}",
+        f"- Dihapus: {laporan['dihapus']} embedding",
+        f"- Ukuran: {laporan['ukuran_awal'] / mb:.1f} MB → {laporan['ukuran_akhir'] / mb:.1f} MB",
+        f"- Waktu scan: {laporan['scan_awal_ms']:.1f} ms → {laporan['scan_akhir_ms']:.1f} ms",
+    ])
+
+
+# === Penjadwalan ===
+def mulai_gc_terjadwal(interval_hours: float = VECTOR_GC_INTERVAL_HOURS):
+    """
+    Jalankan GC berkala di thread daemon. Tidak melakukan apa-apa jika interval 0.
+    """
+    if not interval_hours or interval_hours <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                print(format_laporan_gc(jalankan_gc()))
+            except Exception as e:
+                print(f"❌ GC vectorstore terjadwal gagal: {e}")
+
+    thread = threading.Thread(target=loop, name="vector-gc", daemon=True)
+    thread.start()
+    print(f"⏲️ GC vectorstore dijadwalkan tiap {interval_hours:g} jam.")
+    return thread
@@ -0,0 +1,270 @@
+# tools/vectorstore.py
+# Backend vektor lokal (in-process) berbasis FAISS.
+# Index vektor disimpan di file FAISS (di-mmap saat startup), teks + metadata
+# disimpan di SQLite sehingga tidak perlu dimuat ke memori.
+import os
+import json
+import sqlite3
+import threading
+
+import faiss
+import numpy as np
+from langchain.docstore.document import Document
+
+# === Konfigurasi ===
+FAISS_DIR = os.getenv("FAISS_DIR", "faiss_index")
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")  # flat | hnsw | ivf
+FAISS_HNSW_M = 32
+FAISS_HNSW_EF_SEARCH = 64
+FAISS_IVF_NLIST = 256
+FAISS_IVF_NPROBE = 16
+FAISS_IVF_MIN_VECTORS = FAISS_IVF_NLIST * 39  # minimum data latih yang disarankan FAISS
+
+
+class FaissVectorIndex:
+    """
+    Interface mengikuti vectorstore LangChain yang dipakai di tools_rag:
+    add_documents, similarity_search, similarity_search_by_vector.
+    """
+
+    def __init__(self, embedding, directory: str = FAISS_DIR, index_type: str = FAISS_INDEX_TYPE):
+        self.embedding = embedding
+        self.directory = directory
+        self.index_type = index_type.lower()
+        self.index_path = os.path.join(directory, "index.faiss")
+        self.docstore_path = os.path.join(directory, "docstore.sqlite")
+        self._lock = threading.RLock()
+        self._index = None
+        self._mmap = False
+        self._dirty = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.docstore_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, document TEXT, metadata TEXT)")
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(document)")
+            self._fts = True
+        except sqlite3.OperationalError:
+            print("⚠️ SQLite tanpa FTS5, pencarian leksikal FAISS dinonaktifkan.")
+            self._fts = False
+        self._db.commit()
+        self._load()
+
+    # ---------- Load / persist ----------
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            # Baris docstore tanpa index (crash sebelum persist pertama) akan
+            # bentrok PRIMARY KEY dengan id 0.. saat add berikutnya
+            self._rollback_docstore(0)
+            return
+        try:
+            self._index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            self._mmap = True
+        except RuntimeError:
+            # Tidak semua tipe index mendukung mmap
+            self._index = faiss.read_index(self.index_path)
+        self._set_search_params()
+        self._rollback_docstore(self._index.ntotal)
+        print(f"✅ FAISS index dimuat ({self._index.ntotal} vektor, mmap={self._mmap}).")
+
+    def _rollback_docstore(self, ntotal: int):
+        # Buang baris docstore yang vektornya belum sempat dipersist
+        self._db.execute("DELETE FROM docs WHERE id >= ?", (ntotal,))
+        if self._fts:
+            self._db.execute("DELETE FROM docs_fts WHERE rowid >= ?", (ntotal,))
+        self._db.commit()
+
+    def _set_search_params(self):
+        params = faiss.ParameterSpace()
+        for name, value in (("efSearch", FAISS_HNSW_EF_SEARCH), ("nprobe", FAISS_IVF_NPROBE)):
+            try:
+                params.set_index_parameter(self._index, name, value)
+            except RuntimeError:
+                pass
+
+    def _buat_index(self, dim: int, n_vectors: int):
+        if self.index_type == "hnsw":
+            spec = f"HNSW{FAISS_HNSW_M},Flat"
+        elif self.index_type == "ivf" and n_vectors >= FAISS_IVF_MIN_VECTORS:
+            spec = f"IVF{FAISS_IVF_NLIST},Flat"
+        else:
+            if self.index_type == "ivf":
+                print(f"⚠️ Data terlalu sedikit untuk melatih IVF{FAISS_IVF_NLIST}, pakai Flat.")
+            spec = "Flat"
+        index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+        print(f"🧱 Membuat FAISS index {spec} (dim={dim}).")
+        return index
+
+    def _bangun_ulang(self, vectors: np.ndarray):
+        index = self._buat_index(vectors.shape[1], len(vectors))
+        if len(vectors):
+            matrix = np.ascontiguousarray(vectors)
+            if not index.is_trained:
+                index.train(matrix)
+            index.add(matrix)
+        return index
+
+    def _upgrade_ivf(self):
+        """
+        Index dibuat Flat selama data belum cukup untuk melatih IVF (add datang
+        per batch kecil), jadi begitu ntotal melewati ambang, latih ulang IVF
+        dari vektor yang ada. Urutan vektor sama, id docstore tidak berubah.
+        """
+        if self.index_type != "ivf" or not isinstance(self._index, faiss.IndexFlat):
+            return
+        if self._index.ntotal < FAISS_IVF_MIN_VECTORS:
+            return
+        self._siap_ditulis()
+        self._index = self._bangun_ulang(self._index.reconstruct_n(0, self._index.ntotal))
+        self._set_search_params()
+        self._dirty = True
+
+    def _siap_ditulis(self):
+        # Index hasil mmap bersifat read-only, muat penuh sebelum ditambah
+        if self._mmap:
+            self._index = faiss.read_index(self.index_path)
+            self._set_search_params()
+            self._mmap = False
+
+    def persist(self):
+        with self._lock:
+            if not self._dirty or self._index is None:
+                return
+            self._upgrade_ivf()
+            tmp_path = self.index_path + ".tmp"
+            faiss.write_index(self._index, tmp_path)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    # ---------- Tulis ----------
+    @staticmethod
+    def _to_matrix(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype="float32")
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    def add_embeddings(self, texts: list, vectors, metadatas: list = None) -> list:
+        matrix = self._to_matrix(vectors)
+        metadatas = metadatas or [{} for _ in texts]
+        with self._lock:
+            if self._index is None:
+                self._index = self._buat_index(matrix.shape[1], len(matrix))
+                self._set_search_params()
+            self._siap_ditulis()
+            if not self._index.is_trained:
+                self._index.train(matrix)
+
+            start = self._index.ntotal
+            self._index.add(matrix)
+            ids = list(range(start, start + len(texts)))
+            self._db.executemany(
+                "INSERT INTO docs (id, document, metadata) VALUES (?, ?, ?)",
+                [(i, text, json.dumps(meta, default=str)) for i, text, meta in zip(ids, texts, metadatas)],
+            )
+            if self._fts:
+                self._db.executemany(
+                    "INSERT INTO docs_fts (rowid, document) VALUES (?, ?)", zip(ids, texts)
+                )
+            self._db.commit()
+            self._dirty = True
+        return ids
+
+    def add_documents(self, documents: list) -> list:
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, [doc.metadata for doc in documents])
+
+    # ---------- Baca ----------
+    def _ambil_dokumen(self, ids: list) -> list:
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        rows = self._db.execute(
+            f"SELECT id, document, metadata FROM docs WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        by_id = {row[0]: Document(page_content=row[1], metadata=json.loads(row[2] or "{}")) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4) -> list:
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return []
+            _, indices = self._index.search(self._to_matrix(embedding), k)
+            return self._ambil_dokumen([int(i) for i in indices[0] if i >= 0])
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    def lexical_search(self, tokens: list, k: int = 4) -> list:
+        """
+        BM25 via SQLite FTS5 atas teks yang sama dengan index vektor.
+        """
+        if not self._fts or not tokens:
+            return []
+        match = " OR ".join(f'"{token}"' for token in tokens)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT rowid FROM docs_fts WHERE docs_fts MATCH ? ORDER BY bm25(docs_fts) LIMIT ?",
+                (match, k),
+            ).fetchall()
+            return self._ambil_dokumen([row[0] for row in rows])
+
+    def iter_docstore(self):
+        """
+        Generator (id, document, metadata) untuk rekonsiliasi GC.
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT id, document, metadata FROM docs ORDER BY id").fetchall()
+        for row_id, document, metadata in rows:
+            yield row_id, document, json.loads(metadata or "{}")
+
+    # ---------- GC / kompaksi ----------
+    def kompaksi(self, hapus_ids) -> int:
+        """
+        Bangun ulang index + docstore tanpa id yang dihapus. Id FAISS bersifat
+        posisional, jadi penghapusan selalu berarti menulis ulang index.
+        """
+        hapus_ids = set(hapus_ids)
+        with self._lock:
+            if self._index is None or not hapus_ids:
+                return 0
+            self._siap_ditulis()
+            try:
+                vectors = self._index.reconstruct_n(0, self._index.ntotal)
+            except RuntimeError:
+                faiss.extract_index_ivf(self._index).make_direct_map()
+                vectors = self._index.reconstruct_n(0, self._index.ntotal)
+
+            keep = [i for i in range(self._index.ntotal) if i not in hapus_ids]
+            rows = self._db.execute("SELECT id, document, metadata FROM docs ORDER BY id").fetchall()
+            rows = [row for row in rows if row[0] not in hapus_ids]
+
+            index = self._bangun_ulang(vectors[keep])
+
+            tmp_path = self.index_path + ".tmp"
+            faiss.write_index(index, tmp_path)
+            self._db.execute("DELETE FROM docs")
+            self._db.executemany(
+                "INSERT INTO docs (id, document, metadata) VALUES (?, ?, ?)",
+                [(new_id, doc, meta) for new_id, (_, doc, meta) in enumerate(rows)],
+            )
+            if self._fts:
+                self._db.execute("DELETE FROM docs_fts")
+                self._db.executemany(
+                    "INSERT INTO docs_fts (rowid, document) VALUES (?, ?)",
+                    [(new_id, doc) for new_id, (_, doc, _) in enumerate(rows)],
+                )
+            self._db.commit()
+            os.replace(tmp_path, self.index_path)
+            self._db.execute("VACUUM")
+
+            self._index = index
+            self._set_search_params()
+            self._dirty = False
+            return len(hapus_ids)
+
+    @property
+    def ntotal(self) -> int:
+        return self._index.ntotal if self._index is not None else 0
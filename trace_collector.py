@@ -0,0 +1,67 @@
+# trace_collector.py
+# Pengganti collector OTLP untuk pengembangan lokal: terima POST OTLP/HTTP
+# JSON di /v1/traces lalu tulis span ke file JSON lines yang sama formatnya
+# dengan exporter jsonl, sehingga bisa dibaca trace_report.py.
+# Jalankan: python trace_collector.py [--port 4318] [--output traces_collector.jsonl]
+# Lalu jalankan app dengan TRACE_EXPORTER=otlp.
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tracing import otlp_ke_spans
+
+_tulis_lock = threading.Lock()
+
+
+def buat_handler(output_path: str):
+    class OtlpHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_error(404)
+                return
+            panjang = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(panjang) or b"{}")
+                spans = otlp_ke_spans(payload)
+            except (ValueError, KeyError) as e:
+                self.send_error(400, f"Payload OTLP tidak valid: {e}")
+                return
+
+            with _tulis_lock:
+                with open(output_path, "a", encoding="utf-8") as f:
+                    for data in spans:
+                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # jangan banjiri terminal dengan log per batch
+
+    return OtlpHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collector OTLP/HTTP JSON lokal.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", default="traces_collector.jsonl", help="File JSON lines tujuan.")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), buat_handler(args.output))
+    print(f"📡 Collector trace aktif di http://{args.host}:{args.port}/v1/traces → {args.output}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Collector dihentikan.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
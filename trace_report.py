@@ -0,0 +1,151 @@
+# trace_report.py
+# Breakdown latensi per request dari file trace JSON lines (exporter jsonl
+# atau trace_collector.py): pohon span dengan durasi, plus waktu "self" per
+# jenis hop (antrian, LLM, tool, DB, vektor, embedding, OCR).
+# Jalankan: python trace_report.py [--path traces.jsonl] [--terakhir 5] [--trace ID] [--ringkas]
+import argparse
+import json
+import statistics
+from collections import defaultdict
+
+from tracing import TRACE_PATH
+
+
+def muat_spans(path: str) -> dict:
+    """
+    Span dikelompokkan per trace_id.
+    """
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for baris in f:
+            baris = baris.strip()
+            if not baris:
+                continue
+            try:
+                data = json.loads(baris)
+            except json.JSONDecodeError:
+                continue
+            traces[data["trace_id"]].append(data)
+    return traces
+
+
+def susun_pohon(spans: list) -> tuple:
+    """
+    Kembalikan (root, anak per span_id). Span yang parent-nya tidak ada di
+    file (misalnya exporter terpotong) dianggap root.
+    """
+    ids = {s["span_id"] for s in spans}
+    anak = defaultdict(list)
+    roots = []
+    for s in spans:
+        if s["parent_id"] and s["parent_id"] in ids:
+            anak[s["parent_id"]].append(s)
+        else:
+            roots.append(s)
+    for daftar in anak.values():
+        daftar.sort(key=lambda s: s["start"])
+    roots.sort(key=lambda s: (s["kind"] != "request", s["start"]))
+    return roots, anak
+
+
+def waktu_self(data: dict, anak: dict) -> float:
+    """
+    Durasi span dikurangi durasi anak-anaknya. Anak yang berjalan paralel
+    bisa melebihi durasi induk, jadi hasil dibatasi minimal 0.
+    """
+    return max(0.0, data["durasi_ms"] - sum(c["durasi_ms"] for c in anak.get(data["span_id"], [])))
+
+
+def breakdown(spans: list) -> dict:
+    roots, anak = susun_pohon(spans)
+    hasil = defaultdict(float)
+    for s in spans:
+        hasil[s["kind"]] += waktu_self(s, anak)
+    return dict(hasil)
+
+
+def cetak_pohon(data: dict, anak: dict, level: int = 0):
+    atribut = data.get("atribut") or {}
+    info = ", ".join(f"{k}={v}" for k, v in atribut.items() if k not in ("pesan", "statement", "input"))
+    detail = atribut.get("statement") or atribut.get("input") or atribut.get("pesan") or ""
+    status = " ❌ " + data["error"] if data.get("status") == "error" else ""
+    print(f"{'  ' * level}- {data['name']:<24} {data['durasi_ms']:>10.1f} ms  self {waktu_self(data, anak):>9.1f}"
+          f"  [{data['kind']}] {info}{status}")
+    if detail:
+        print(f"{'  ' * level}    ↳ {detail[:120]}")
+    for child in anak.get(data["span_id"], []):
+        cetak_pohon(child, anak, level + 1)
+
+
+def laporan_trace(trace_id: str, spans: list):
+    roots, anak = susun_pohon(spans)
+    total = sum(r["durasi_ms"] for r in roots)
+    print(f"\n🧵 Trace {trace_id} — {total:.1f} ms, {len(spans)} span")
+    for root in roots:
+        cetak_pohon(root, anak)
+
+    print("   Breakdown waktu self per jenis hop:")
+    for kind, ms in sorted(breakdown(spans).items(), key=lambda x: x[1], reverse=True):
+        persen = 100 * ms / total if total else 0.0
+        print(f"   {kind:<10} {ms:>10.1f} ms  {persen:>5.1f}%")
+
+
+def persentil(nilai: list, p: float) -> float:
+    urut = sorted(nilai)
+    return urut[min(len(urut) - 1, int(p / 100 * len(urut)))] if urut else 0.0
+
+
+def laporan_ringkas(traces: dict):
+    per_kind = defaultdict(list)
+    total_request = []
+    for spans in traces.values():
+        roots, _ = susun_pohon(spans)
+        total_request.append(sum(r["durasi_ms"] for r in roots))
+        for kind, ms in breakdown(spans).items():
+            per_kind[kind].append(ms)
+
+    n = len(traces)
+    print(f"\n📊 Ringkasan {n} trace — total p50 {persentil(total_request, 50):.1f} ms, p95 {persentil(total_request, 95):.1f} ms")
+    print(f"{'hop':<10} {'rata2 ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'% total':>8}")
+    grand_total = sum(total_request)
+    for kind, nilai in sorted(per_kind.items(), key=lambda x: sum(x[1]), reverse=True):
+        nilai_semua = nilai + [0.0] * (n - len(nilai))  # trace tanpa hop ini dihitung 0
+        persen = 100 * sum(nilai) / grand_total if grand_total else 0.0
+        print(f"{kind:<10} {statistics.mean(nilai_semua):>10.1f} {persentil(nilai_semua, 50):>10.1f} "
+              f"{persentil(nilai_semua, 95):>10.1f} {persen:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breakdown latensi per request dari file trace.")
+    parser.add_argument("--path", default=TRACE_PATH, help="File trace JSON lines.")
+    parser.add_argument("--trace", help="Tampilkan satu trace_id saja.")
+    parser.add_argument("--terakhir", type=int, default=5, help="Jumlah trace terbaru yang ditampilkan.")
+    parser.add_argument("--ringkas", action="store_true", help="Agregasi semua trace per jenis hop.")
+    args = parser.parse_args()
+
+    try:
+        traces = muat_spans(args.path)
+    except FileNotFoundError:
+        print(f"❌ File trace tidak ditemukan: {args.path}")
+        return
+    if not traces:
+        print("⚠️ Belum ada span di file trace.")
+        return
+
+    if args.ringkas:
+        laporan_ringkas(traces)
+        return
+    if args.trace:
+        if args.trace not in traces:
+            print(f"❌ Trace {args.trace} tidak ditemukan.")
+            return
+        laporan_trace(args.trace, traces[args.trace])
+        return
+
+    terbaru = sorted(traces, key=lambda t: min(s["start"] for s in traces[t]))[-args.terakhir:]
+    for trace_id in terbaru:
+        laporan_trace(trace_id, traces[trace_id])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# tracing.py
+# Tracing latensi per hop: span bersarang (request → antrian → agent → LLM /
+# tool → SQL / embedding / OCR) lewat contextvars, diekspor di background ke
+# file JSON lines atau ke collector OTLP/HTTP (JSON).
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+import contextvars
+import urllib.request
+from contextlib import contextmanager
+from functools import wraps
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# === Konfigurasi ===
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "off")  # off | jsonl | otlp (jsonl tanpa rotasi, aktifkan saat profiling)
+TRACE_PATH = os.getenv("TRACE_PATH", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+TRACE_SERVICE_NAME = "projectchatbot"
+TRACE_BATCH_SIZE = 256
+TRACE_FLUSH_SECONDS = 1.0
+TRACE_MAX_ATRIBUT = 300  # panjang maksimum nilai atribut string
+TRACE_ENABLED = TRACE_EXPORTER != "off"
+
+_span_aktif = contextvars.ContextVar("span_aktif", default=None)
+
+
+# === Span ===
+class Span:
+    """
+    Satu hop yang diukur. kind dipakai laporan untuk breakdown:
+    request, queue, agent, llm, tool, db, vector, embedding, ocr, internal.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "atribut", "error")
+
+    def __init__(self, name: str, kind: str = "internal", parent=None, **atribut):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.end = None
+        self.atribut = {k: _nilai_atribut(v) for k, v in atribut.items() if v is not None}
+        self.error = None
+
+    def set(self, **atribut):
+        for k, v in atribut.items():
+            if v is not None:
+                self.atribut[k] = _nilai_atribut(v)
+
+    def selesai(self, error: BaseException | str | None = None):
+        if self.end is not None:
+            return
+        self.end = time.time()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+        _exporter.kirim(self.ke_dict())
+
+    def ke_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": self.end,
+            "durasi_ms": round((self.end - self.start) * 1000, 3),
+            "atribut": self.atribut,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class _SpanNol:
+    """
+    Pengganti Span saat tracing nonaktif; semua operasi no-op.
+    """
+
+    trace_id = span_id = parent_id = None
+
+    def set(self, **atribut):
+        pass
+
+    def selesai(self, error=None):
+        pass
+
+
+_SPAN_NOL = _SpanNol()
+
+
+def _nilai_atribut(v):
+    if isinstance(v, (bool, int, float)):
+        return v
+    v = str(v)
+    return v if len(v) <= TRACE_MAX_ATRIBUT else v[:TRACE_MAX_ATRIBUT] + "…"
+
+
+def span_aktif():
+    return _span_aktif.get()
+
+
+def trace_id_aktif() -> str | None:
+    current = _span_aktif.get()
+    return current.trace_id if current else None
+
+
+def mulai_span(name: str, kind: str = "internal", parent=None, **atribut):
+    """
+    Buat span tanpa menjadikannya span aktif; tutup manual dengan .selesai().
+    Dipakai untuk hop yang melewati yield/await berkali-kali (antrian, request).
+    """
+    if not TRACE_ENABLED:
+        return _SPAN_NOL
+    if parent is None:
+        parent = _span_aktif.get()
+    return Span(name, kind, parent if isinstance(parent, Span) else None, **atribut)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent=None, **atribut):
+    """
+    Span aktif selama blok with; span di dalamnya otomatis menjadi anak.
+    """
+    if not TRACE_ENABLED:
+        yield _SPAN_NOL
+        return
+    current = mulai_span(name, kind, parent, **atribut)
+    token = _span_aktif.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.selesai(error=e)
+        raise
+    finally:
+        _span_aktif.reset(token)
+        current.selesai()
+
+
+def traced(name: str | None = None, kind: str = "internal"):
+    """
+    Dekorator: bungkus seluruh pemanggilan fungsi dalam satu span.
+    """
+    def decorator(fn):
+        nama_span = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACE_ENABLED:
+                return fn(*args, **kwargs)
+            with span(nama_span, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bawa_konteks(fn):
+    """
+    Bungkus fungsi yang dikirim ke ThreadPoolExecutor agar span aktif ikut
+    ke thread worker.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)  # satu salinan per panggilan (thread)
+
+
+# === Format OTLP/JSON ===
+_OTLP_KIND = {"request": 2, "llm": 3, "db": 3, "vector": 3}  # SERVER / CLIENT, lainnya INTERNAL
+
+
+def _atribut_otlp(atribut: dict) -> list:
+    hasil = []
+    for key, value in atribut.items():
+        if isinstance(value, bool):
+            hasil.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            hasil.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            hasil.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            hasil.append({"key": key, "value": {"stringValue": str(value)}})
+    return hasil
+
+
+def span_ke_otlp(data: dict) -> dict:
+    otlp = {
+        "traceId": data["trace_id"],
+        "spanId": data["span_id"],
+        "name": data["name"],
+        "kind": _OTLP_KIND.get(data["kind"], 1),
+        "startTimeUnixNano": str(int(data["start"] * 1e9)),
+        "endTimeUnixNano": str(int(data["end"] * 1e9)),
+        "attributes": _atribut_otlp({**data["atribut"], "hop.kind": data["kind"]}),
+        "status": {"code": 2, "message": data["error"]} if data["status"] == "error" else {"code": 1},
+    }
+    if data["parent_id"]:
+        otlp["parentSpanId"] = data["parent_id"]
+    return otlp
+
+
+def batch_ke_otlp(spans: list) -> dict:
+    return {"resourceSpans": [{
+        "resource": {"attributes": _atribut_otlp({"service.name": TRACE_SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [span_ke_otlp(s) for s in spans]}],
+    }]}
+
+
+def otlp_ke_spans(payload: dict) -> list:
+    """
+    Kebalikan batch_ke_otlp; dipakai collector lokal untuk menulis JSON lines.
+    """
+    hasil = []
+    for resource in payload.get("resourceSpans", []):
+        for scope in resource.get("scopeSpans", []):
+            for otlp in scope.get("spans", []):
+                atribut = {}
+                for item in otlp.get("attributes", []):
+                    value = item.get("value", {})
+                    if "intValue" in value:
+                        atribut[item["key"]] = int(value["intValue"])
+                    else:
+                        atribut[item["key"]] = next(iter(value.values()), None)
+                kind = atribut.pop("hop.kind", "internal")
+                start = int(otlp["startTimeUnixNano"]) / 1e9
+                end = int(otlp["endTimeUnixNano"]) / 1e9
+                status = otlp.get("status", {})
+                hasil.append({
+                    "trace_id": otlp["traceId"],
+                    "span_id": otlp["spanId"],
+                    "parent_id": otlp.get("parentSpanId") or None,
+                    "name": otlp["name"],
+                    "kind": kind,
+                    "start": start,
+                    "end": end,
+                    "durasi_ms": round((end - start) * 1000, 3),
+                    "atribut": atribut,
+                    "status": "error" if status.get("code") == 2 else "ok",
+                    "error": status.get("message"),
+                })
+    return hasil
+
+
+# === Exporter background ===
+class _Exporter:
+    """
+    Span selesai dimasukkan ke antrian; thread background menulis per batch
+    sehingga request tidak menunggu I/O tracing.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._antrian = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._gagal_dilaporkan = False
+
+    def kirim(self, data: dict):
+        if self.mode == "off":
+            return
+        self._antrian.put(data)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def _ambil_batch(self, timeout: float) -> list:
+        batch = []
+        try:
+            batch.append(self._antrian.get(timeout=timeout))
+            while len(batch) < TRACE_BATCH_SIZE:
+                batch.append(self._antrian.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._ambil_batch(TRACE_FLUSH_SECONDS)
+            if batch:
+                self._tulis(batch)
+
+    def flush(self):
+        while True:
+            batch = self._ambil_batch(0.01)
+            if not batch:
+                return
+            self._tulis(batch)
+
+    def _tulis(self, batch: list):
+        try:
+            if self.mode == "otlp":
+                body = json.dumps(batch_ke_otlp(batch)).encode("utf-8")
+                req = urllib.request.Request(
+                    TRACE_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"}, method="POST"
+                )
+                urllib.request.urlopen(req, timeout=5).close()
+            else:
+                with open(TRACE_PATH, "a", encoding="utf-8") as f:
+                    for data in batch:
+                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        except Exception as e:
+            if not self._gagal_dilaporkan:
+                self._gagal_dilaporkan = True
+                print(f"⚠️ Gagal ekspor trace ({self.mode}): {e}")
+
+
+_exporter = _Exporter(TRACE_EXPORTER)
+atexit.register(_exporter.flush)
+
+
+def flush_traces():
+    _exporter.flush()
+
+
+# === Callback LangChain: span untuk LLM dan tool ===
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Span per panggilan LLM dan tool. Span tool dijadikan span aktif selama
+    tool berjalan sehingga SQL/embedding di dalamnya tercatat sebagai anak.
+    """
+
+    run_inline = True  # jalankan di thread/konteks yang sama dengan run
+
+    def __init__(self):
+        self._spans = {}
+        self._sebelumnya = {}
+
+    def _mulai(self, run_id, parent_run_id, name: str, kind: str, **atribut):
+        if not TRACE_ENABLED or run_id in self._spans:
+            return
+        parent = self._spans.get(parent_run_id) or _span_aktif.get()
+        current = Span(name, kind, parent, **atribut)
+        self._spans[run_id] = current
+        self._sebelumnya[run_id] = _span_aktif.get()
+        _span_aktif.set(current)
+
+    def _selesai(self, run_id, error=None, **atribut):
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        _span_aktif.set(self._sebelumnya.pop(run_id, None))
+        current.set(**atribut)
+        current.selesai(error=error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._mulai_llm(run_id, parent_run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._mulai_llm(run_id, parent_run_id, kwargs)
+
+    def _mulai_llm(self, run_id, parent_run_id, kwargs: dict):
+        profile = (kwargs.get("metadata") or {}).get("llm_profile")
+        params = kwargs.get("invocation_params") or {}
+        nama = f"llm.{profile}" if profile else "llm"
+        self._mulai(run_id, parent_run_id, nama, "llm", model=params.get("model_name") or params.get("model"))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        self._selesai(
+            run_id,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._selesai(run_id, error=error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        nama = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._mulai(run_id, parent_run_id, f"tool.{nama}", "tool", input=input_str)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._selesai(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._selesai(run_id, error=error)
+
+
+_callback_handler = TracingCallbackHandler()
+
+
+def tracing_callbacks() -> list:
+    return [_callback_handler] if TRACE_ENABLED else []